@@ -2,8 +2,18 @@ from fastapi import APIRouter
 
 from backend.app.markmanage.api.v1.user import router as user_router
 from backend.app.markmanage.api.v1.exam import router as exam_router
+from backend.app.markmanage.api.v1.scanner import router as scanner_router
+from backend.app.markmanage.api.v1.printer import router as printer_router
+from backend.app.markmanage.api.v1.upload import router as upload_router
+from backend.app.markmanage.api.v1.file import router as file_router
+from backend.app.markmanage.api.v1.grading import router as grading_router
 
 v1 = APIRouter()
 
 v1.include_router(user_router, prefix='/user', tags=['用户'])
 v1.include_router(exam_router, prefix='/exam', tags=['考试'])
+v1.include_router(scanner_router, prefix='/scanner', tags=['扫描'])
+v1.include_router(printer_router, prefix='/print', tags=['打印'])
+v1.include_router(upload_router, prefix='/upload', tags=['上传'])
+v1.include_router(file_router, prefix='/file', tags=['文件'])
+v1.include_router(grading_router, prefix='/grading', tags=['批改'])
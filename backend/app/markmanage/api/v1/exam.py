@@ -1,8 +1,9 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, status
 from datetime import datetime
 
 from backend.app.markmanage.schema.exam import ExamBase
 from backend.app.markmanage.service.exam_service import exam_service
+from backend.app.markmanage.service.download_service import download_service
 from backend.common.exception import errors
 from backend.common.response.response_code import CustomResponse
 from backend.common.response.response_schema import response_base
@@ -67,6 +68,10 @@ async def update_exam_files(
         )
         return response_base.success()
 
+    except (errors.InvalidFileName, errors.RequestError) as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
     except errors.NotFoundError as e:
         CustomResponse.code = e.code
         CustomResponse.msg = e.msg
@@ -132,6 +137,7 @@ async def delete_exam(
 @router.get("/get_exam_file_path/{exam_id}/files/path")
 async def get_exam_file_path(
         exam_id: int,
+        request: Request,
         # file_type: str,
 ):
     """获取考试文件路径"""
@@ -140,7 +146,10 @@ async def get_exam_file_path(
         file_path, file_name = await exam_service.get_exam_file_info(exam_id)
         if not file_path or not file_name:
             raise errors.NotFoundError(msg='文件不存在')
-        data = {"file_path": file_path, "file_name": file_name}
+        # 带内容哈希的下载地址可被客户端长期缓存，文件更新后地址随之变化
+        file = await download_service.get_exam_questions_file(exam_id)
+        download_url = request.url_for("download_exam_questions", exam_id=exam_id).include_query_params(v=file.sha256)
+        data = {"file_path": file_path, "file_name": file_name, "download_url": str(download_url)}
         return response_base.success(data=data)
     except errors.NotFoundError as e:
         CustomResponse.code = e.code
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import FileResponse, Response
+
+from backend.app.markmanage.service.download_service import download_service
+from backend.common.exception import errors
+from backend.common.response.response_code import CustomResponse
+from backend.common.response.response_schema import response_base
+
+router = APIRouter()
+
+# 带内容哈希（?v=）的地址内容不会变化，可长期缓存；不带版本的地址须用 ETag 重新验证
+CACHE_IMMUTABLE = "private, max-age=31536000, immutable"
+CACHE_REVALIDATE = "private, no-cache"
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match 使用弱比较"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _file_response(request: Request, file, version: str | None):
+    """
+    返回文件：ETag 为内容的SHA-256，If-None-Match 命中时返回 304；
+    FileResponse 支持 Range 请求（PDF阅读器分段加载），服务器支持时用 sendfile 零拷贝发送
+    """
+    etag = f'"{file.sha256}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_IMMUTABLE if version == file.sha256 else CACHE_REVALIDATE,
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        file.path,
+        headers=headers,
+        filename=file.filename,
+        stat_result=file.stat_result,
+        content_disposition_type="inline",
+    )
+
+
+@router.api_route("/exams/{exam_id}/questions", methods=["GET", "HEAD"], name="download_exam_questions")
+async def download_exam_questions(exam_id: int, request: Request, v: str = None):
+    """下载考试的题目文件，v 为文件的内容哈希"""
+    try:
+        file = await download_service.get_exam_questions_file(exam_id)
+        return _file_response(request, file, v)
+    except errors.NotFoundError as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.api_route("/papers/{paper_id}", methods=["GET", "HEAD"], name="download_paper")
+async def download_paper(paper_id: int, request: Request, v: str = None):
+    """下载学生的答卷文件，v 为文件的内容哈希"""
+    try:
+        file = await download_service.get_paper_file(paper_id)
+        return _file_response(request, file, v)
+    except errors.NotFoundError as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
@@ -0,0 +1,66 @@
+from typing import Optional
+
+from fastapi import APIRouter
+
+from backend.app.markmanage.schema.grading import (
+    GradingCacheStats,
+    GradingJobCounts,
+    GradingRunCreate,
+    GradingStatusInfo,
+)
+from backend.app.markmanage.service.grading_cache_service import grading_cache_service
+from backend.app.markmanage.service.grading_service import grading_service
+from backend.common.exception import errors
+from backend.common.response.response_code import CustomResponse
+from backend.common.response.response_schema import response_base
+
+router = APIRouter()
+
+
+@router.post("/runs")
+async def start_grading(obj: GradingRunCreate):
+    """为待批改答卷创建批改任务并在本进程开始批改，立即返回，批改在后台进行"""
+    try:
+        status = await grading_service.start(**obj.model_dump())
+        return response_base.success(data=GradingStatusInfo(**status))
+    except (errors.RequestError, errors.ServerError) as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.get("/status")
+async def get_grading_status():
+    """查询本进程的批改进度与速度"""
+    return response_base.success(data=GradingStatusInfo(**grading_service.status()))
+
+
+@router.post("/stop")
+async def stop_grading():
+    """停止批改，等待已领取的答卷批改完成并写回"""
+    try:
+        status = await grading_service.stop()
+        return response_base.success(data=GradingStatusInfo(**status))
+    except errors.RequestError as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.get("/jobs")
+async def get_grading_job_counts(exam_id: Optional[int] = None):
+    """查询批改任务队列进度（包括其他批改进程）"""
+    return response_base.success(data=GradingJobCounts(**await grading_service.get_job_counts(exam_id)))
+
+
+@router.get("/cache")
+async def get_grading_cache_stats():
+    """查询批改结果缓存的命中统计与条数"""
+    return response_base.success(data=GradingCacheStats(**await grading_cache_service.stats()))
+
+
+@router.post("/cache/evict")
+async def evict_grading_cache():
+    """立即按创建时间与总条数淘汰批改结果缓存"""
+    evicted = await grading_cache_service.evict()
+    return response_base.success(data={"evicted": evicted})
@@ -0,0 +1,86 @@
+from fastapi import APIRouter
+
+from backend.app.markmanage.schema.printer import (
+    PrintBatchCreate,
+    PrintBatchInfo,
+    PrintClassSetCreate,
+    PrintClassSetInfo,
+    PrintExamCreate,
+    PrintJobInfo,
+)
+from backend.app.markmanage.service.print_service import print_service
+from backend.common.exception import errors
+from backend.common.response.response_code import CustomResponse
+from backend.common.response.response_schema import response_base
+
+router = APIRouter()
+
+
+def _batch_info(progress, jobs):
+    return PrintBatchInfo(**progress, jobs=[PrintJobInfo.model_validate(job) for job in jobs])
+
+
+@router.post("/batches")
+async def submit_print_batch(obj: PrintBatchCreate):
+    """提交打印批次，立即返回批次进度，打印在后台进行"""
+    try:
+        batch_id, _ = await print_service.submit_batch(**obj.model_dump())
+        return response_base.success(data=_batch_info(*await print_service.get_batch(batch_id)))
+    except (errors.RequestError, errors.NotFoundError, errors.ServerError) as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.post("/exams/{exam_id}")
+async def print_exam_questions(exam_id: int, obj: PrintExamCreate):
+    """打印考试的题目文件"""
+    try:
+        batch_id, _ = await print_service.print_exam(exam_id, **obj.model_dump())
+        return response_base.success(data=_batch_info(*await print_service.get_batch(batch_id)))
+    except (errors.RequestError, errors.NotFoundError, errors.ServerError) as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.post("/exams/{exam_id}/class-set")
+async def print_exam_class_set(exam_id: int, obj: PrintClassSetCreate):
+    """为班级打印考试题目，每位学生一份，合并为一个打印任务"""
+    try:
+        batch_id, _, result = await print_service.print_class_set(exam_id, **obj.model_dump())
+        data = PrintClassSetInfo(
+            copies=result.copies,
+            pages_per_copy=result.pages_per_copy,
+            total_pages=result.total_pages,
+            cached=result.cached,
+            batch=_batch_info(*await print_service.get_batch(batch_id)),
+        )
+        return response_base.success(data=data)
+    except (errors.RequestError, errors.NotFoundError, errors.ServerError) as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.get("/batches/{batch_id}")
+async def get_print_batch(batch_id: int):
+    """查询打印批次进度"""
+    try:
+        return response_base.success(data=_batch_info(*await print_service.get_batch(batch_id)))
+    except errors.NotFoundError as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.get("/jobs/{job_id}")
+async def get_print_job(job_id: int):
+    """查询打印任务状态"""
+    try:
+        job = await print_service.get_job(job_id)
+        return response_base.success(data=PrintJobInfo.model_validate(job))
+    except errors.NotFoundError as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter
+
+from backend.app.markmanage.schema.scanner import ScanJobCreate, ScanJobInfo
+from backend.app.markmanage.service.scanner_service import scanner_service
+from backend.common.exception import errors
+from backend.common.response.response_code import CustomResponse
+from backend.common.response.response_schema import response_base
+
+router = APIRouter()
+
+
+@router.post("/jobs")
+async def submit_scan_job(obj: ScanJobCreate):
+    """提交扫描任务，由常驻扫描守护进程按顺序执行"""
+    try:
+        job = await scanner_service.submit_job(**obj.model_dump())
+        return response_base.success(data=ScanJobInfo.model_validate(job))
+    except errors.RequestError as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.get("/jobs")
+async def list_scan_jobs():
+    """列出扫描任务"""
+    jobs = await scanner_service.list_jobs()
+    return response_base.success(data=[ScanJobInfo.model_validate(job) for job in jobs])
+
+
+@router.get("/jobs/{job_id}")
+async def get_scan_job(job_id: int):
+    """查询扫描任务状态"""
+    try:
+        job = await scanner_service.get_job(job_id)
+        return response_base.success(data=ScanJobInfo.model_validate(job))
+    except errors.NotFoundError as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.get("/status")
+async def get_scanner_status():
+    """查询扫描守护进程状态"""
+    return response_base.success(data=await scanner_service.get_status())
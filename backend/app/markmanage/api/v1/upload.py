@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Header, Query, Request
+
+from backend.app.markmanage.schema.upload import UploadFinalizeInfo, UploadSessionCreate, UploadSessionInfo
+from backend.app.markmanage.service.upload_service import upload_service
+from backend.common.exception import errors
+from backend.common.response.response_code import CustomResponse
+from backend.common.response.response_schema import response_base
+from backend.config.fileConfig import settings
+
+router = APIRouter()
+
+
+def _session_info(meta):
+    return UploadSessionInfo(
+        upload_id=meta["upload_id"],
+        purpose=meta["attributes"]["purpose"],
+        filename=meta["filename"],
+        total_size=meta["total_size"],
+        offset=meta["offset"],
+        max_chunk_size=settings.UPLOAD_MAX_CHUNK_SIZE,
+        complete=meta["offset"] == meta["total_size"],
+    )
+
+
+async def _read_chunk(request: Request) -> bytes:
+    """读取请求体中的分块，超过分块大小上限时立即拒绝"""
+    content_length = request.headers.get("content-length")
+    if content_length and int(content_length) > settings.UPLOAD_MAX_CHUNK_SIZE:
+        raise errors.RequestError(msg=f'分块不能超过 {settings.UPLOAD_MAX_CHUNK_SIZE} 字节')
+    data = bytearray()
+    async for part in request.stream():
+        data += part
+        if len(data) > settings.UPLOAD_MAX_CHUNK_SIZE:
+            raise errors.FileTooLarge(msg=f'分块不能超过 {settings.UPLOAD_MAX_CHUNK_SIZE} 字节')
+    return bytes(data)
+
+
+@router.post("/sessions")
+async def create_upload_session(obj: UploadSessionCreate):
+    """创建分块上传会话"""
+    try:
+        meta = await upload_service.initiate(**obj.model_dump())
+        return response_base.success(data=_session_info(meta))
+    except (errors.RequestError, errors.InvalidFileName, errors.FileTooLarge, errors.ServerError) as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.put("/sessions/{upload_id}/chunks")
+async def put_upload_chunk(
+        upload_id: str,
+        request: Request,
+        offset: int = Query(..., description="分块在文件中的起始偏移量"),
+        chunk_sha256: str = Header(None, alias="X-Chunk-SHA256", description="分块数据的SHA-256")
+):
+    """上传一个分块（请求体为分块的原始数据）"""
+    try:
+        data = await _read_chunk(request)
+        meta = await upload_service.put_chunk(upload_id, offset, data, chunk_sha256)
+        return response_base.success(data=_session_info(meta))
+    except (errors.RequestError, errors.InvalidFileName, errors.FileTooLarge, errors.NotFoundError,
+            errors.ServerError) as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.get("/sessions/{upload_id}")
+async def get_upload_session(upload_id: str):
+    """查询上传会话，断线后从返回的 offset 继续上传"""
+    try:
+        meta = await upload_service.get_session(upload_id)
+        return response_base.success(data=_session_info(meta))
+    except (errors.NotFoundError, errors.ServerError) as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.post("/sessions/{upload_id}/finalize")
+async def finalize_upload_session(upload_id: str):
+    """完成上传：校验文件并创建考试或登记答卷"""
+    try:
+        result = await upload_service.finalize(upload_id)
+        return response_base.success(data=UploadFinalizeInfo(**result))
+    except (errors.RequestError, errors.InvalidFileName, errors.NotFoundError, errors.ServerError) as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
+
+
+@router.delete("/sessions/{upload_id}")
+async def abort_upload_session(upload_id: str):
+    """取消上传并删除已接收的数据"""
+    try:
+        await upload_service.abort(upload_id)
+        return response_base.success(data=upload_id)
+    except (errors.NotFoundError, errors.ServerError) as e:
+        CustomResponse.code = e.code
+        CustomResponse.msg = e.msg
+        return response_base.fail(res=CustomResponse)
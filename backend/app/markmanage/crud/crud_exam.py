@@ -3,6 +3,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.markmanage.models.exam import Exam
+from backend.app.markmanage.models.stored_file import StoredFile
 from datetime import datetime
 
 from sqlalchemy import select, update, delete, text
@@ -34,9 +35,12 @@ class ExamCRUD:
         await session.refresh(exam)
         return exam
 
-    async def get_exam_by_id(self, session: AsyncSession, exam_id: int):
-        """根据ID获取考试记录"""
-        result = await session.execute(select(Exam).filter(Exam.id == exam_id))
+    async def get_exam_by_id(self, session: AsyncSession, exam_id: int, for_update: bool = False):
+        """根据ID获取考试记录，for_update 时加行锁"""
+        stmt = select(Exam).filter(Exam.id == exam_id)
+        if for_update:
+            stmt = stmt.with_for_update()
+        result = await session.execute(stmt)
         return result.scalars().first()
 
     async def update_exam(
@@ -117,6 +121,47 @@ class ExamCRUD:
         # result = await session.execute(stmt)
         # return result.scalars().all()
 
+    async def list_unstored_question_files(self, session: AsyncSession, after_id: int, limit: int,
+                                  lock: bool = True):
+        """
+        按ID顺序列出题目文件不在内容寻址存储中的考试（旧的平铺文件），lock 时对这些考试加行锁
+
+        :return: [(考试ID, 题目文件路径)]
+        """
+        stmt = (
+            select(Exam.id, Exam.questions_path)
+            .outerjoin(StoredFile, StoredFile.path == Exam.questions_path)
+            .where(Exam.id > after_id, Exam.questions_path.isnot(None), StoredFile.id.is_(None))
+            .order_by(Exam.id)
+            .limit(limit)
+        )
+        if lock:
+            stmt = stmt.with_for_update(of=Exam)
+        result = await session.execute(stmt)
+        return result.all()
+
+    async def bulk_update_questions_paths(self, session: AsyncSession, rows: list[dict]):
+        """按主键批量更新题目文件路径（只写入当前事务，由调用方统一提交）"""
+        await session.execute(update(Exam), rows)
+
+    async def questions_path_exists(self, session: AsyncSession, path: str) -> bool:
+        """是否仍有考试引用该题目文件路径"""
+        result = await session.execute(select(Exam.id).where(Exam.questions_path == path).limit(1))
+        return result.first() is not None
+
+    async def get_questions_hashes(self, session: AsyncSession, exam_ids: list[int]):
+        """
+        批量获取考试的题目文件路径及其在内容寻址存储中的哈希（旧的平铺文件哈希为None）
+
+        :return: [(考试ID, 题目文件路径, 哈希)]
+        """
+        result = await session.execute(
+            select(Exam.id, Exam.questions_path, StoredFile.sha256)
+            .outerjoin(StoredFile, StoredFile.path == Exam.questions_path)
+            .where(Exam.id.in_(exam_ids))
+        )
+        return result.all()
+
     #     获取文件路径和文件名
     async def get_file_path(self, session: AsyncSession, exam_id: int):
         """获取文件路径"""
@@ -0,0 +1,72 @@
+# backend/app/markmanage/crud/crud_grading_cache.py
+from datetime import datetime
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.markmanage.models.grading_cache import GradingCacheEntry
+
+
+class GradingCacheCRUD:
+    """批改结果缓存的数据库操作（只写入当前事务，由调用方统一提交）"""
+
+    async def get_many(self, session: AsyncSession, cache_keys: list[str]) -> dict[str, str]:
+        """
+        批量查询缓存
+
+        :return: 缓存键 -> 批改结果JSON（只包含存在的键）
+        """
+        result = await session.execute(
+            select(GradingCacheEntry.cache_key, GradingCacheEntry.result)
+            .where(GradingCacheEntry.cache_key.in_(cache_keys))
+        )
+        return dict(result.all())
+
+    async def touch(self, session: AsyncSession, cache_keys: list[str]):
+        """记录命中：累加命中次数并更新最近使用时间"""
+        await session.execute(
+            update(GradingCacheEntry)
+            .where(GradingCacheEntry.cache_key.in_(cache_keys))
+            .values(hits=GradingCacheEntry.hits + 1, last_used_at=datetime.utcnow())
+        )
+
+    async def add_many(self, session: AsyncSession, entries: list[dict]) -> int:
+        """
+        批量写入缓存，已存在的键跳过
+
+        :param entries: [{"cache_key", "content_sha256", "questions_sha256", "rubric_version", "result"}]
+        :return: 写入数
+        """
+        existing = set(await self.get_many(session, [entry["cache_key"] for entry in entries]))
+        now = datetime.utcnow()
+        new_entries = [
+            GradingCacheEntry(**entry, hits=0, created_at=now, last_used_at=now)
+            for entry in entries if entry["cache_key"] not in existing
+        ]
+        session.add_all(new_entries)
+        await session.flush()
+        return len(new_entries)
+
+    async def delete_older_than(self, session: AsyncSession, cutoff: datetime) -> int:
+        """删除创建时间早于 cutoff 的缓存，返回删除数"""
+        result = await session.execute(delete(GradingCacheEntry).where(GradingCacheEntry.created_at < cutoff))
+        return result.rowcount
+
+    async def delete_least_recently_used(self, session: AsyncSession, max_entries: int) -> int:
+        """缓存条数超过 max_entries 时删除最久未使用的条目，返回删除数"""
+        total = (await session.execute(select(func.count()).select_from(GradingCacheEntry))).scalar()
+        if total <= max_entries:
+            return 0
+        # 保留最近使用的 max_entries 条，使用时间不晚于第 max_entries+1 条的全部删除
+        cutoff = (await session.execute(
+            select(GradingCacheEntry.last_used_at)
+            .order_by(GradingCacheEntry.last_used_at.desc())
+            .offset(max_entries)
+            .limit(1)
+        )).scalar()
+        result = await session.execute(delete(GradingCacheEntry).where(GradingCacheEntry.last_used_at <= cutoff))
+        return result.rowcount
+
+    async def count(self, session: AsyncSession) -> int:
+        """缓存条数"""
+        return (await session.execute(select(func.count()).select_from(GradingCacheEntry))).scalar()
@@ -0,0 +1,189 @@
+# backend/app/markmanage/crud/crud_grading_job.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update, insert, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.markmanage.models.grading_job import GradingJob
+from backend.app.markmanage.models.paper import Paper
+
+
+class GradingJobCRUD:
+    """
+    批改任务的数据库操作（只写入当前事务，由调用方统一提交）
+
+    领取与回收都用 SELECT ... FOR UPDATE SKIP LOCKED 先锁定行再按主键更新，
+    多个批改进程同时操作时互相跳过对方已锁定的任务，不会等待或重复领取。
+    """
+
+    async def enqueue_pending_papers(self, session: AsyncSession, exam_id: int = None) -> int:
+        """
+        为已识别、待批改且还没有批改任务的答卷创建任务
+
+        :return: 新建的任务数
+        """
+        now = datetime.utcnow()
+        has_job = select(GradingJob.id).where(GradingJob.paper_id == Paper.id).exists()
+        source = select(
+            Paper.id, Paper.exam_id, literal('queued'), literal(0), literal(now), literal(now)
+        ).where(Paper.status == 'pending', Paper.content.is_not(None), ~has_job)
+        if exam_id is not None:
+            source = source.where(Paper.exam_id == exam_id)
+        result = await session.execute(
+            insert(GradingJob).from_select(
+                ['paper_id', 'exam_id', 'status', 'attempts', 'visible_at', 'created_at'], source
+            )
+        )
+        return result.rowcount
+
+    async def requeue_finished_jobs(self, session: AsyncSession, exam_id: int = None,
+                                    statuses: tuple = ('failed',)) -> int:
+        """把已结束（statuses 中状态）的任务重新排队并清零尝试次数，返回任务数"""
+        stmt = update(GradingJob).where(GradingJob.status.in_(statuses)).values(
+            status='queued', attempts=0, visible_at=datetime.utcnow(), finished_at=None
+        )
+        if exam_id is not None:
+            stmt = stmt.where(GradingJob.exam_id == exam_id)
+        result = await session.execute(stmt)
+        return result.rowcount
+
+    async def claim_jobs(self, session: AsyncSession, owner: str, limit: int, lease_seconds: float,
+                         exam_id: int = None):
+        """
+        领取最多 limit 个可见的排队任务，租约为 lease_seconds 秒
+
+        :return: [(答卷ID, 考试ID, 学生ID, 识别文本)]
+        """
+        now = datetime.utcnow()
+        stmt = (
+            select(GradingJob.id)
+            .where(GradingJob.status == 'queued', GradingJob.visible_at <= now)
+            .order_by(GradingJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if exam_id is not None:
+            stmt = stmt.where(GradingJob.exam_id == exam_id)
+        job_ids = list((await session.execute(stmt)).scalars().all())
+        if not job_ids:
+            return []
+        # 更新时再次确认仍在排队，不支持行锁的数据库上并发领取也不会重复
+        await session.execute(
+            update(GradingJob)
+            .where(GradingJob.id.in_(job_ids), GradingJob.status == 'queued')
+            .values(
+                status='leased',
+                lease_owner=owner,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=GradingJob.attempts + 1,
+            )
+        )
+        result = await session.execute(
+            select(Paper.id, Paper.exam_id, Paper.student_id, Paper.content)
+            .join(GradingJob, GradingJob.paper_id == Paper.id)
+            .where(GradingJob.id.in_(job_ids), GradingJob.lease_owner == owner, GradingJob.status == 'leased')
+            .order_by(GradingJob.id)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def extend_leases(self, session: AsyncSession, owner: str, lease_seconds: float) -> int:
+        """为 owner 持有的全部任务续租，返回续租的任务数"""
+        result = await session.execute(
+            update(GradingJob)
+            .where(GradingJob.lease_owner == owner, GradingJob.status == 'leased')
+            .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+        )
+        return result.rowcount
+
+    async def lock_owned_jobs(self, session: AsyncSession, owner: str, paper_ids: list[int]) -> list[int]:
+        """锁定 owner 仍持有租约的任务，返回其答卷ID（租约已被回收的任务不在其中）"""
+        result = await session.execute(
+            select(GradingJob.paper_id)
+            .where(
+                GradingJob.paper_id.in_(paper_ids),
+                GradingJob.lease_owner == owner,
+                GradingJob.status == 'leased',
+            )
+            .with_for_update()
+        )
+        return list(result.scalars().all())
+
+    async def complete_jobs(self, session: AsyncSession, paper_ids: list[int]):
+        """标记任务已完成"""
+        await session.execute(
+            update(GradingJob)
+            .where(GradingJob.paper_id.in_(paper_ids))
+            .values(status='done', lease_owner=None, lease_expires_at=None, finished_at=datetime.utcnow())
+        )
+
+    async def release_jobs(self, session: AsyncSession, owner: str, paper_ids: list[int], max_attempts: int,
+                           retry_delay: float, attempted: bool = True, error: str = None):
+        """
+        归还 owner 持有的任务
+
+        :param attempted: 为True时任务在 retry_delay 秒后重新可见，达到 max_attempts 的任务标记为失败；
+                          为False（领取后尚未批改）时退回本次尝试次数并立即可见
+        """
+        now = datetime.utcnow()
+        owned = (
+            GradingJob.paper_id.in_(paper_ids),
+            GradingJob.lease_owner == owner,
+            GradingJob.status == 'leased',
+        )
+        released = {"lease_owner": None, "lease_expires_at": None}
+        if not attempted:
+            await session.execute(
+                update(GradingJob).where(*owned).values(
+                    status='queued', visible_at=now, attempts=GradingJob.attempts - 1, **released
+                )
+            )
+            return
+        await session.execute(
+            update(GradingJob).where(*owned, GradingJob.attempts >= max_attempts).values(
+                status='failed', finished_at=now, last_error=error, **released
+            )
+        )
+        await session.execute(
+            update(GradingJob).where(*owned).values(
+                status='queued', visible_at=now + timedelta(seconds=retry_delay), last_error=error, **released
+            )
+        )
+
+    async def requeue_expired_leases(self, session: AsyncSession, max_attempts: int, limit: int = 1000) -> dict:
+        """
+        回收租约已过期的任务（持有者崩溃或失联）：重新排队，达到 max_attempts 的标记为失败
+
+        :return: {"requeued": 重新排队数, "failed": 标记失败数}
+        """
+        now = datetime.utcnow()
+        rows = (await session.execute(
+            select(GradingJob.id, GradingJob.attempts)
+            .where(GradingJob.status == 'leased', GradingJob.lease_expires_at < now)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )).all()
+        requeue_ids = [job_id for job_id, attempts in rows if attempts < max_attempts]
+        fail_ids = [job_id for job_id, attempts in rows if attempts >= max_attempts]
+        error = '租约过期，批改进程可能已退出'
+        released = {"lease_owner": None, "lease_expires_at": None, "last_error": error}
+        if requeue_ids:
+            await session.execute(
+                update(GradingJob).where(GradingJob.id.in_(requeue_ids)).values(
+                    status='queued', visible_at=now, **released
+                )
+            )
+        if fail_ids:
+            await session.execute(
+                update(GradingJob).where(GradingJob.id.in_(fail_ids)).values(
+                    status='failed', finished_at=now, **released
+                )
+            )
+        return {"requeued": len(requeue_ids), "failed": len(fail_ids)}
+
+    async def count_by_status(self, session: AsyncSession, exam_id: int = None) -> dict:
+        """按状态统计任务数"""
+        stmt = select(GradingJob.status, func.count()).group_by(GradingJob.status)
+        if exam_id is not None:
+            stmt = stmt.where(GradingJob.exam_id == exam_id)
+        result = await session.execute(stmt)
+        return {status: count for status, count in result.all()}
@@ -188,3 +188,110 @@
 # #         print(f"操作出错: {str(e)}")
 # #     finally:
 # #         db.close()
+
+
+# backend/app/markmanage/crud/crud_paper.py
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.markmanage.models.paper import Paper
+from backend.app.markmanage.models.stored_file import StoredFile
+
+
+class PaperCRUD:
+    """答卷模型的数据库操作"""
+
+    async def bulk_create_papers(self, session: AsyncSession, papers: list[dict]) -> list[Paper]:
+        """批量创建答卷记录（只写入当前事务，由调用方统一提交）"""
+        paper_objs = [Paper(**paper_data) for paper_data in papers]
+        session.add_all(paper_objs)
+        await session.flush()
+        return paper_objs
+
+    async def get_paper_by_id(self, session: AsyncSession, paper_id: int):
+        """根据ID获取答卷记录"""
+        result = await session.execute(select(Paper).filter(Paper.id == paper_id))
+        return result.scalars().first()
+
+    async def list_unstored_paper_files(self, session: AsyncSession, after_id: int, limit: int,
+                                lock: bool = True):
+        """
+        按ID顺序列出答卷文件不在内容寻址存储中的答卷（旧的平铺文件），lock 时对这些答卷加行锁
+
+        :return: [(答卷ID, 答卷文件路径)]
+        """
+        stmt = (
+            select(Paper.id, Paper.paper_path)
+            .outerjoin(StoredFile, StoredFile.path == Paper.paper_path)
+            .where(Paper.id > after_id, StoredFile.id.is_(None))
+            .order_by(Paper.id)
+            .limit(limit)
+        )
+        if lock:
+            stmt = stmt.with_for_update(of=Paper)
+        result = await session.execute(stmt)
+        return result.all()
+
+    async def bulk_update_paper_paths(self, session: AsyncSession, rows: list[dict]):
+        """按主键批量更新答卷文件路径（只写入当前事务，由调用方统一提交）"""
+        await session.execute(update(Paper), rows)
+
+    async def paper_path_exists(self, session: AsyncSession, path: str) -> bool:
+        """是否仍有答卷引用该文件路径"""
+        result = await session.execute(select(Paper.id).where(Paper.paper_path == path).limit(1))
+        return result.first() is not None
+
+    async def list_papers_without_content(self, session: AsyncSession, after_id: int, limit: int,
+                                          exam_id: int = None):
+        """
+        按ID顺序列出还没有识别文本的答卷（已标记为识别失败的除外）
+
+        :return: [(答卷ID, 答卷文件路径)]
+        """
+        stmt = (
+            select(Paper.id, Paper.paper_path)
+            .where(Paper.id > after_id, Paper.content.is_(None), Paper.status.is_distinct_from('ocr_failed'))
+            .order_by(Paper.id)
+            .limit(limit)
+        )
+        if exam_id is not None:
+            stmt = stmt.where(Paper.exam_id == exam_id)
+        result = await session.execute(stmt)
+        return result.all()
+
+    async def bulk_update_paper_contents(self, session: AsyncSession, rows: list[dict]):
+        """
+        按主键批量写入识别文本（只写入当前事务，由调用方统一提交）
+
+        :param rows: [{"id": 答卷ID, "content": 识别文本}]
+        """
+        await session.execute(update(Paper), rows)
+
+    async def mark_papers_ocr_failed(self, session: AsyncSession, paper_ids: list[int]):
+        """将没有识别出文本的答卷标记为识别失败（只写入当前事务，由调用方统一提交）"""
+        await session.execute(update(Paper).where(Paper.id.in_(paper_ids)).values(status='ocr_failed'))
+
+    async def bulk_update_grading_results(self, session: AsyncSession, rows: list[dict]):
+        """
+        按主键批量写入批改结果并标记为已批改（只写入当前事务，由调用方统一提交）
+
+        :param rows: [{"id": 答卷ID, "scores_comments": 批改结果}]
+        """
+        await session.execute(update(Paper), [{**row, "status": 'graded'} for row in rows])
+
+    async def list_papers_by_exam(
+            self,
+            session: AsyncSession,
+            exam_id: int,
+            status: str = None,
+            limit: int = 100,
+            offset: int = 0
+    ):
+        """按考试列出答卷"""
+        stmt = select(Paper).where(Paper.exam_id == exam_id)
+        if status:
+            stmt = stmt.where(Paper.status == status)
+        stmt = stmt.order_by(Paper.id).offset(offset).limit(limit)
+        result = await session.execute(stmt)
+        return result.scalars().all()
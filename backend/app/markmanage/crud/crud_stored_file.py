@@ -0,0 +1,35 @@
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.markmanage.models.stored_file import StoredFile
+
+
+class StoredFileCRUD:
+    """内容寻址存储文件的数据库操作（只写入当前事务，由调用方统一提交）"""
+
+    async def get_by_hash(self, session: AsyncSession, sha256: str, for_update: bool = False):
+        """根据内容哈希获取文件记录，for_update 时加行锁"""
+        stmt = select(StoredFile).where(StoredFile.sha256 == sha256)
+        if for_update:
+            stmt = stmt.with_for_update()
+        result = await session.execute(stmt)
+        return result.scalars().first()
+
+    async def get_by_path(self, session: AsyncSession, path: str, for_update: bool = False):
+        """根据存储路径获取文件记录，for_update 时加行锁"""
+        stmt = select(StoredFile).where(StoredFile.path == path)
+        if for_update:
+            stmt = stmt.with_for_update()
+        result = await session.execute(stmt)
+        return result.scalars().first()
+
+    async def create(self, session: AsyncSession, sha256: str, path: str, size: int) -> StoredFile:
+        """新建文件记录（引用数为1）"""
+        stored = StoredFile(sha256=sha256, path=path, size=size, ref_count=1)
+        session.add(stored)
+        await session.flush()
+        return stored
+
+    async def delete(self, session: AsyncSession, stored_id: int):
+        """删除文件记录"""
+        await session.execute(delete(StoredFile).where(StoredFile.id == stored_id))
@@ -88,3 +88,23 @@ class UserCRUD:
         result = await db.execute(stmt)
         users = result.scalars().all()
         return users
+
+    async def list_student_ids_by_class(self, db: AsyncSession, class_name: str) -> list[int]:
+        """按ID顺序列出班级中所有学生的ID"""
+        stmt = (
+            select(User.id)
+            .where(User.role == 'student', User.class_name == class_name)
+            .order_by(User.id)
+        )
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def list_students_by_class(self, db: AsyncSession, class_name: str) -> list[User]:
+        """按ID顺序列出班级中的所有学生"""
+        stmt = (
+            select(User)
+            .where(User.role == 'student', User.class_name == class_name)
+            .order_by(User.id)
+        )
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
@@ -1,5 +1,8 @@
 from .user import User
 from .exam import Exam
 from .paper import Paper
+from .stored_file import StoredFile
+from .grading_job import GradingJob
+from .grading_cache import GradingCacheEntry
 
-__all__ = ["User", "Exam", "Paper"]
\ No newline at end of file
+__all__ = ["User", "Exam", "Paper", "StoredFile", "GradingJob", "GradingCacheEntry"]
\ No newline at end of file
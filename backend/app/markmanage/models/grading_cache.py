@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from backend.database.base import Base
+
+
+class GradingCacheEntry(Base):
+    """批改结果缓存：相同的答卷文本、题目文件与评分标准版本复用已有的批改结果"""
+    __tablename__ = 'grading_cache'
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, nullable=False, doc="由以下三项计算的缓存键")
+    content_sha256 = Column(String(64), nullable=False, doc="规范化答卷文本的SHA-256")
+    questions_sha256 = Column(String(64), nullable=False, doc="题目文件的SHA-256")
+    rubric_version = Column(String(64), nullable=False, doc="评分标准/提示词版本")
+    result = Column(Text, nullable=False, doc="批改结果JSON")
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
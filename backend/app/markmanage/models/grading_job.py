@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from backend.database.base import Base
+
+
+class GradingJob(Base):
+    """
+    答卷批改任务，每份答卷一条
+
+    queued 的任务在 visible_at 之后可被领取；领取后为 leased，领取者需在 lease_expires_at 之前续租，
+    租约过期的任务重新变为 queued（超过最大尝试次数时为 failed）；批改结果写回后为 done。
+    """
+    __tablename__ = 'grading_jobs'
+    __table_args__ = (
+        Index('ix_grading_jobs_status_visible_at', 'status', 'visible_at'),
+        Index('ix_grading_jobs_status_lease_expires_at', 'status', 'lease_expires_at'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    paper_id = Column(Integer, ForeignKey('papers.id'), unique=True, nullable=False)
+    exam_id = Column(Integer, ForeignKey('exams.id'), nullable=False, index=True)
+
+    status = Column(String(20), nullable=False, default='queued')  # （queued/leased/done/failed）
+    attempts = Column(Integer, nullable=False, default=0, doc="已领取次数")
+    visible_at = Column(DateTime, nullable=False, default=datetime.utcnow, doc="最早可被领取的时间")
+    lease_owner = Column(String(128), doc="持有租约的批改进程")
+    lease_expires_at = Column(DateTime, doc="租约到期时间")
+    last_error = Column(Text)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
@@ -14,13 +14,13 @@ class Paper(Base):
     submitted_at = Column(DateTime, default=datetime.utcnow)
 
     # 学生答案和评分数据
-    paper_path = Column(String(100), nullable=False)
+    paper_path = Column(String(255), nullable=False)
     content = Column(Text)   # 经过识别的文本内容
     # answers = Column(LargeBinary)  # 存储文件
     scores_comments = Column(Text)
 
     # total_score = Column(Float, default=0.0)
-    status = Column(String(20), default='pending')   #（pending/reviewed/graded）
+    status = Column(String(20), default='pending')   #（pending/reviewed/graded/ocr_failed）
 
     # 关系
     exam = relationship("Exam", back_populates="papers")
@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from backend.database.base import Base
+
+
+class StoredFile(Base):
+    """内容寻址存储中的文件，相同内容只保存一份"""
+    __tablename__ = 'stored_files'
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, nullable=False, doc="文件内容的SHA-256")
+    path = Column(String(255), unique=True, nullable=False, doc="按哈希分片的存储路径")
+    size = Column(BigInteger, nullable=False)
+    # 引用该文件的考试题目与答卷数，归零时删除文件
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
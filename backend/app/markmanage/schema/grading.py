@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class GradingRunCreate(BaseModel):
+    # 开始批改
+    exam_id: Optional[int] = Field(None, description="只批改该考试的答卷，为空时批改全部考试")
+    drain: bool = Field(True, description="为true时队列中没有可领取的任务后停止，否则持续领取新任务")
+    retry_failed: bool = Field(False, description="是否把失败的批改任务重新排队")
+    regrade: bool = Field(False, description="是否重新批改已完成的答卷（内容未变的答卷命中批改结果缓存）")
+
+
+class GradingStatusInfo(BaseModel):
+    # 批改引擎状态
+    running: bool = Field(..., description="是否正在批改")
+    exam_id: Optional[int] = Field(None, description="正在批改的考试ID")
+    claimed: int = Field(0, description="已领取的答卷数")
+    graded: int = Field(0, description="已批改的答卷数")
+    failed: int = Field(0, description="批改失败（已归还）的答卷数")
+    retried: int = Field(0, description="模型调用重试次数")
+    cache_hits: int = Field(0, description="命中批改结果缓存的答卷数")
+    deduplicated: int = Field(0, description="与同时批改的相同内容共用模型结果的答卷数")
+    in_flight: int = Field(0, description="进行中的模型请求数")
+    saved_batches: int = Field(0, description="已批量写回的批次数")
+    started_at: Optional[datetime] = Field(None, description="开始时间")
+    finished_at: Optional[datetime] = Field(None, description="结束时间")
+    papers_per_second: Optional[float] = Field(None, description="批改速度（份/秒）")
+    last_error: Optional[str] = Field(None, description="最近一次模型调用错误")
+
+
+class GradingJobCounts(BaseModel):
+    # 批改任务队列进度（所有批改进程）
+    queued: int = Field(0, description="排队中的任务数")
+    leased: int = Field(0, description="批改中的任务数")
+    done: int = Field(0, description="已完成的任务数")
+    failed: int = Field(0, description="失败的任务数")
+
+
+class GradingCacheStats(BaseModel):
+    # 批改结果缓存统计（命中计数为本进程）
+    memory_hits: int = Field(0, description="进程内缓存命中数")
+    db_hits: int = Field(0, description="数据库缓存命中数")
+    misses: int = Field(0, description="未命中数")
+    hit_rate: float = Field(0.0, description="命中率")
+    stored: int = Field(0, description="写入数据库的条目数")
+    evicted: int = Field(0, description="淘汰的条目数")
+    memory_entries: int = Field(0, description="进程内缓存条数")
+    db_entries: int = Field(0, description="数据库缓存条数")
+    rubric_version: str = Field(..., description="当前评分标准版本")
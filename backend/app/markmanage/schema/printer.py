@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, List
+
+
+class PrintBatchCreate(BaseModel):
+    # 提交打印批次
+    pdf_paths: List[str] = Field(..., description="要打印的PDF文件路径")
+    copies: int = Field(1, description="每个文件的打印份数")
+    printer_name: Optional[str] = Field(None, description="打印机名称，为空时使用默认打印机")
+
+
+class PrintExamCreate(BaseModel):
+    # 打印考试题目
+    copies: int = Field(1, description="打印份数")
+    printer_name: Optional[str] = Field(None, description="打印机名称，为空时使用默认打印机")
+
+
+class PrintClassSetCreate(BaseModel):
+    # 为班级打印考试题目（合并为一个打印任务）
+    class_name: str = Field(..., description="班级名称")
+    with_headers: bool = Field(True, description="是否在每份顶部打印学生ID与用户名")
+    printer_name: Optional[str] = Field(None, description="打印机名称，为空时使用默认打印机")
+
+
+class PrintJobInfo(BaseModel):
+    # 打印任务状态
+    model_config = ConfigDict(from_attributes=True)
+    job_id: int = Field(..., description="任务ID")
+    batch_id: int = Field(..., description="批次ID")
+    printer_name: str = Field(..., description="打印机名称")
+    pdf_path: str = Field(..., description="PDF文件路径")
+    status: str = Field(..., description="任务状态：queued/printing/succeeded/failed")
+    message: str = Field("", description="结果说明")
+    created_at: datetime = Field(..., description="提交时间")
+    started_at: Optional[datetime] = Field(None, description="开始时间")
+    finished_at: Optional[datetime] = Field(None, description="结束时间")
+
+
+class PrintBatchInfo(BaseModel):
+    # 打印批次进度
+    batch_id: int = Field(..., description="批次ID")
+    total: int = Field(..., description="任务总数")
+    queued: int = Field(0, description="排队中的任务数")
+    printing: int = Field(0, description="打印中的任务数")
+    succeeded: int = Field(0, description="已完成的任务数")
+    failed: int = Field(0, description="失败的任务数")
+    done: bool = Field(False, description="批次是否已全部结束")
+    jobs: List[PrintJobInfo] = Field([], description="批次中的打印任务")
+
+
+class PrintClassSetInfo(BaseModel):
+    # 班级套印结果
+    copies: int = Field(..., description="份数（学生人数）")
+    pages_per_copy: int = Field(..., description="每份页数")
+    total_pages: int = Field(..., description="合并PDF总页数（含补齐双面的空白页）")
+    cached: bool = Field(..., description="是否复用了缓存的合并PDF")
+    batch: PrintBatchInfo = Field(..., description="打印批次进度")
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, List
+
+
+class ScanJobCreate(BaseModel):
+    # 提交扫描任务
+    file_name: Optional[str] = Field(None, description="基础PDF文件名")
+    profile: Optional[str] = Field(None, description="扫描输出配置，为空时使用默认配置")
+    split_by: Optional[str] = Field(None, description="答卷分割方式：qr 按封面页二维码，count 按固定页数")
+    pages_per_student: int = Field(2, description="按固定页数分割时每位学生的扫描页数")
+    student_ids: Optional[List[int]] = Field(None, description="按固定页数分割时的学生ID列表（按叠放顺序）")
+    exam_id: Optional[int] = Field(None, description="扫描完成后将答卷登记到该考试")
+
+
+class ScanJobInfo(BaseModel):
+    # 扫描任务状态
+    model_config = ConfigDict(from_attributes=True)
+    job_id: int = Field(..., description="任务ID")
+    status: str = Field(..., description="任务状态：queued/running/succeeded/failed")
+    message: str = Field("", description="结果说明")
+    file_name: Optional[str] = Field(None, description="基础PDF文件名")
+    profile: Optional[str] = Field(None, description="扫描输出配置")
+    exam_id: Optional[int] = Field(None, description="考试ID")
+    created_at: datetime = Field(..., description="提交时间")
+    started_at: Optional[datetime] = Field(None, description="开始时间")
+    finished_at: Optional[datetime] = Field(None, description="结束时间")
+    setup_seconds: Optional[float] = Field(None, description="设备就绪耗时（秒）")
+    pages: int = Field(0, description="扫描页数")
+    dropped_pages: int = Field(0, description="丢弃的空白页数")
+    pdfs: List[str] = Field([], description="生成的PDF路径")
+    paper_ids: List[int] = Field([], description="登记的答卷ID")
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+
+class UploadSessionCreate(BaseModel):
+    # 创建分块上传会话
+    purpose: str = Field(..., description="上传用途：exam 创建考试，paper 登记学生答卷")
+    filename: str = Field(..., description="原始文件名")
+    total_size: int = Field(..., description="文件总大小（字节）")
+    sha256: Optional[str] = Field(None, description="整个文件的SHA-256，完成上传时校验")
+    title: Optional[str] = Field(None, description="考试标题（exam）")
+    subject: Optional[str] = Field(None, description="考试科目（exam）")
+    description: Optional[str] = Field(None, description="考试描述（exam）")
+    time: Optional[datetime] = Field(None, description="考试时间（exam）")
+    creator_id: Optional[int] = Field(None, description="创建者ID（exam）")
+    exam_id: Optional[int] = Field(None, description="考试ID（paper）")
+    student_id: Optional[int] = Field(None, description="学生ID（paper）")
+
+
+class UploadSessionInfo(BaseModel):
+    # 分块上传会话状态
+    upload_id: str = Field(..., description="上传会话ID")
+    purpose: str = Field(..., description="上传用途")
+    filename: str = Field(..., description="原始文件名")
+    total_size: int = Field(..., description="文件总大小（字节）")
+    offset: int = Field(..., description="已确认接收的字节数，下一个分块从此处开始")
+    max_chunk_size: int = Field(..., description="单个分块的最大字节数")
+    complete: bool = Field(..., description="是否已接收全部数据")
+
+
+class UploadFinalizeInfo(BaseModel):
+    # 完成上传的处理结果
+    upload_id: str = Field(..., description="上传会话ID")
+    sha256: str = Field(..., description="文件的SHA-256")
+    page_count: Optional[int] = Field(None, description="PDF页数（无法从交叉引用表读取时为空）")
+    exam_id: Optional[int] = Field(None, description="考试ID")
+    paper_ids: List[int] = Field([], description="新建答卷的ID列表")
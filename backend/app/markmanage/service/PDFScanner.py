@@ -1,16 +1,36 @@
 import os
 import time
 
-import twain
-from PIL import Image
-from io import BytesIO
 import argparse
+import asyncio
+import dataclasses
 import sys
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.app.markmanage.service.connect_scanners.blank_detector import BlankPageDetector
+from backend.app.markmanage.service.connect_scanners.image_sources import NoMoreImagesError, TwainImageSource
+from backend.app.markmanage.service.connect_scanners.profiles import DEFAULT_PROFILE, SCAN_PROFILES, get_profile
+from backend.app.markmanage.service.connect_scanners.scan_journal import DEFAULT_SYNC_EVERY, ScanJournal
+from backend.app.markmanage.service.connect_scanners.sheet_writer import StreamingSheetWriter, encode_page
+from backend.app.markmanage.service.connect_scanners.student_splitter import CoverSheetSplitter, FixedCountSplitter
+from backend.app.markmanage.service.connect_scanners.telemetry import ScanTelemetry, format_summary
+
+
+@dataclasses.dataclass
+class ProcessedPage:
+    """工作线程处理完成的单页结果"""
+
+    encoded: object = None  # EncodedPage，空白页与封面页为None
+    blank_result: object = None  # 空白页检测结果
+    cover_student_id: int | None = None  # 封面页识别出的学生ID
 
 
 class PDFScanner:
-    def __init__(self, scanner_name=None, scan_dir="scans", resolution=300, source="ADF", timeout=30):
+    def __init__(self, scanner_name=None, scan_dir="scans", resolution=300, source="ADF", timeout=30, workers=None,
+                 image_source=None, profile=DEFAULT_PROFILE, drop_blank_pages=False, blank_threshold=0.001,
+                 student_splitter=None, use_journal=True, journal_dir=None, executor=None,
+                 metrics_dir=None, export_metrics=True, journal_sync_every=DEFAULT_SYNC_EVERY):
         """
         初始化PDF扫描仪对象
 
@@ -19,6 +39,18 @@ class PDFScanner:
         :param resolution: 扫描分辨率 (DPI)
         :param source: 扫描来源 (ADF|Flatbed)
         :param timeout: 扫描超时时间（秒）
+        :param workers: 页面解码/压缩线程数，默认为CPU核数（最多4个）
+        :param image_source: 图像来源（ImageSource），默认为TWAIN扫描仪
+        :param profile: 扫描输出配置名称，决定色彩模式与PDF页面编码
+        :param drop_blank_pages: 是否检测并丢弃空白页（如双面扫描的空白背面）
+        :param blank_threshold: 空白页墨迹像素占比阈值
+        :param student_splitter: 学生答卷分割器（StudentSplitter），为None时不按学生分割
+        :param use_journal: 是否将每页写入扫描会话日志，供超时或崩溃后恢复
+        :param journal_dir: 扫描会话目录，默认为扫描目录下的 .sessions
+        :param executor: 共享的页面解码/压缩线程池（多台扫描仪共用），为None时每批次自建线程池
+        :param metrics_dir: 扫描耗时日志与指标文件目录，默认为扫描目录下的 .metrics
+        :param export_metrics: 是否在每批次结束时写出耗时日志与指标文件
+        :param journal_sync_every: 扫描会话日志每记录多少页刷盘一次（每张纸保存时也会刷盘），1 为每页刷盘
         """
         # 设置扫描目录
         self.scan_dir = scan_dir
@@ -28,9 +60,29 @@ class PDFScanner:
         self.resolution = resolution
         self.source = source.upper()
         self.timeout = timeout
-        self.src = None  # TWAIN 扫描源对象
-        self.sm = None  # TWAIN SourceManager 对象
+        self.profile = get_profile(profile)
+        self.default_profile = self.profile  # 未指定输出配置的任务使用构造时的配置
+        self.image_source = image_source  # 图像来源，连接设备时默认创建TWAIN来源
         self.all_pdfs = []  # 存储所有生成的PDF路径
+        self._configured_capabilities = None  # 最近一次写入设备的扫描参数，参数不变时不重复配置
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self.executor = executor
+        # 在途页面上限：每个工作线程至多积压两页，限制解码图像的内存占用
+        self.max_pending_pages = self.workers * 2
+        # 各阶段耗时统计（秒）：transfer/decode/split_detect/blank_check/encode/write/journal/save/retry_wait
+        self.telemetry = ScanTelemetry(
+            metrics_dir=(metrics_dir or os.path.join(self.scan_dir, ".metrics")) if export_metrics else None,
+            device=scanner_name,
+        )
+        # 空白页检测器，未启用时为None
+        self.blank_detector = BlankPageDetector(ink_ratio_threshold=blank_threshold) if drop_blank_pages else None
+        self.dropped_pages = []  # 被丢弃的空白页 (页码, 检测结果)
+        self.student_splitter = student_splitter
+        self.student_papers = []  # 按学生分割生成的答卷 (学生ID, PDF路径)
+        self.use_journal = use_journal
+        self.journal_dir = journal_dir or os.path.join(self.scan_dir, ".sessions")
+        self.journal_sync_every = journal_sync_every
+        self.journal = None  # 当前批次的扫描会话日志
 
         # 验证参数有效性
         self._validate_parameters()
@@ -38,6 +90,11 @@ class PDFScanner:
         # 连接扫描仪设备
         self._connect_to_scanner()
 
+    @property
+    def stage_timings(self):
+        """本批次各阶段耗时记录 {阶段: [秒]}"""
+        return self.telemetry.timings
+
     def _validate_parameters(self):
         """验证初始化参数的有效性"""
         # 验证分辨率
@@ -49,36 +106,45 @@ class PDFScanner:
         if self.source not in valid_sources:
             raise ValueError(f"无效的扫描来源: {self.source}. 应为ADF或Flatbed")
 
+        # 验证工作线程数
+        if self.workers < 1:
+            raise ValueError(f"无效的工作线程数: {self.workers}. 应不小于1")
+
     def _connect_to_scanner(self):
         """连接到指定名称的扫描仪设备"""
         try:
 
-            # 初始化TWAIN环境
-            self.sm = twain.SourceManager(0)
+            # 初始化图像来源（默认TWAIN环境）
+            if self.image_source is None:
+                self.image_source = TwainImageSource()
             available_scanners = self.get_available_scanners()
 
             if not available_scanners:
                 raise RuntimeError("未检测到连接的扫描设备")
 
-            # 寻找匹配设备名称的扫描仪
+            # 寻找匹配设备名称的扫描仪，名称完全一致的设备优先（同型号多台设备时）
             selected_scanner = None
-            for scanner_info in available_scanners:
-                # 如果未指定设备名称，使用第一个设备
-                if self.scanner_name is None:
-                    selected_scanner = scanner_info['name']
-                    break
-
-                # 检查设备名称是否匹配（支持部分匹配）
-                if self.scanner_name.lower() in scanner_info['name'].lower():
-                    selected_scanner = scanner_info['name']
-                    break
+            if self.scanner_name in [scanner_info['name'] for scanner_info in available_scanners]:
+                selected_scanner = self.scanner_name
+            else:
+                for scanner_info in available_scanners:
+                    # 如果未指定设备名称，使用第一个设备
+                    if self.scanner_name is None:
+                        selected_scanner = scanner_info['name']
+                        break
+
+                    # 检查设备名称是否匹配（支持部分匹配）
+                    if self.scanner_name.lower() in scanner_info['name'].lower():
+                        selected_scanner = scanner_info['name']
+                        break
 
             if not selected_scanner:
                 scanners_str = ", ".join([s['name'] for s in available_scanners])
                 raise RuntimeError(f"未找到扫描仪: {self.scanner_name}。可用设备: {scanners_str}")
 
             # 打开选择的扫描仪
-            self.src = self.sm.OpenSource(selected_scanner)
+            self.image_source.open(selected_scanner)
+            self.telemetry.device = selected_scanner
             print(f"✅ 已连接到扫描仪: {selected_scanner}")
 
         except Exception as e:
@@ -86,59 +152,106 @@ class PDFScanner:
 
     def get_available_scanners(self):
         """获取所有可用扫描仪列表"""
-        scanners = []
-        if not self.sm:
-            # 如果SourceManager未初始化，临时创建一个
-            try:
-                temp_sm = twain.SourceManager(0)
-                scanner_names = temp_sm.GetSourceList()
-                scanners = [{"name": name} for name in scanner_names]
-            except:
-                pass
-            return scanners
-
-        # 使用已初始化的SourceManager
-        return [{"name": name} for name in self.sm.GetSourceList()]
+        if not self.image_source:
+            return []
+        return [{"name": name} for name in self.image_source.list_sources()]
 
-    def scan(self, file_name=None):
+    def scan(self, file_name=None, prompt=True, keep_open=False, resume_session=None):
         """
         执行扫描任务并生成PDF文件
 
         :param file_name: 基础文件名（可选）
+        :param prompt: 是否等待用户确认后再开始扫描
+        :param keep_open: 扫描结束后是否保持设备连接，供下一批次直接复用
+        :param resume_session: 要恢复的扫描会话ID或目录，先按会话日志重建PDF，再从最后一页之后继续扫描
         :return: bool 扫描是否成功
         """
         try:
+            # 清空上一批次的结果
+            self._reset_scan_state()
+
+            # 创建或恢复扫描会话
+            file_name = self._open_journal(file_name, resume_session)
+
             # 设置扫描参数
             self._setup_scanner()
 
             # 用户确认提示
-            self._show_scan_prompt()
+            if prompt:
+                self._show_scan_prompt()
 
             # 执行扫描流程
             return self._scan_documents(file_name)
 
         except Exception as e:
             print(f"扫描失败: {str(e)}")
+            self.telemetry.record_error(e)
+            self._report_telemetry(False)
+            if self.journal and self.journal.records:
+                self._print_resume_hint()
             return False
         finally:
-            self._cleanup_resources()
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+            if not keep_open:
+                self._cleanup_resources()
+
+    def _open_journal(self, file_name, resume_session):
+        """
+        创建新的扫描会话，或打开要恢复的会话并沿用其扫描设置
+
+        :return: 本批次使用的基础文件名
+        """
+        if not resume_session:
+            if self.use_journal:
+                self.journal = ScanJournal.create(
+                    self.journal_dir,
+                    file_name=file_name,
+                    sync_every=self.journal_sync_every,
+                    resolution=self.resolution,
+                    source=self.source,
+                    profile=self.profile.name,
+                    splitter=type(self.student_splitter).__name__ if self.student_splitter else None,
+                )
+            return file_name
+
+        self.journal = ScanJournal.open(self.journal_dir, resume_session, self.journal_sync_every)
+        header = self.journal.header
+        splitter = type(self.student_splitter).__name__ if self.student_splitter else None
+        if header.get("splitter") != splitter:
+            raise ValueError(f"答卷分割方式与扫描会话不一致: 会话为 {header.get('splitter')}，当前为 {splitter}")
+        self.resolution = header["resolution"]
+        self.source = header["source"]
+        self.profile = get_profile(header["profile"])
+        print(f"恢复扫描会话 {self.journal.session_id}: 已记录 {self.journal.last_page} 页，"
+              f"请从第 {self.journal.last_page + 1} 页开始继续放入扫描仪")
+        return header["file_name"] if file_name is None else file_name
+
+    def _reset_scan_state(self):
+        """重置单批次的扫描结果与统计"""
+        self.all_pdfs = []
+        self.telemetry.start_batch()
+        self.dropped_pages = []
+        self.student_papers = []
 
     def _setup_scanner(self):
         """配置扫描仪参数"""
-        # 设置基本参数
-        self.src.SetCapability(twain.ICAP_XRESOLUTION, twain.TWTY_UINT16, self.resolution)
-        self.src.SetCapability(twain.ICAP_YRESOLUTION, twain.TWTY_UINT16, self.resolution)
-        self.src.SetCapability(twain.ICAP_PIXELTYPE, twain.TWTY_UINT16, twain.TWPT_RGB)
-
-        # 设置ADF或平板模式
+        capabilities = (self.resolution, self._is_adf(), self.profile.pixel_type)
+        if capabilities == self._configured_capabilities:
+            print(f"复用已配置的扫描参数 (分辨率: {self.resolution} DPI, 来源: {self.source}, "
+                  f"输出配置: {self.profile.name})")
+            return
+
+        # 设置分辨率、色彩模式及ADF或平板模式
+        self.image_source.configure(self.resolution, self._is_adf(), self.profile.pixel_type)
+        self._configured_capabilities = capabilities
         if self._is_adf():
             print("启用自动进纸器 (ADF)")
-            self.src.SetCapability(twain.CAP_FEEDERENABLED, twain.TWTY_BOOL, True)
-            self.src.SetCapability(twain.CAP_AUTOFEED, twain.TWTY_BOOL, True)
         else:
             print("使用平板扫描模式")
 
-        print(f"扫描参数设置完成 (分辨率: {self.resolution} DPI, 来源: {self.source})")
+        print(f"扫描参数设置完成 (分辨率: {self.resolution} DPI, 来源: {self.source}, 输出配置: {self.profile.name})")
 
     def _is_adf(self):
         """检查是否使用ADF模式"""
@@ -152,137 +265,315 @@ class PDFScanner:
             input("请将文档放在平板上，按Enter开始扫描...")
 
     def _scan_documents(self, filename):
-        """执行扫描文档主流程"""
+        """
+        执行扫描文档主流程
+
+        当前线程只负责从扫描仪拉取DIB句柄，页面的解码与压缩交给有界线程池并行处理，
+        写入阶段按页序取回结果追加到纸张PDF，保证输出页序与扫描顺序一致。
+        """
+        self.telemetry.batch_file_name = filename
+        sheet_writer, sheet_count, page_count = self._replay_journal(filename)
         print("开始扫描...")
-        self.src.RequestAcquire(show_ui=False, modal_ui=False)
-        page_count = 0
-        sheet_count = 0
-        current_sheet_images = []
+        self.image_source.acquire()
+        pending_pages = deque()  # 按扫描顺序排列的在途页面 (页码, 句柄, Future)
         scan_complete = False
         start_time = time.time()
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan-page")
 
         try:
             while not scan_complete and (time.time() - start_time < self.timeout):
                 try:
-                    (handle, remaining_count) = self.src.XferImageNatively()
-                    page_count, current_sheet_images = self._process_image(
-                        handle, page_count, current_sheet_images
+                    transfer_start = time.perf_counter()
+                    (handle, remaining_count) = self.image_source.transfer()
+                    page_count += 1
+                    self.telemetry.observe("transfer", time.perf_counter() - transfer_start, page_count)
+                    pending_pages.append(
+                        (page_count, handle, executor.submit(self._process_image, handle, page_count))
                     )
 
+                    # 在途页面达到上限时先写出最早的页面，避免解码结果在内存中堆积
+                    while len(pending_pages) >= self.max_pending_pages:
+                        sheet_writer, sheet_count = self._write_next_page(
+                            pending_pages, sheet_writer, filename, sheet_count
+                        )
+
                     # 处理纸张分割逻辑
                     if not self._is_adf() or remaining_count <= 0:
-                        sheet_count = self._finalize_sheet(
-                            current_sheet_images, filename, sheet_count
+                        sheet_writer, sheet_count = self._drain_pending_pages(
+                            pending_pages, sheet_writer, filename, sheet_count
                         )
-                        current_sheet_images = []
                         scan_complete = self._is_adf() and (remaining_count <= 0)
+                        # 按学生分割时，平板逐页扫描不在页与页之间切分文件
+                        if scan_complete or not self.student_splitter:
+                            sheet_count = self._finalize_sheet(sheet_writer, sheet_count)
+                            sheet_writer = None
 
                 except Exception as e:
-                    scan_complete = self._handle_scan_error(e, current_sheet_images, filename, sheet_count)
+                    sheet_writer, sheet_count = self._drain_pending_pages(
+                        pending_pages, sheet_writer, filename, sheet_count, ignore_errors=True
+                    )
+                    scan_complete = self._handle_scan_error(e, sheet_writer, sheet_count)
                     # if scan_complete:
                     break
 
-            return self._finalize_scan(scan_complete, current_sheet_images, filename, sheet_count)
+            sheet_writer, sheet_count = self._drain_pending_pages(
+                pending_pages, sheet_writer, filename, sheet_count, ignore_errors=True
+            )
+            return self._finalize_scan(scan_complete, sheet_writer, sheet_count)
 
         except KeyboardInterrupt:
-            return self._handle_keyboard_interrupt(current_sheet_images, filename, sheet_count)
+            sheet_writer, sheet_count = self._drain_pending_pages(
+                pending_pages, sheet_writer, filename, sheet_count, ignore_errors=True
+            )
+            return self._handle_keyboard_interrupt(sheet_writer, sheet_count)
+        finally:
+            if executor is not self.executor:
+                executor.shutdown(wait=True)
+
+    def _replay_journal(self, filename):
+        """
+        按扫描会话日志重建已记录的页面
+
+        页面已压缩，直接写回原PDF路径，PDF路径变化处即纸张边界；分割器按原页序重新路由，恢复到中断时的状态。
+        最后一个纸张保持打开，继续扫描的页面接着写入（平板逐页扫描不按学生分割时除外）。
+
+        :return: (当前纸张写入器, 已保存的纸张数, 已记录的最后一页页码)
+        """
+        sheet_writer = None
+        sheet_count = 0
+        if not self.journal or not self.journal.records:
+            return sheet_writer, sheet_count, 0
 
-    def _process_image(self, handle, page_count, current_sheet_images):
-        """处理获取到的扫描图像"""
+        journal, self.journal = self.journal, None  # 重建期间不重复记录
         try:
-            bmp_bytes = twain.DIBToBMFile(handle)
-            img = Image.open(BytesIO(bmp_bytes)).convert("RGB")
-            page_count += 1
-            print(f"已扫描第 {page_count} 页，尺寸: {img.size}")
-            current_sheet_images.append(img)
-            self._close_image_handle(handle)
+            for record in journal.records:
+                if self.student_splitter:
+                    self.student_splitter.route(record["cover_student_id"])
+                page = journal.load_page(record)
+                if page is None:
+                    blank_result = journal.load_blank_result(record)
+                    if blank_result is not None and blank_result.is_blank:
+                        self.dropped_pages.append((record["page"], blank_result))
+                    continue
+
+                if sheet_writer is None or sheet_writer.output_path != record["output_path"]:
+                    sheet_count = self._finalize_sheet(sheet_writer, sheet_count)
+                    sheet_writer = StreamingSheetWriter(
+                        self.scan_dir, filename, sheet_count + 1, self.resolution,
+                        student_id=record["student_id"], output_path=record["output_path"]
+                    )
+                sheet_writer.add_page(page)
+
+            if not self._is_adf() and not self.student_splitter:
+                sheet_count = self._finalize_sheet(sheet_writer, sheet_count)
+                sheet_writer = None
+        finally:
+            self.journal = journal
+
+        print(f"已从扫描会话恢复 {journal.last_page} 页")
+        return sheet_writer, sheet_count, journal.last_page
+
+    def _process_image(self, handle, page_number=None):
+        """
+        解码、检测并压缩扫描图像（在工作线程中执行）
+
+        :param handle: 页面句柄
+        :param page_number: 页码，用于按页统计耗时
+        :return: ProcessedPage，空白页与封面页不压缩
+        """
+        try:
+            with self.telemetry.timer("decode", page_number):
+                img = self.image_source.decode(handle)
+            result = ProcessedPage()
+
+            if self.student_splitter:
+                with self.telemetry.timer("split_detect", page_number):
+                    result.cover_student_id = self.student_splitter.detect(img)
+                if result.cover_student_id is not None:
+                    img.close()
+                    return result
+
+            if self.blank_detector:
+                with self.telemetry.timer("blank_check", page_number):
+                    result.blank_result = self.blank_detector.analyze(img)
+                if result.blank_result.is_blank:
+                    img.close()
+                    return result
+
+            with self.telemetry.timer("encode", page_number):
+                result.encoded = encode_page(img, self.profile)
+            img.close()
+            return result
         except Exception as e:
             print(f"图像处理失败: {str(e)}")
-            self._close_image_handle(handle)
             raise
-        return page_count, current_sheet_images
+
+    def _write_next_page(self, pending_pages, sheet_writer, filename, sheet_count):
+        """
+        等待最早的在途页面处理完成，并写入当前纸张的PDF
+
+        按学生分割时，遇到新学生的第一页会先保存上一位学生的PDF。
+
+        :return: (当前纸张写入器, 已保存的纸张数)
+        """
+        page_number, handle, future = pending_pages.popleft()
+        try:
+            result = future.result()
+        finally:
+            # TWAIN句柄只在传输线程中释放
+            self._close_image_handle(handle)
+
+        student_id = None
+        if self.student_splitter:
+            student_id, new_student, skip_page = self.student_splitter.route(result.cover_student_id)
+            if new_student:
+                sheet_count = self._finalize_sheet(sheet_writer, sheet_count)
+                sheet_writer = None
+            if skip_page:
+                print(f"第 {page_number} 页为学生 {student_id} 的封面页")
+                self._journal_page(page_number, result, student_id)
+                return sheet_writer, sheet_count
+
+        page = result.encoded
+        if page is None:
+            # 空白页不写入PDF，也不进入后续流程
+            self.dropped_pages.append((page_number, result.blank_result))
+            print(f"第 {page_number} 页为空白页，已丢弃 (墨迹占比: {result.blank_result.ink_ratio:.4%})")
+            self._journal_page(page_number, result, student_id)
+            return sheet_writer, sheet_count
+
+        print(f"已扫描第 {page_number} 页，尺寸: {(page.width, page.height)}")
+        if sheet_writer is None:
+            sheet_writer = StreamingSheetWriter(
+                self.scan_dir, filename, sheet_count + 1, self.resolution, student_id=student_id
+            )
+        with self.telemetry.timer("write", page_number):
+            sheet_writer.add_page(page)
+        self._journal_page(page_number, result, student_id, sheet_writer.output_path)
+        return sheet_writer, sheet_count
+
+    def _journal_page(self, page_number, result, student_id, output_path=None):
+        """将页面记录到扫描会话日志"""
+        if self.journal:
+            with self.telemetry.timer("journal", page_number):
+                self.journal.record_page(page_number, result, student_id, output_path)
+
+    def _drain_pending_pages(self, pending_pages, sheet_writer, filename, sheet_count, ignore_errors=False):
+        """按页序写出所有在途页面"""
+        while pending_pages:
+            try:
+                sheet_writer, sheet_count = self._write_next_page(
+                    pending_pages, sheet_writer, filename, sheet_count
+                )
+            except Exception as e:
+                if not ignore_errors:
+                    raise
+                print(f"第 {sheet_count + 1} 张纸有页面写入失败: {str(e)}")
+        return sheet_writer, sheet_count
 
     def _close_image_handle(self, handle):
         """安全关闭图像句柄"""
         try:
-            if handle and self.src:
-                self.src.CloseImageFile(handle)
+            if self.image_source:
+                self.image_source.release(handle)
         except:
             pass
 
-    def _finalize_sheet(self, images, filename, sheet_count):
+    def _finalize_sheet(self, sheet_writer, sheet_count):
         """完成当前纸张的保存"""
-        if images:
+        if sheet_writer and sheet_writer.has_pending_pages:
             sheet_count += 1
-            pdf_path = self._save_sheet_as_pdf(images, filename, sheet_count)
+            pdf_path = self._save_sheet_as_pdf(sheet_writer, sheet_count)
             self.all_pdfs.append(pdf_path)
-            # print(f"已保存第 {sheet_count} 张纸的PDF: {os.path.basename(pdf_path)}")
-            print(f"已保存所有纸张的扫描结果为一个PDF: {os.path.basename(pdf_path)}")
+            if not self.student_splitter:
+                # print(f"已保存第 {sheet_count} 张纸的PDF: {os.path.basename(pdf_path)}")
+                print(f"已保存所有纸张的扫描结果为一个PDF: {os.path.basename(pdf_path)}")
+            elif sheet_writer.student_id is not None and pdf_path:
+                self.student_papers.append((sheet_writer.student_id, pdf_path))
+                print(f"已保存学生 {sheet_writer.student_id} 的答卷PDF: {os.path.basename(pdf_path)}")
+            else:
+                print(f"⚠️ 有 {sheet_writer.page_count} 页无法归属到学生，已单独保存: {pdf_path}")
+            if self.journal:
+                # 每张纸保存后刷盘，断电最多重扫当前这张纸
+                with self.telemetry.timer("journal"):
+                    self.journal.sync()
         return sheet_count
 
-    def _handle_scan_error(self, e, current_sheet_images, filename, sheet_count):
+    def _handle_scan_error(self, e, sheet_writer, sheet_count):
         """处理扫描错误"""
-        if "No more images" in str(e):
-            if current_sheet_images:
-                sheet_count = self._finalize_sheet(current_sheet_images, filename, sheet_count)
+        if isinstance(e, NoMoreImagesError) or "No more images" in str(e):
+            if sheet_writer:
+                sheet_count = self._finalize_sheet(sheet_writer, sheet_count)
             print("所有页面扫描完成")
             return True  # 标记扫描完成
         elif "操作已取消" in str(e):
             print("扫描操作被取消")
             return True
         else:
-            print(f"扫描错误")
-            time.sleep(1)
+            print(f"扫描错误: {str(e)}")
+            self.telemetry.record_error(e)
+            with self.telemetry.timer("retry_wait"):
+                time.sleep(1)
             return False
 
-    def _finalize_scan(self, scan_complete, current_sheet_images, filename, sheet_count):
+    def _finalize_scan(self, scan_complete, sheet_writer, sheet_count):
         """最终处理扫描结果"""
         if not scan_complete:
             print(f"扫描超时 ({self.timeout} 秒)")
-            if current_sheet_images:
-                sheet_count = self._finalize_sheet(current_sheet_images, filename, sheet_count)
+            if sheet_writer:
+                sheet_count = self._finalize_sheet(sheet_writer, sheet_count)
 
-        if not self.all_pdfs:
-            print("未生成任何PDF文件")
-            return False
+        if self.dropped_pages:
+            dropped = ", ".join(str(page_number) for page_number, _ in self.dropped_pages)
+            print(f"共丢弃 {len(self.dropped_pages)} 页空白页: 第 {dropped} 页")
 
-        print(f"成功生成 {len(self.all_pdfs)} 个PDF文件")
-        for pdf in self.all_pdfs:
-            print(f"- {pdf}")
-        return True
+        if self.journal:
+            if scan_complete and self.all_pdfs:
+                self.journal.discard()
+            else:
+                self._print_resume_hint()
 
-    def _handle_keyboard_interrupt(self, current_sheet_images, filename, sheet_count):
+        if not self.all_pdfs:
+            print("未生成任何PDF文件")
+        else:
+            print(f"成功生成 {len(self.all_pdfs)} 个PDF文件")
+            for pdf in self.all_pdfs:
+                print(f"- {pdf}")
+            if self.student_splitter:
+                print(f"按学生分割出 {len(self.student_papers)} 份答卷")
+
+        success = len(self.all_pdfs) > 0
+        self._report_telemetry(success)
+        return success
+
+    def _report_telemetry(self, success):
+        """结束本批次耗时统计，写出日志与指标文件并打印汇总"""
+        record = self.telemetry.finish_batch(success, len(self.stage_timings.get("transfer", [])))
+        if record:
+            print(format_summary(record))
+
+    def _handle_keyboard_interrupt(self, sheet_writer, sheet_count):
         """处理用户中断"""
         print("\n用户通过Ctrl+C终止扫描")
-        if current_sheet_images:
-            sheet_count = self._finalize_sheet(current_sheet_images, filename, sheet_count)
-        return len(self.all_pdfs) > 0
-
-    def _save_sheet_as_pdf(self, images, base_filename, sheet_number):
-        """保存所有扫描的纸张为一个PDF"""
+        if sheet_writer:
+            sheet_count = self._finalize_sheet(sheet_writer, sheet_count)
+        if self.journal:
+            self._print_resume_hint()
+        success = len(self.all_pdfs) > 0
+        self._report_telemetry(success)
+        return success
+
+    def _print_resume_hint(self):
+        """提示如何恢复未完成的扫描会话"""
+        print(f"扫描会话已保留: {self.journal.session_id} (已记录 {self.journal.last_page} 页)，"
+              f"可使用 --resume {self.journal.session_id} 继续扫描")
+
+    def _save_sheet_as_pdf(self, sheet_writer, sheet_number):
+        """结束纸张的流式写入，返回已保存的PDF路径"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            base_name = base_filename or f"scan_{timestamp}"
-            pdf_name = f"{base_name}_sheet{sheet_number}.pdf"
-            output_path = os.path.join(self.scan_dir, pdf_name)
-
-            # 确保PDF名称唯一
-            counter = 1
-            while os.path.exists(output_path):
-                pdf_name = f"{base_name}_sheet{sheet_number}_{counter}.pdf"
-                output_path = os.path.join(self.scan_dir, pdf_name)
-                counter += 1
-
-            images[0].save(
-                output_path,
-                "PDF",
-                resolution=self.resolution,
-                save_all=True,
-                append_images=images[1:],
-                quality=100,
-                subsampling=0
-            )
-            return output_path
+            with self.telemetry.timer("save"):
+                pdf_path = sheet_writer.close()
+            return pdf_path
         except Exception as e:
             print(f"保存第 {sheet_number} 张纸的PDF失败: {str(e)}")
             return None
@@ -290,10 +581,9 @@ class PDFScanner:
     def _cleanup_resources(self):
         """安全清理资源"""
         try:
-            if self.src:
-                self.src = None
-            if self.sm:
-                self.sm = None
+            self._configured_capabilities = None
+            if self.image_source:
+                self.image_source.close()
         except Exception as e:
             print(f"⚠️ 关闭扫描源失败: {str(e)}")
 
@@ -310,9 +600,52 @@ def parse_arguments():
     parser.add_argument("-f", "--file", help="指定基础PDF文件名")
     parser.add_argument("--timeout", type=int, default=60, help="扫描超时时间（秒）")
     parser.add_argument("--scanner", default="ES-580W", help="指定扫描仪设备名称")
+    parser.add_argument("--workers", type=int, default=None, help="页面解码/压缩线程数")
+    parser.add_argument("-p", "--profile", choices=list(SCAN_PROFILES), default=DEFAULT_PROFILE,
+                        help="扫描输出配置（色彩模式与PDF压缩方式）")
+    parser.add_argument("--drop-blank", action="store_true", help="检测并丢弃空白页")
+    parser.add_argument("--blank-threshold", type=float, default=0.001,
+                        help="空白页墨迹像素占比阈值（0-1）")
+    parser.add_argument("--split-by", choices=["qr", "count"], default=None,
+                        help="按学生分割答卷：qr 按封面页二维码/条形码，count 按固定页数")
+    parser.add_argument("--pages-per-student", type=int, default=2,
+                        help="按固定页数分割时每位学生的扫描页数")
+    parser.add_argument("--student-ids", help="按固定页数分割时的学生ID列表（逗号分隔，按叠放顺序）")
+    parser.add_argument("--class-name", help="按固定页数分割时从该班级的学生名单按ID顺序分配")
+    parser.add_argument("--resume", metavar="SESSION", default=None,
+                        help="恢复未完成的扫描会话：按会话日志重建PDF，并从最后一页之后继续扫描")
+    parser.add_argument("--no-journal", action="store_true", help="不记录扫描会话日志")
+    parser.add_argument("--journal-sync-every", type=int, default=DEFAULT_SYNC_EVERY,
+                        help="扫描会话日志每记录多少页刷盘一次（1 为每页刷盘，断电时丢失最少）")
+    parser.add_argument("--exam-id", type=int, default=None,
+                        help="扫描完成后将分割出的答卷登记为该考试的待批改答卷")
     return parser.parse_args()
 
 
+def build_student_splitter(args):
+    """根据命令行参数创建学生答卷分割器"""
+    if args.split_by == "qr":
+        return CoverSheetSplitter()
+    if args.split_by == "count":
+        if args.student_ids:
+            student_ids = [int(student_id) for student_id in args.student_ids.split(",") if student_id.strip()]
+        elif args.class_name:
+            from backend.app.markmanage.service.user_service import user_service
+            student_ids = asyncio.run(user_service.list_student_ids_by_class(args.class_name))
+        else:
+            raise ValueError("按固定页数分割时需指定 --student-ids 或 --class-name")
+        return FixedCountSplitter(args.pages_per_student, student_ids)
+    return None
+
+
+def register_student_papers(exam_id, student_papers):
+    """将分割出的答卷在一个事务中批量登记为待批改答卷"""
+    from backend.app.markmanage.service.paper_service import paper_service
+    paper_ids = asyncio.run(paper_service.ingest_scanned_papers(exam_id, student_papers))
+    print(f"✅ 已登记 {len(paper_ids)} 份待批改答卷 (考试ID: {exam_id})")
+    return paper_ids
+
+
 def main():
     """主程序逻辑"""
     args = parse_arguments()
@@ -324,7 +657,14 @@ def main():
             scan_dir=args.dir,
             source=args.source,
             timeout=args.timeout,
-            resolution=args.res  # 需确保PDFScanner支持此参数
+            resolution=args.res,  # 需确保PDFScanner支持此参数
+            workers=args.workers,
+            profile=args.profile,
+            drop_blank_pages=args.drop_blank,
+            blank_threshold=args.blank_threshold,
+            student_splitter=build_student_splitter(args),
+            use_journal=not args.no_journal,
+            journal_sync_every=args.journal_sync_every
         )
 
         # 显示可用扫描仪列表
@@ -333,7 +673,9 @@ def main():
             print(f"{i}. {scanner_info['name']}")
 
         # 执行扫描
-        success = scanner.scan(file_name=args.file)
+        success = scanner.scan(file_name=args.file, resume_session=args.resume)
+        if success and args.exam_id is not None and scanner.student_papers:
+            register_student_papers(args.exam_id, scanner.student_papers)
         return 0 if success else 1
 
     except Exception as e:
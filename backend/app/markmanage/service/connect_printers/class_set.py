@@ -0,0 +1,187 @@
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+
+from backend.utils.file_service import FileService
+
+# 页眉字体（PDF标准14字体，无需嵌入，仅支持 Latin-1 字符）
+HEADER_FONT_NAME = "/ClassSetHeaderFont"
+HEADER_FONT_SIZE = 9
+HEADER_MARGIN = 18
+
+@dataclasses.dataclass
+class ClassSetResult:
+    """班级套印PDF的生成结果"""
+
+    path: str
+    copies: int
+    pages_per_copy: int
+    total_pages: int
+    file_hash: str
+    cached: bool
+
+
+def _pdf_text(text):
+    """将页眉文字转为PDF字符串字面量（非 Latin-1 字符替换为?）"""
+    data = text.encode("latin-1", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class ClassSetBuilder:
+    """
+    班级套印PDF生成器
+
+    将题目PDF按份数合并为一个PDF，作为一个打印任务发送。第一份的页面从题目PDF复制一次，
+    之后每一份只新建页面字典，内容流、字体与图像等对象全部引用第一份，合并后的文件大小与份数基本无关，
+    打印机也只需处理一次题目中的资源。可为每份叠加学生页眉（学生ID、用户名等）。
+    结果按题目文件的哈希与名单缓存，重复打印同一班级时直接复用。
+    """
+
+    def __init__(self, cache_dir):
+        """
+        :param cache_dir: 合并PDF的缓存目录
+        """
+        self.cache_dir = cache_dir
+
+    def cache_path(self, file_hash, labels=None, copies=None, pad_to_even=True):
+        """按题目哈希与名单计算缓存文件路径"""
+        variant = json.dumps(
+            {"labels": labels, "copies": copies, "pad_to_even": pad_to_even}, ensure_ascii=False, sort_keys=True
+        )
+        variant_hash = hashlib.sha256(variant.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{file_hash}_{variant_hash}.pdf")
+
+    def build(self, questions_path, labels=None, copies=None, pad_to_even=True):
+        """
+        生成班级套印PDF
+
+        :param questions_path: 题目PDF路径
+        :param labels: 每份的页眉文字列表（每位学生一份），为None时不加页眉
+        :param copies: 不加页眉时的份数
+        :param pad_to_even: 每份页数为奇数时补一张空白页，双面打印时每份从新的一张纸开始
+        :return: ClassSetResult
+        """
+        if not os.path.exists(questions_path):
+            raise FileNotFoundError(f"题目文件未找到: {questions_path}")
+        if labels is not None:
+            labels = list(labels)
+            copies = len(labels)
+        if not copies or copies < 1:
+            raise ValueError("打印份数应不小于1")
+
+        try:
+            from pypdf import PdfReader, PdfWriter
+        except ImportError:
+            raise RuntimeError("生成班级套印PDF需要安装 pypdf")
+
+        # 题目文件未变化时使用缓存的哈希，重复打印不再读取整个文件
+        file_hash = FileService.get_file_metadata(questions_path)["hash"]
+        output_path = self.cache_path(file_hash, labels, copies if labels is None else None, pad_to_even)
+        reader = PdfReader(questions_path)
+        pages_per_copy = len(reader.pages)
+        padded = pad_to_even and pages_per_copy % 2 == 1
+        total_pages = (pages_per_copy + padded) * copies
+
+        if os.path.exists(output_path):
+            return ClassSetResult(output_path, copies, pages_per_copy, total_pages, file_hash, cached=True)
+
+        writer = PdfWriter()
+        templates = [writer.add_page(page) for page in reader.pages]
+        # 页面字典的快照，后续各份在此基础上浅复制，避免第一份的页眉被继承
+        snapshots = [{key: value for key, value in page.items() if key != "/Parent"} for page in templates]
+        header = self._header_objects(writer) if labels is not None else None
+
+        for copy_index in range(copies):
+            for template, snapshot in zip(templates, snapshots):
+                if copy_index == 0:
+                    page = template
+                else:
+                    page = self._shallow_page(writer, snapshot)
+                if header is not None:
+                    self._stamp_header(writer, page, snapshot, labels[copy_index], header)
+            if padded:
+                last = templates[-1].mediabox
+                writer.add_blank_page(width=float(last.width), height=float(last.height))
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer.write(f)
+            # mkstemp 创建的文件仅所有者可读，打印程序可能以其他用户运行
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return ClassSetResult(output_path, copies, pages_per_copy, total_pages, file_hash, cached=False)
+
+    @staticmethod
+    def _shallow_page(writer, snapshot):
+        """
+        追加一个引用同一内容与资源对象的页面
+
+        先加入空白页再写入页面字典的各项，避免 add_page 复制页面时重复复制内容流。
+        """
+        from pypdf.generic import NameObject
+
+        page = writer.add_blank_page(width=1, height=1)
+        for key, value in snapshot.items():
+            page[NameObject(key)] = value
+        return page
+
+    @staticmethod
+    def _header_objects(writer):
+        """创建所有页面共用的页眉字体与图形状态保存/恢复内容流"""
+        from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+        font = DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+            NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+        })
+        push = DecodedStreamObject()
+        push.set_data(b"q\n")
+        pop = DecodedStreamObject()
+        pop.set_data(b"\nQ\n")
+        return writer._add_object(font), writer._add_object(push), writer._add_object(pop)
+
+    @staticmethod
+    def _stamp_header(writer, page, snapshot, label, header):
+        """
+        在页面顶部叠加页眉
+
+        原内容流用 q/Q 包围，避免其图形状态影响页眉；资源字典浅复制后加入页眉字体，原字体等对象仍共用。
+        """
+        from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+
+        font_ref, push_ref, pop_ref = header
+        box = page.mediabox
+        x = float(box.left) + HEADER_MARGIN * 2
+        y = float(box.top) - HEADER_MARGIN
+        overlay = DecodedStreamObject()
+        overlay.set_data(
+            b"BT %s %d Tf %.2f %.2f Td %s Tj ET\n"
+            % (HEADER_FONT_NAME.encode(), HEADER_FONT_SIZE, x, y, _pdf_text(label))
+        )
+
+        contents = snapshot.get("/Contents")
+        if contents is None:
+            original = []
+        elif isinstance(contents.get_object(), ArrayObject):
+            original = list(contents.get_object())
+        else:
+            original = [contents]
+        page[NameObject("/Contents")] = ArrayObject([push_ref, *original, pop_ref, writer._add_object(overlay)])
+
+        resources = snapshot.get("/Resources")
+        resources = DictionaryObject(resources.get_object() if resources is not None else {})
+        fonts = resources.get("/Font")
+        fonts = DictionaryObject(fonts.get_object() if fonts is not None else {})
+        fonts[NameObject(HEADER_FONT_NAME)] = font_ref
+        resources[NameObject("/Font")] = fonts
+        page[NameObject("/Resources")] = resources
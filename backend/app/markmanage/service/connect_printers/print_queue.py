@@ -0,0 +1,277 @@
+import asyncio
+import dataclasses
+import itertools
+import os
+import shutil
+from datetime import datetime
+
+
+class PrintError(RuntimeError):
+    """打印命令执行失败"""
+
+    def __init__(self, message, returncode=None):
+        super().__init__(message)
+        self.returncode = returncode
+
+
+@dataclasses.dataclass
+class PrintJob:
+    """打印任务"""
+
+    job_id: int
+    batch_id: int
+    printer_name: str
+    pdf_path: str
+
+    status: str = "queued"  # queued / printing / succeeded / failed
+    message: str = ""
+    returncode: int | None = None
+    created_at: datetime = dataclasses.field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class PrintBackend:
+    """
+    打印后端接口
+
+    send 将一个PDF发送到打印机，成功时返回，失败时抛出 PrintError。
+    """
+
+    name = "base"
+
+    async def send(self, pdf_path, printer_name):
+        """
+        发送打印任务
+
+        :param pdf_path: PDF文件路径
+        :param printer_name: 打印机名称
+        :return: 后端返回的说明信息
+        """
+        raise NotImplementedError
+
+
+class SubprocessBackend(PrintBackend):
+    """通过命令行程序提交打印任务的后端"""
+
+    def __init__(self, timeout=120):
+        """
+        :param timeout: 单个打印命令的超时时间（秒）
+        """
+        self.timeout = timeout
+
+    def build_command(self, pdf_path, printer_name):
+        """构造打印命令"""
+        raise NotImplementedError
+
+    async def send(self, pdf_path, printer_name):
+        process = await asyncio.create_subprocess_exec(
+            *self.build_command(pdf_path, printer_name),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise PrintError(f"打印命令超时 ({self.timeout} 秒)", process.returncode)
+
+        if process.returncode != 0:
+            error = stderr.decode(errors="ignore").strip() or stdout.decode(errors="ignore").strip()
+            raise PrintError(f"打印命令返回 {process.returncode}: {error}", process.returncode)
+        return stdout.decode(errors="ignore").strip()
+
+
+class PDFtoPrinterBackend(SubprocessBackend):
+    """Windows 下通过 PDFtoPrinter.exe 打印（默认双面）"""
+
+    name = "pdftoprinter"
+
+    def __init__(self, exe_path, timeout=120):
+        """
+        :param exe_path: PDFtoPrinter.exe 的完整路径
+        :param timeout: 单个打印命令的超时时间（秒）
+        """
+        super().__init__(timeout)
+        if not os.path.exists(exe_path):
+            raise FileNotFoundError(f"PDFtoPrinter.exe 未找到: {exe_path}")
+        self.exe_path = exe_path
+
+    def build_command(self, pdf_path, printer_name):
+        return [self.exe_path, pdf_path, printer_name]
+
+
+class CupsBackend(SubprocessBackend):
+    """Linux/macOS 下通过 CUPS 的 lp 命令打印"""
+
+    name = "cups"
+
+    def __init__(self, lp_path="lp", options=("sides=two-sided-long-edge",), timeout=120):
+        """
+        :param lp_path: lp 命令路径
+        :param options: 传给 lp -o 的打印选项，默认长边双面
+        :param timeout: 单个打印命令的超时时间（秒）
+        """
+        super().__init__(timeout)
+        self.lp_path = lp_path
+        self.options = list(options)
+
+    def build_command(self, pdf_path, printer_name):
+        command = [self.lp_path, "-d", printer_name]
+        for option in self.options:
+            command += ["-o", option]
+        command.append(pdf_path)
+        return command
+
+
+class FileSpoolBackend(PrintBackend):
+    """
+    文件假脱机后端（测试与演示用）
+
+    不连接打印机，将PDF复制到 spool_dir/打印机名称/ 目录下，可模拟打印耗时。
+    """
+
+    name = "spool"
+
+    def __init__(self, spool_dir, delay=0.0):
+        """
+        :param spool_dir: 假脱机目录
+        :param delay: 模拟每个任务的打印耗时（秒）
+        """
+        self.spool_dir = spool_dir
+        self.delay = delay
+        self._sequence = itertools.count(1)
+
+    async def send(self, pdf_path, printer_name):
+        printer_dir = os.path.join(self.spool_dir, printer_name)
+        target = os.path.join(printer_dir, f"{next(self._sequence):06d}_{os.path.basename(pdf_path)}")
+        await asyncio.to_thread(os.makedirs, printer_dir, exist_ok=True)
+        await asyncio.to_thread(shutil.copyfile, pdf_path, target)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return target
+
+
+class PrintQueue:
+    """
+    异步打印队列
+
+    提交后立即返回任务，任务在事件循环中后台执行；每台打印机的并发任务数由信号量限制，
+    同一批次的任务可按批次查询进度。
+    """
+
+    def __init__(self, backend, max_concurrent_per_printer=1, max_history=1000):
+        """
+        :param backend: 打印后端（PrintBackend）
+        :param max_concurrent_per_printer: 每台打印机同时执行的任务数
+        :param max_history: 保留的已结束任务数
+        """
+        if max_concurrent_per_printer < 1:
+            raise ValueError(f"无效的打印并发数: {max_concurrent_per_printer}. 应不小于1")
+        self.backend = backend
+        self.max_concurrent_per_printer = max_concurrent_per_printer
+        self.max_history = max_history
+
+        self._jobs = {}
+        self._batches = {}  # 批次ID -> [任务ID]
+        self._tasks = {}  # 任务ID -> asyncio.Task
+        self._semaphores = {}
+        self._job_ids = itertools.count(1)
+        self._batch_ids = itertools.count(1)
+
+    def _get_semaphore(self, printer_name):
+        if printer_name not in self._semaphores:
+            self._semaphores[printer_name] = asyncio.Semaphore(self.max_concurrent_per_printer)
+        return self._semaphores[printer_name]
+
+    def submit_batch(self, pdf_paths, printer_name):
+        """
+        提交一批打印任务（需在事件循环中调用），立即返回
+
+        :param pdf_paths: PDF文件路径列表
+        :param printer_name: 打印机名称
+        :return: (批次ID, [PrintJob])
+        """
+        missing = [path for path in pdf_paths if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(f"PDF 文件未找到: {missing[0]}")
+
+        batch_id = next(self._batch_ids)
+        jobs = []
+        for pdf_path in pdf_paths:
+            job = PrintJob(job_id=next(self._job_ids), batch_id=batch_id, printer_name=printer_name,
+                           pdf_path=pdf_path)
+            self._jobs[job.job_id] = job
+            self._tasks[job.job_id] = asyncio.create_task(self._run_job(job))
+            jobs.append(job)
+        self._batches[batch_id] = [job.job_id for job in jobs]
+        self._trim_history()
+        return batch_id, jobs
+
+    def submit(self, pdf_path, printer_name):
+        """提交单个打印任务，返回 PrintJob"""
+        _, jobs = self.submit_batch([pdf_path], printer_name)
+        return jobs[0]
+
+    def get_job(self, job_id):
+        """获取打印任务"""
+        return self._jobs.get(job_id)
+
+    def get_batch_jobs(self, batch_id):
+        """获取批次中的打印任务，批次不存在时返回None"""
+        if batch_id not in self._batches:
+            return None
+        return [self._jobs[job_id] for job_id in self._batches[batch_id] if job_id in self._jobs]
+
+    def batch_progress(self, batch_id):
+        """
+        批次进度
+
+        :return: dict 各状态的任务数，批次不存在时返回None
+        """
+        jobs = self.get_batch_jobs(batch_id)
+        if jobs is None:
+            return None
+        progress = {"batch_id": batch_id, "total": len(jobs), "queued": 0, "printing": 0, "succeeded": 0,
+                    "failed": 0}
+        for job in jobs:
+            progress[job.status] += 1
+        progress["done"] = progress["succeeded"] + progress["failed"] == progress["total"]
+        return progress
+
+    async def wait_batch(self, batch_id):
+        """等待批次中所有任务结束"""
+        tasks = [self._tasks[job_id] for job_id in self._batches.get(batch_id, []) if job_id in self._tasks]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return self.batch_progress(batch_id)
+
+    def _trim_history(self):
+        """只保留最近的已结束任务"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("succeeded", "failed")]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+            self._tasks.pop(job_id, None)
+        for batch_id in [batch_id for batch_id, job_ids in self._batches.items()
+                         if not any(job_id in self._jobs for job_id in job_ids)]:
+            del self._batches[batch_id]
+
+    async def _run_job(self, job):
+        """执行打印任务"""
+        async with self._get_semaphore(job.printer_name):
+            job.status = "printing"
+            job.started_at = datetime.now()
+            print(f"🖨️ 正在发送打印任务 {job.job_id}: {job.pdf_path} -> {job.printer_name}")
+            try:
+                job.message = await self.backend.send(job.pdf_path, job.printer_name) or ""
+                job.status = "succeeded"
+                job.returncode = 0
+            except Exception as e:
+                job.status = "failed"
+                job.message = str(e)
+                job.returncode = getattr(e, "returncode", None)
+                print(f"❌ 打印任务 {job.job_id} 失败: {str(e)}")
+            finally:
+                job.finished_at = datetime.now()
+                self._tasks.pop(job.job_id, None)
@@ -0,0 +1,269 @@
+"""
+扫描流水线吞吐量基准测试
+
+使用目录回放或合成页面代替扫描仪，完整执行 _scan_documents → _save_sheet_as_pdf 流程，
+报告每秒页数、各阶段延迟及进程峰值内存，可在没有TWAIN驱动的Linux服务器上运行。
+使用 --compare-profiles 时改为对比各扫描输出配置的单页文件大小与编码耗时，
+使用 --compare-dib 时改为对比DIB经BMP文件解码与直接映射像素内存两种转换方式的单页耗时。
+
+用法:
+    python -m backend.app.markmanage.service.connect_scanners.benchmark --pages 100 --workers 4
+    python -m backend.app.markmanage.service.connect_scanners.benchmark --replay-dir ./samples --repeat 5
+    python -m backend.app.markmanage.service.connect_scanners.benchmark --compare-profiles --pages 5
+    python -m backend.app.markmanage.service.connect_scanners.benchmark --compare-dib --rounds 5
+"""
+import argparse
+import struct
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from backend.app.markmanage.service.PDFScanner import PDFScanner
+from backend.app.markmanage.service.connect_scanners.image_sources import (
+    DirectoryImageSource,
+    NoMoreImagesError,
+    SyntheticImageSource,
+)
+from backend.app.markmanage.service.connect_scanners.dib import dib_to_image, parse_dib_header
+from backend.app.markmanage.service.connect_scanners.profiles import DEFAULT_PROFILE, SCAN_PROFILES
+from backend.app.markmanage.service.connect_scanners.sheet_writer import encode_page
+from backend.app.markmanage.service.connect_scanners.telemetry import percentile, summarize_stages
+
+
+def get_peak_rss_mb():
+    """获取进程峰值常驻内存（MB），平台不支持时返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 下单位为KB，macOS 下单位为字节
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def run_benchmark(image_source, resolution=300, workers=None, output_dir=None, profile=DEFAULT_PROFILE,
+                  drop_blank_pages=False):
+    """
+    执行一次基准测试
+
+    :param image_source: 图像来源（ImageSource）
+    :param resolution: 扫描分辨率 (DPI)
+    :param workers: 页面解码/压缩线程数
+    :param output_dir: PDF输出目录，为None时使用临时目录
+    :param profile: 扫描输出配置名称
+    :param drop_blank_pages: 是否检测并丢弃空白页
+    :return: dict 测试结果
+    """
+    with tempfile.TemporaryDirectory(prefix="scan_bench_") as temp_dir:
+        scanner = PDFScanner(
+            scanner_name=None,
+            scan_dir=output_dir or temp_dir,
+            resolution=resolution,
+            source="ADF",
+            timeout=3600,
+            workers=workers,
+            image_source=image_source,
+            profile=profile,
+            drop_blank_pages=drop_blank_pages,
+            export_metrics=output_dir is not None,
+        )
+
+        start = time.perf_counter()
+        success = scanner.scan(file_name="benchmark", prompt=False)
+        elapsed = time.perf_counter() - start
+
+    pages = len(scanner.stage_timings.get("transfer", []))
+    return {
+        "success": success,
+        "pages": pages,
+        "dropped_pages": len(scanner.dropped_pages),
+        "elapsed_s": elapsed,
+        "pages_per_sec": pages / elapsed if elapsed > 0 else 0.0,
+        "workers": scanner.workers,
+        "profile": scanner.profile.name,
+        "stages": summarize_stages(scanner.stage_timings),
+        "peak_rss_mb": get_peak_rss_mb(),
+    }
+
+
+def compare_profiles(image_source, resolution=300, sample_pages=5):
+    """
+    对比各扫描输出配置的单页文件大小与编码耗时
+
+    :param image_source: 图像来源（ImageSource）
+    :param resolution: 扫描分辨率 (DPI)
+    :param sample_pages: 参与对比的样本页数
+    :return: dict 配置名称 -> 统计结果
+    """
+    image_source.open(None)
+    image_source.configure(resolution, True)
+    image_source.acquire()
+    samples = []
+    try:
+        while len(samples) < sample_pages:
+            handle, _ = image_source.transfer()
+            samples.append(image_source.decode(handle))
+            image_source.release(handle)
+    except NoMoreImagesError:
+        pass
+
+    results = {}
+    for name in SCAN_PROFILES:
+        sizes = []
+        timings = []
+        for img in samples:
+            start = time.perf_counter()
+            page = encode_page(img, name)
+            timings.append(time.perf_counter() - start)
+            sizes.append(len(page.stream))
+        if samples:
+            results[name] = {
+                "pages": len(samples),
+                "avg_kb": sum(sizes) / len(sizes) / 1024,
+                "avg_encode_ms": sum(timings) / len(timings) * 1000,
+            }
+    return results
+
+
+def _make_dib(img):
+    """将页面图像保存为BMP并去掉文件头，得到与TWAIN原生传输相同的DIB内存"""
+    buffer = BytesIO()
+    img.save(buffer, "BMP")
+    return bytearray(buffer.getbuffer()[14:])
+
+
+def _decode_via_bmp_file(dib):
+    """原转换方式：补齐BMP文件头后经BytesIO与BMP解码器读取（与 twain.DIBToBMFile 相同的路径）"""
+    file_header = struct.pack("<2sIHHI", b"BM", 14 + len(dib), 0, 0, 14 + parse_dib_header(dib).pixel_offset)
+    bmp_bytes = file_header + bytes(dib)
+    img = Image.open(BytesIO(bmp_bytes))
+    img.load()
+    return img
+
+
+def compare_dib_conversion(resolutions=(300, 600), rounds=5):
+    """
+    对比DIB到PIL图像的两种转换方式的单页耗时
+
+    :param resolutions: 参与对比的分辨率 (DPI)
+    :param rounds: 每种组合的重复次数，取中位数
+    :return: list[dict] 每个分辨率与色彩模式的对比结果
+    """
+    results = []
+    for resolution in resolutions:
+        source = SyntheticImageSource(page_count=1)
+        source.configure(resolution, True)
+        page = source.decode(0)
+        for pixel_type, mode in (("RGB", "RGB"), ("GRAY", "L")):
+            dib = _make_dib(page.convert(mode))
+            timings = {"bmp_file": [], "direct": []}
+            for _ in range(rounds):
+                for name, convert in (("bmp_file", _decode_via_bmp_file), ("direct", dib_to_image)):
+                    start = time.perf_counter()
+                    img = convert(dib)
+                    timings[name].append(time.perf_counter() - start)
+                    img.close()
+            bmp_ms = percentile(timings["bmp_file"], 50) * 1000
+            direct_ms = percentile(timings["direct"], 50) * 1000
+            results.append({
+                "resolution": resolution,
+                "pixel_type": pixel_type,
+                "size": page.size,
+                "dib_mb": len(dib) / (1024 * 1024),
+                "bmp_file_ms": bmp_ms,
+                "direct_ms": direct_ms,
+                "saved_ms": bmp_ms - direct_ms,
+            })
+    return results
+
+
+def print_dib_report(results):
+    """打印DIB转换方式对比报告"""
+    print("\n======= DIB转换方式对比（每页，中位数） =======")
+    print(f"{'分辨率':<8}{'色彩':<6}{'DIB(MB)':>10}{'BMP文件(ms)':>14}{'直接映射(ms)':>14}{'节省(ms)':>10}")
+    for stats in results:
+        print(f"{stats['resolution']:<8}{stats['pixel_type']:<6}{stats['dib_mb']:>10.1f}{stats['bmp_file_ms']:>14.2f}"
+              f"{stats['direct_ms']:>14.2f}{stats['saved_ms']:>10.2f}")
+
+
+def print_profile_report(results):
+    """打印扫描输出配置对比报告"""
+    print("\n======= 扫描输出配置对比（每页） =======")
+    baseline = results.get(DEFAULT_PROFILE)
+    print(f"{'配置':<16}{'大小(KB)':>12}{'相对存档':>10}{'编码(ms)':>12}  说明")
+    for name, stats in results.items():
+        ratio = stats["avg_kb"] / baseline["avg_kb"] if baseline else 1.0
+        print(f"{name:<16}{stats['avg_kb']:>12.1f}{ratio:>10.1%}{stats['avg_encode_ms']:>12.2f}  "
+              f"{SCAN_PROFILES[name].description}")
+
+
+def print_report(result):
+    """打印基准测试报告"""
+    print("\n======= 扫描流水线基准测试 =======")
+    print(f"页数: {result['pages']}  工作线程: {result['workers']}  输出配置: {result['profile']}  "
+          f"总耗时: {result['elapsed_s']:.2f} 秒")
+    print(f"吞吐量: {result['pages_per_sec']:.2f} 页/秒 ({result['pages_per_sec'] * 60:.1f} 页/分钟)")
+    if result["dropped_pages"]:
+        print(f"丢弃空白页: {result['dropped_pages']}")
+    print(f"{'阶段':<10}{'次数':>8}{'平均(ms)':>12}{'P50(ms)':>12}{'P95(ms)':>12}{'最大(ms)':>12}")
+    for stage, stats in result["stages"].items():
+        print(f"{stage:<10}{stats['count']:>8}{stats['mean_ms']:>12.2f}{stats['p50_ms']:>12.2f}"
+              f"{stats['p95_ms']:>12.2f}{stats['max_ms']:>12.2f}")
+    peak_rss = result["peak_rss_mb"]
+    print(f"峰值内存: {peak_rss:.1f} MB" if peak_rss is not None else "峰值内存: 当前平台不支持统计")
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="扫描流水线吞吐量基准测试")
+    parser.add_argument("--replay-dir", help="回放该目录中的页面图像，不指定时使用合成页面")
+    parser.add_argument("--repeat", type=int, default=1, help="目录回放次数")
+    parser.add_argument("--pages", type=int, default=50, help="合成页面数")
+    parser.add_argument("--ppm", type=int, default=None, help="模拟设备额定速度（页/分钟）")
+    parser.add_argument("-r", "--res", type=int, default=300, help="扫描分辨率 (DPI)")
+    parser.add_argument("--workers", type=int, default=None, help="页面解码/压缩线程数")
+    parser.add_argument("-d", "--dir", default=None, help="保留输出PDF的目录（默认使用临时目录）")
+    parser.add_argument("-p", "--profile", choices=list(SCAN_PROFILES), default=DEFAULT_PROFILE,
+                        help="扫描输出配置")
+    parser.add_argument("--blank-backs", action="store_true", help="合成页面中偶数页为空白背面")
+    parser.add_argument("--drop-blank", action="store_true", help="检测并丢弃空白页")
+    parser.add_argument("--compare-profiles", action="store_true", help="对比各扫描输出配置的单页大小与编码耗时")
+    parser.add_argument("--compare-dib", action="store_true", help="对比300/600 DPI下两种DIB转换方式的单页耗时")
+    parser.add_argument("--rounds", type=int, default=5, help="DIB转换对比的重复次数")
+    return parser.parse_args()
+
+
+def main():
+    """主程序逻辑"""
+    args = parse_arguments()
+
+    if args.compare_dib:
+        print_dib_report(compare_dib_conversion(rounds=args.rounds))
+        return 0
+
+    if args.replay_dir:
+        image_source = DirectoryImageSource(args.replay_dir, repeat=args.repeat)
+    else:
+        image_source = SyntheticImageSource(
+            page_count=args.pages, pages_per_minute=args.ppm, blank_backs=args.blank_backs
+        )
+
+    if args.compare_profiles:
+        print_profile_report(compare_profiles(image_source, resolution=args.res, sample_pages=args.pages))
+        return 0
+
+    result = run_benchmark(
+        image_source, resolution=args.res, workers=args.workers, output_dir=args.dir, profile=args.profile,
+        drop_blank_pages=args.drop_blank
+    )
+    print_report(result)
+    return 0 if result["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+多扫描仪协同扫描
+
+同一台电脑连接多台扫描仪时，每台设备由独立的采集线程打开并拉取页面，
+所有设备的页面共用一个解码/压缩线程池。扫描批次放入共享队列，由空闲的设备依次领取，
+扫描结束后按设备汇总每分钟页数。
+
+用法（每台设备的进纸器中各放好一叠答卷）:
+    python -m backend.app.markmanage.service.connect_scanners.coordinator --scanner ES-580W -f class1
+"""
+import argparse
+import dataclasses
+import itertools
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from backend.app.markmanage.service.connect_scanners.image_sources import TwainImageSource
+from backend.app.markmanage.service.connect_scanners.profiles import DEFAULT_PROFILE, SCAN_PROFILES, get_profile
+from backend.app.markmanage.service.connect_scanners.scan_daemon import ScanJob, execute_scan_job
+
+
+@dataclasses.dataclass
+class DeviceStats:
+    """单台扫描仪的运行统计"""
+
+    name: str
+    status: str = "connecting"  # connecting / idle / busy / error / stopped
+    batches: int = 0
+    pages: int = 0
+    busy_seconds: float = 0.0
+    error: str = ""
+
+    @property
+    def pages_per_minute(self):
+        """设备扫描期间的每分钟页数"""
+        return self.pages / self.busy_seconds * 60 if self.busy_seconds > 0 else 0.0
+
+
+def discover_scanners(name_filter=None, image_source=None):
+    """
+    列出匹配名称的所有扫描仪
+
+    :param name_filter: 设备名称（支持部分匹配），为None时返回全部设备
+    :param image_source: 用于列出设备的图像来源，默认为TWAIN
+    :return: 设备名称列表
+    """
+    image_source = image_source or TwainImageSource()
+    names = image_source.list_sources()
+    if name_filter is None:
+        return list(names)
+    return [name for name in names if name_filter.lower() in name.lower()]
+
+
+class ScannerCoordinator:
+    """
+    多扫描仪协同调度
+
+    每台设备一个采集线程，线程内创建并持有该设备的 PDFScanner（TWAIN调用不跨线程），
+    批次完成后设备保持连接并回到共享队列领取下一批次。
+    """
+
+    def __init__(self, device_names, scanner_factory, workers=None, paper_ingest=None, loop=None):
+        """
+        :param device_names: 参与扫描的设备名称列表
+        :param scanner_factory: 可调用对象 (设备名称, 共享线程池) -> 已连接的 PDFScanner
+        :param workers: 共享解码/压缩线程数，默认为CPU核数（最多8个）
+        :param paper_ingest: 登记答卷的协程函数 (exam_id, student_papers) -> paper_ids，为None时不登记
+        :param loop: 执行登记协程的事件循环，为None时在采集线程中新建
+        """
+        if not device_names:
+            raise ValueError("没有可用的扫描设备")
+        self.scanner_factory = scanner_factory
+        self.paper_ingest = paper_ingest
+        self.loop = loop
+        self.workers = workers if workers is not None else min(8, os.cpu_count() or 1)
+        self.devices = [DeviceStats(name) for name in device_names]
+
+        self._executor = None
+        self._threads = []
+        self._jobs = {}
+        self._queue = queue.Queue()
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._started_at = None
+
+    def start(self):
+        """打开所有设备并启动采集线程"""
+        if self._threads:
+            return
+        self._started_at = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan-page")
+        for index, stats in enumerate(self.devices):
+            thread = threading.Thread(
+                target=self._device_worker, args=(stats,), name=f"scan-capture-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, **options):
+        """
+        提交扫描批次，由第一台空闲的设备领取
+
+        :param options: ScanJob 的任务参数（file_name、profile、split_by 等）
+        :return: ScanJob
+        """
+        if options.get("profile"):
+            get_profile(options["profile"])
+        with self._lock:
+            job = ScanJob(job_id=next(self._job_ids), **options)
+            self._jobs[job.job_id] = job
+        self._queue.put(job.job_id)
+        self.start()
+        return job
+
+    def get_job(self, job_id):
+        """获取批次"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        """按提交顺序列出批次"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def wait(self, poll_interval=0.2):
+        """
+        等待所有已提交的批次结束
+
+        所有设备都已不可用时，剩余批次标记为失败。
+        """
+        while True:
+            pending = [job for job in self.list_jobs() if job.status in ("queued", "running")]
+            if not pending:
+                return
+            if not any(thread.is_alive() for thread in self._threads):
+                for job in pending:
+                    job.status = "failed"
+                    job.message = "没有可用的扫描设备"
+                return
+            time.sleep(poll_interval)
+
+    def stop(self):
+        """处理完已领取的批次后断开所有设备"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def report(self):
+        """
+        汇总扫描吞吐量
+
+        :return: dict 总页数、总体每分钟页数及各设备统计
+        """
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        total_pages = sum(stats.pages for stats in self.devices)
+        return {
+            "elapsed_s": elapsed,
+            "total_pages": total_pages,
+            "pages_per_minute": total_pages / elapsed * 60 if elapsed > 0 else 0.0,
+            "devices": [
+                {
+                    "name": stats.name,
+                    "status": stats.status,
+                    "batches": stats.batches,
+                    "pages": stats.pages,
+                    "busy_s": stats.busy_seconds,
+                    "pages_per_minute": stats.pages_per_minute,
+                    "error": stats.error,
+                }
+                for stats in self.devices
+            ],
+        }
+
+    def _device_worker(self, stats):
+        """采集线程：连接设备后循环领取批次"""
+        try:
+            scanner = self.scanner_factory(stats.name, self._executor)
+        except Exception as e:
+            stats.status = "error"
+            stats.error = str(e)
+            print(f"❌ 扫描仪 {stats.name} 连接失败: {str(e)}")
+            return
+
+        stats.status = "idle"
+        try:
+            while True:
+                job_id = self._queue.get()
+                if job_id is None:
+                    break
+                job = self.get_job(job_id)
+                if job:
+                    self._run_job(scanner, stats, job)
+        finally:
+            scanner._cleanup_resources()
+            if stats.status != "error":
+                stats.status = "stopped"
+
+    def _run_job(self, scanner, stats, job):
+        """在指定设备上执行一个批次"""
+        print(f"扫描仪 {stats.name} 开始扫描批次 {job.job_id}")
+        job.device = stats.name
+        job.status = "running"
+        job.started_at = datetime.now()
+        stats.status = "busy"
+        busy_start = time.perf_counter()
+        try:
+            execute_scan_job(scanner, job, self.paper_ingest, self.loop)
+        except Exception as e:
+            job.status = "failed"
+            job.message = str(e)
+        finally:
+            job.finished_at = datetime.now()
+            stats.busy_seconds += time.perf_counter() - busy_start
+            stats.pages += job.pages
+            stats.batches += 1
+            stats.status = "idle"
+
+
+def print_report(report, jobs):
+    """打印协同扫描报告"""
+    print("\n======= 多扫描仪协同扫描 =======")
+    for job in jobs:
+        print(f"批次 {job.job_id}: {job.device or '-'} {job.status} {job.pages} 页 {job.message}")
+    print(f"{'设备':<24}{'状态':<10}{'批次':>6}{'页数':>8}{'扫描(秒)':>10}{'页/分钟':>10}")
+    for device in report["devices"]:
+        print(f"{device['name']:<24}{device['status']:<10}{device['batches']:>6}{device['pages']:>8}"
+              f"{device['busy_s']:>10.1f}{device['pages_per_minute']:>10.1f}")
+    print(f"合计: {report['total_pages']} 页，耗时 {report['elapsed_s']:.1f} 秒，"
+          f"{report['pages_per_minute']:.1f} 页/分钟")
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="多扫描仪协同扫描")
+    parser.add_argument("--scanner", default="ES-580W", help="参与扫描的设备名称（部分匹配，匹配到的设备全部使用）")
+    parser.add_argument("-d", "--dir", default="scans", help="扫描文件保存目录")
+    parser.add_argument("-r", "--res", type=int, default=300,
+                        choices=range(75, 1201), metavar="[75-1200]",
+                        help="扫描分辨率 (DPI)")
+    parser.add_argument("-s", "--source", choices=["ADF", "Flatbed"], default="ADF", help="扫描来源")
+    parser.add_argument("-f", "--file", default=None, help="基础PDF文件名，各批次追加批次序号")
+    parser.add_argument("--batches", type=int, default=None, help="扫描批次数，默认每台设备一批")
+    parser.add_argument("--timeout", type=int, default=60, help="单批次扫描超时时间（秒）")
+    parser.add_argument("--workers", type=int, default=None, help="所有设备共用的页面解码/压缩线程数")
+    parser.add_argument("-p", "--profile", choices=list(SCAN_PROFILES), default=DEFAULT_PROFILE,
+                        help="扫描输出配置（色彩模式与PDF压缩方式）")
+    parser.add_argument("--drop-blank", action="store_true", help="检测并丢弃空白页")
+    return parser.parse_args()
+
+
+def main():
+    """主程序逻辑"""
+    from backend.app.markmanage.service.PDFScanner import PDFScanner
+
+    args = parse_arguments()
+    try:
+        device_names = discover_scanners(args.scanner)
+    except Exception as e:
+        print(f"❌ 获取扫描仪列表失败: {str(e)}", file=sys.stderr)
+        return 1
+    if not device_names:
+        print(f"❌ 未找到扫描仪: {args.scanner}", file=sys.stderr)
+        return 1
+    print(f"🖨️ 参与扫描的设备: {', '.join(device_names)}")
+
+    def scanner_factory(device_name, executor):
+        return PDFScanner(
+            scanner_name=device_name,
+            scan_dir=args.dir,
+            resolution=args.res,
+            source=args.source,
+            timeout=args.timeout,
+            profile=args.profile,
+            drop_blank_pages=args.drop_blank,
+            executor=executor,
+        )
+
+    coordinator = ScannerCoordinator(device_names, scanner_factory, workers=args.workers)
+    batches = args.batches or len(device_names)
+    jobs = []
+    for index in range(1, batches + 1):
+        file_name = f"{args.file}_batch{index}" if args.file else None
+        jobs.append(coordinator.submit(file_name=file_name))
+
+    try:
+        coordinator.wait()
+    finally:
+        coordinator.stop()
+    print_report(coordinator.report(), jobs)
+    return 0 if all(job.status == "succeeded" for job in jobs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
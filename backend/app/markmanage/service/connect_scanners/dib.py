@@ -0,0 +1,117 @@
+import dataclasses
+import struct
+
+from PIL import Image
+
+BITMAPINFOHEADER_SIZE = 40
+BI_RGB = 0
+BI_BITFIELDS = 3
+
+
+@dataclasses.dataclass
+class DibHeader:
+    """DIB (BITMAPINFOHEADER) 头信息"""
+
+    header_size: int
+    width: int
+    height: int  # 正数为自下而上存储，负数为自上而下存储
+    bit_count: int
+    compression: int
+    colors_used: int
+
+    @property
+    def bottom_up(self):
+        return self.height > 0
+
+    @property
+    def stride(self):
+        """每行字节数，按4字节对齐"""
+        return (self.width * self.bit_count + 31) // 32 * 4
+
+    @property
+    def palette_size(self):
+        """调色板条目数"""
+        if self.bit_count > 8:
+            return 0
+        return self.colors_used or (1 << self.bit_count)
+
+    @property
+    def pixel_offset(self):
+        """像素数据相对DIB起始位置的偏移"""
+        offset = self.header_size + self.palette_size * 4
+        if self.compression == BI_BITFIELDS and self.header_size == BITMAPINFOHEADER_SIZE:
+            offset += 12  # 三个颜色掩码
+        return offset
+
+
+def parse_dib_header(buffer):
+    """
+    解析DIB头
+
+    :param buffer: 以 BITMAPINFOHEADER 开头的内存（bytes、bytearray 或 memoryview）
+    :return: DibHeader
+    """
+    if len(buffer) < BITMAPINFOHEADER_SIZE:
+        raise ValueError("DIB数据长度不足")
+    (header_size, width, height, _planes, bit_count,
+     compression, _image_size, _x_ppm, _y_ppm, colors_used, _important) = struct.unpack_from("<IiiHHIIiiII", buffer)
+    if header_size < BITMAPINFOHEADER_SIZE:
+        raise ValueError(f"不支持的DIB头长度: {header_size}")
+    return DibHeader(header_size, width, height, bit_count, compression, colors_used)
+
+
+def _read_palette(buffer, header):
+    """读取调色板，返回 [(r, g, b)]"""
+    palette = []
+    for i in range(header.palette_size):
+        b, g, r, _ = struct.unpack_from("<BBBB", buffer, header.header_size + i * 4)
+        palette.append((r, g, b))
+    return palette
+
+
+def dib_to_image(buffer, copy=False):
+    """
+    直接从DIB像素内存构建PIL图像，不经过BMP文件与解码器
+
+    8位灰度DIB返回引用原内存的视图（零拷贝），按行跨距与自下而上的行序直接映射；
+    24/32位DIB的BGR像素在一次拷贝中转换为RGB；1位DIB按调色板极性解包为二值图像。
+    零拷贝视图只在原内存有效期间可用，需要在释放句柄后继续使用时传入 copy=True。
+
+    :param buffer: 以 BITMAPINFOHEADER 开头的DIB内存
+    :param copy: 是否总是拷贝像素数据
+    :return: PIL图像（RGB、L、P 或 1 模式）
+    :raises ValueError: DIB格式不受支持时（压缩DIB、16位等）
+    """
+    header = parse_dib_header(buffer)
+    if header.compression not in (BI_RGB, BI_BITFIELDS) or header.width <= 0 or header.height == 0:
+        raise ValueError(f"不支持的DIB格式: 压缩方式 {header.compression}, 尺寸 {header.width}x{header.height}")
+
+    size = (header.width, abs(header.height))
+    offset = header.pixel_offset
+    pixels = memoryview(buffer)[offset:offset + header.stride * size[1]]
+    if len(pixels) < header.stride * size[1]:
+        raise ValueError("DIB像素数据长度不足")
+    # raw解码器的行方向参数：-1 表示自下而上
+    orientation = -1 if header.bottom_up else 1
+
+    if header.bit_count == 24 and header.compression == BI_RGB:
+        return Image.frombuffer("RGB", size, pixels, "raw", "BGR", header.stride, orientation)
+    if header.bit_count == 32 and header.compression == BI_RGB:
+        return Image.frombuffer("RGB", size, pixels, "raw", "BGRX", header.stride, orientation)
+
+    if header.bit_count == 8:
+        palette = _read_palette(buffer, header)
+        if all(entry == (i, i, i) for i, entry in enumerate(palette)):
+            img = Image.frombuffer("L", size, pixels, "raw", "L", header.stride, orientation)
+            return img.copy() if copy else img
+        img = Image.frombuffer("P", size, pixels, "raw", "P", header.stride, orientation)
+        img.putpalette([channel for entry in palette for channel in entry])
+        return img
+
+    if header.bit_count == 1:
+        palette = _read_palette(buffer, header)
+        # PIL二值图像中置位表示白色，调色板0号为白色时取反
+        rawmode = "1;I" if palette and sum(palette[0]) > sum(palette[-1]) else "1"
+        return Image.frombuffer("1", size, pixels, "raw", rawmode, header.stride, orientation)
+
+    raise ValueError(f"不支持的DIB位深: {header.bit_count}")
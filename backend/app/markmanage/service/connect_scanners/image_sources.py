@@ -0,0 +1,314 @@
+import ctypes
+import os
+import random
+import sys
+import threading
+import time
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from backend.app.markmanage.service.connect_scanners.dib import dib_to_image
+
+# A4纸张尺寸（英寸）
+A4_SIZE_INCHES = (8.27, 11.69)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+
+class NoMoreImagesError(Exception):
+    """图像来源中已没有待传输的页面"""
+
+    def __init__(self, msg="No more images"):
+        super().__init__(msg)
+
+
+class ImageSource:
+    """
+    扫描图像来源接口
+
+    PDFScanner 只通过此接口访问设备：传输线程调用 transfer 拉取页面句柄，
+    工作线程调用 decode 将句柄解码为图像，句柄最终由传输线程调用 release 释放。
+    """
+
+    def list_sources(self):
+        """列出可用的设备名称"""
+        raise NotImplementedError
+
+    def open(self, device_name):
+        """打开指定名称的设备"""
+        raise NotImplementedError
+
+    def configure(self, resolution, use_adf, pixel_type="RGB"):
+        """
+        配置扫描参数
+
+        :param resolution: 扫描分辨率 (DPI)
+        :param use_adf: 是否启用自动进纸器
+        :param pixel_type: 色彩模式 (RGB|GRAY|BW)
+        """
+        raise NotImplementedError
+
+    def acquire(self):
+        """开始一次采集"""
+        raise NotImplementedError
+
+    def transfer(self):
+        """
+        传输下一页
+
+        :return: (页面句柄, 剩余页数)
+        :raises NoMoreImagesError: 没有更多页面时
+        """
+        raise NotImplementedError
+
+    def decode(self, handle):
+        """
+        将页面句柄解码为图像（可在工作线程中调用），图像模式与设备输出一致
+
+        返回的图像可能直接引用句柄内存，只保证在 release 之前有效。
+        """
+        raise NotImplementedError
+
+    def release(self, handle):
+        """释放页面句柄"""
+
+    def close(self):
+        """关闭设备"""
+
+
+class TwainImageSource(ImageSource):
+    """通过TWAIN驱动访问扫描仪（仅Windows）"""
+
+    def __init__(self):
+        try:
+            import twain
+        except ImportError as e:
+            raise RuntimeError(f"twain模块不可用，TWAIN扫描仅支持Windows: {str(e)}")
+        self.twain = twain
+        self.sm = None  # TWAIN SourceManager 对象
+        self.src = None  # TWAIN 扫描源对象
+        self._kernel32 = self._load_kernel32()
+        self._locked_handles = set()  # 已锁定DIB内存、待释放时解锁的句柄
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load_kernel32():
+        """加载 GlobalLock/GlobalSize/GlobalUnlock，非Windows平台返回None"""
+        if sys.platform != "win32":
+            return None
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GlobalLock.argtypes = [ctypes.c_void_p]
+        kernel32.GlobalLock.restype = ctypes.c_void_p
+        kernel32.GlobalSize.argtypes = [ctypes.c_void_p]
+        kernel32.GlobalSize.restype = ctypes.c_size_t
+        kernel32.GlobalUnlock.argtypes = [ctypes.c_void_p]
+        return kernel32
+
+    def _lock_dib(self, handle):
+        """锁定DIB全局内存并返回其内存视图，不支持时返回None"""
+        if self._kernel32 is None or not isinstance(handle, int):
+            return None
+        address = self._kernel32.GlobalLock(handle)
+        if not address:
+            return None
+        with self._lock:
+            self._locked_handles.add(handle)
+        size = self._kernel32.GlobalSize(handle)
+        return memoryview((ctypes.c_char * size).from_address(address)).cast("B")
+
+    def list_sources(self):
+        if not self.sm:
+            # 如果SourceManager未初始化，临时创建一个
+            try:
+                temp_sm = self.twain.SourceManager(0)
+                return list(temp_sm.GetSourceList())
+            except:
+                return []
+        # 使用已初始化的SourceManager
+        return list(self.sm.GetSourceList())
+
+    def open(self, device_name):
+        if not self.sm:
+            self.sm = self.twain.SourceManager(0)
+        self.src = self.sm.OpenSource(device_name)
+
+    def configure(self, resolution, use_adf, pixel_type="RGB"):
+        twain = self.twain
+        pixel_types = {"RGB": twain.TWPT_RGB, "GRAY": twain.TWPT_GRAY, "BW": twain.TWPT_BW}
+        self.src.SetCapability(twain.ICAP_XRESOLUTION, twain.TWTY_UINT16, resolution)
+        self.src.SetCapability(twain.ICAP_YRESOLUTION, twain.TWTY_UINT16, resolution)
+        self.src.SetCapability(twain.ICAP_PIXELTYPE, twain.TWTY_UINT16, pixel_types[pixel_type])
+        if use_adf:
+            self.src.SetCapability(twain.CAP_FEEDERENABLED, twain.TWTY_BOOL, True)
+            self.src.SetCapability(twain.CAP_AUTOFEED, twain.TWTY_BOOL, True)
+
+    def acquire(self):
+        self.src.RequestAcquire(show_ui=False, modal_ui=False)
+
+    def transfer(self):
+        return self.src.XferImageNatively()
+
+    def decode(self, handle):
+        # 直接映射DIB像素内存，灰度页零拷贝，彩色页只在BGR转RGB时拷贝一次
+        dib = self._lock_dib(handle)
+        if dib is not None:
+            try:
+                return dib_to_image(dib)
+            except ValueError:
+                pass  # 不支持的DIB格式，改用BMP文件转换
+
+        bmp_bytes = self.twain.DIBToBMFile(handle)
+        img = Image.open(BytesIO(bmp_bytes))
+        img.load()
+        return img
+
+    def release(self, handle):
+        """安全关闭图像句柄"""
+        with self._lock:
+            locked = handle in self._locked_handles
+            self._locked_handles.discard(handle)
+        if locked:
+            self._kernel32.GlobalUnlock(handle)
+        try:
+            if handle and self.src:
+                self.src.CloseImageFile(handle)
+        except:
+            pass
+
+    def close(self):
+        self.src = None
+        self.sm = None
+
+
+class DirectoryImageSource(ImageSource):
+    """按文件名顺序回放目录中的页面图像，模拟一次ADF进纸"""
+
+    def __init__(self, directory, repeat=1):
+        """
+        :param directory: 页面图像所在目录
+        :param repeat: 整个目录的回放次数，用于构造大批量
+        """
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"页面图像目录不存在: {directory}")
+        self.directory = directory
+        self.repeat = repeat
+        self.files = sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self._total = 0
+        self._next_index = 0
+
+    def list_sources(self):
+        return [f"directory:{os.path.basename(os.path.abspath(self.directory))}"]
+
+    def open(self, device_name):
+        if not self.files:
+            raise RuntimeError(f"目录中没有页面图像: {self.directory}")
+
+    def configure(self, resolution, use_adf, pixel_type="RGB"):
+        pass
+
+    def acquire(self):
+        self._total = len(self.files) * self.repeat
+        self._next_index = 0
+
+    def transfer(self):
+        if self._next_index >= self._total:
+            raise NoMoreImagesError()
+        path = self.files[self._next_index % len(self.files)]
+        self._next_index += 1
+        return path, self._total - self._next_index
+
+    def decode(self, handle):
+        with Image.open(handle) as img:
+            return img.convert("RGB")
+
+
+class SyntheticImageSource(ImageSource):
+    """生成带有模拟手写行的A4页面，不依赖任何设备或样本文件"""
+
+    def __init__(self, page_count=50, pages_per_minute=None, seed=0, blank_backs=False):
+        """
+        :param page_count: 每次采集生成的页数
+        :param pages_per_minute: 模拟设备的额定速度，为None时不限速
+        :param seed: 随机种子，保证每次生成的页面一致
+        :param blank_backs: 模拟双面扫描单面书写的答卷，偶数页为只有纸张噪点的空白背面
+        """
+        self.page_count = page_count
+        self.pages_per_minute = pages_per_minute
+        self.seed = seed
+        self.blank_backs = blank_backs
+        self.resolution = 300
+        self._remaining = 0
+        self._next_page = 0
+        self._last_transfer = None
+
+    def list_sources(self):
+        return ["synthetic"]
+
+    def open(self, device_name):
+        pass
+
+    def configure(self, resolution, use_adf, pixel_type="RGB"):
+        self.resolution = resolution
+
+    def acquire(self):
+        self._remaining = self.page_count
+        self._next_page = 0
+        self._last_transfer = None
+
+    def transfer(self):
+        if self._remaining <= 0:
+            raise NoMoreImagesError()
+
+        # 按额定速度限速，模拟进纸间隔
+        if self.pages_per_minute:
+            interval = 60.0 / self.pages_per_minute
+            if self._last_transfer is not None:
+                wait = interval - (time.perf_counter() - self._last_transfer)
+                if wait > 0:
+                    time.sleep(wait)
+            self._last_transfer = time.perf_counter()
+
+        page_number = self._next_page
+        self._next_page += 1
+        self._remaining -= 1
+        return page_number, self._remaining
+
+    def decode(self, handle):
+        width = int(A4_SIZE_INCHES[0] * self.resolution)
+        height = int(A4_SIZE_INCHES[1] * self.resolution)
+        rng = random.Random(self.seed * 100003 + handle)
+
+        img = Image.new("RGB", (width, height), "white")
+        draw = ImageDraw.Draw(img)
+
+        if self.blank_backs and handle % 2 == 1:
+            # 空白背面：只有零星的浅色纸张噪点
+            for _ in range(200):
+                x, y = rng.randrange(width), rng.randrange(height)
+                draw.point((x, y), fill=(230, 230, 225))
+            return img
+
+        margin = width // 10
+        line_height = max(self.resolution // 4, 8)
+        stroke = max(self.resolution // 150, 1)
+
+        # 每行由若干长度随机的笔画段组成，模拟作文手写行
+        y = margin
+        while y < height - margin:
+            x = margin
+            while x < width - margin:
+                word_width = rng.randint(line_height, line_height * 4)
+                draw.line(
+                    [(x, y + rng.randint(0, line_height // 3)),
+                     (min(x + word_width, width - margin), y + rng.randint(0, line_height // 3))],
+                    fill=(20, 20, 60),
+                    width=stroke,
+                )
+                x += word_width + line_height // 2
+            y += line_height
+        return img
@@ -0,0 +1,48 @@
+import dataclasses
+
+
+@dataclasses.dataclass(frozen=True)
+class ScanProfile:
+    """
+    扫描输出配置
+
+    同时决定扫描仪的色彩模式（TWAIN像素类型）与PDF中页面图像的编码方式。
+    """
+
+    name: str
+    description: str
+    pixel_type: str  # 扫描仪色彩模式：RGB / GRAY / BW
+    image_mode: str  # 编码前的图像模式：RGB / L / 1
+    compression: str  # 页面编码：jpeg / g4
+    quality: int = 100  # JPEG质量
+    subsampling: int = 0  # JPEG色度抽样：0 为 4:4:4，2 为 4:2:0
+    threshold: int = 160  # 二值化阈值，低于阈值的像素视为墨迹
+
+
+SCAN_PROFILES = {
+    profile.name: profile
+    for profile in (
+        ScanProfile("archive-color", "彩色存档，JPEG 质量100，无色度抽样", "RGB", "RGB", "jpeg", 100, 0),
+        ScanProfile("color-jpeg-85", "彩色，JPEG 质量85，4:2:0 抽样", "RGB", "RGB", "jpeg", 85, 2),
+        ScanProfile("gray-jpeg-85", "灰度，JPEG 质量85", "GRAY", "L", "jpeg", 85),
+        ScanProfile("gray-jpeg-70", "灰度，JPEG 质量70", "GRAY", "L", "jpeg", 70),
+        ScanProfile("bilevel-g4", "黑白二值，CCITT G4 无损压缩", "BW", "1", "g4"),
+    )
+}
+
+DEFAULT_PROFILE = "archive-color"
+
+
+def get_profile(profile):
+    """
+    获取扫描输出配置
+
+    :param profile: 配置名称或 ScanProfile 对象
+    :return: ScanProfile
+    """
+    if isinstance(profile, ScanProfile):
+        return profile
+    if profile not in SCAN_PROFILES:
+        names = ", ".join(SCAN_PROFILES)
+        raise ValueError(f"无效的扫描输出配置: {profile}. 可选配置: {names}")
+    return SCAN_PROFILES[profile]
@@ -0,0 +1,233 @@
+import asyncio
+import dataclasses
+import itertools
+import queue
+import threading
+import time
+from datetime import datetime
+
+from backend.app.markmanage.service.connect_scanners.profiles import get_profile
+from backend.app.markmanage.service.connect_scanners.student_splitter import CoverSheetSplitter, FixedCountSplitter
+
+
+@dataclasses.dataclass
+class ScanJob:
+    """扫描任务"""
+
+    job_id: int
+    file_name: str | None = None
+    profile: str | None = None  # 为None时沿用守护进程的默认配置
+    split_by: str | None = None  # qr / count
+    pages_per_student: int = 2
+    student_ids: list[int] | None = None
+    exam_id: int | None = None
+
+    device: str | None = None  # 执行任务的扫描仪
+    status: str = "queued"  # queued / running / succeeded / failed
+    message: str = ""
+    created_at: datetime = dataclasses.field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    setup_seconds: float | None = None  # 从任务开始到设备就绪的耗时
+    pages: int = 0
+    dropped_pages: int = 0
+    pdfs: list[str] = dataclasses.field(default_factory=list)
+    student_papers: list[tuple[int, str]] = dataclasses.field(default_factory=list)
+    paper_ids: list[int] = dataclasses.field(default_factory=list)
+
+
+class ScannerDaemon:
+    """
+    常驻扫描守护进程
+
+    单个工作线程持有扫描仪连接并按顺序执行队列中的扫描任务。
+    设备只在第一个任务时连接和配置，之后的批次复用已打开的扫描源与扫描参数，
+    所有TWAIN调用都发生在同一个工作线程中。
+    """
+
+    def __init__(self, scanner_factory, paper_ingest=None, loop=None, max_history=200):
+        """
+        :param scanner_factory: 无参可调用对象，返回已连接的 PDFScanner
+        :param paper_ingest: 登记答卷的协程函数 (exam_id, student_papers) -> paper_ids，为None时不登记
+        :param loop: 执行登记协程的事件循环（通常为Web服务的事件循环），为None时在工作线程中新建
+        :param max_history: 保留的已结束任务数
+        """
+        self.scanner_factory = scanner_factory
+        self.paper_ingest = paper_ingest
+        self.loop = loop
+        self.max_history = max_history
+        self.scanner = None
+
+        self._jobs = {}
+        self._queue = queue.Queue()
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    @property
+    def running(self):
+        """工作线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """启动工作线程"""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="scanner-daemon", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """停止工作线程（当前任务完成后退出）并断开设备，队列中尚未执行的任务标记为失败"""
+        self._stopping.set()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout)
+        if not self.running:
+            self._fail_queued_jobs()
+
+    def submit(self, **options):
+        """
+        提交扫描任务
+
+        :param options: ScanJob 的任务参数（file_name、profile、split_by 等）
+        :return: ScanJob
+        """
+        if options.get("profile"):
+            get_profile(options["profile"])
+        with self._lock:
+            job = ScanJob(job_id=next(self._job_ids), **options)
+            self._jobs[job.job_id] = job
+            self._trim_history()
+        self._queue.put(job.job_id)
+        self.start()
+        return job
+
+    def get_job(self, job_id):
+        """获取任务"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self):
+        """按提交顺序列出任务"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def status(self):
+        """守护进程状态"""
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job.status == "queued")
+            current = next((job.job_id for job in self._jobs.values() if job.status == "running"), None)
+        return {
+            "running": self.running,
+            "connected": self.scanner is not None,
+            "queued_jobs": queued,
+            "current_job_id": current,
+        }
+
+    def _trim_history(self):
+        """只保留最近的已结束任务"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("succeeded", "failed")]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def _fail_queued_jobs(self):
+        """取出队列中剩余的任务并标记为失败，轮询任务状态的客户端不会一直等待"""
+        while True:
+            try:
+                job_id = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            job = self.get_job(job_id) if job_id is not None else None
+            if job and job.status == "queued":
+                job.status = "failed"
+                job.message = "扫描守护进程已停止，任务未执行"
+                job.finished_at = datetime.now()
+
+    def _run(self):
+        """工作线程主循环"""
+        try:
+            while not self._stopping.is_set():
+                job_id = self._queue.get()
+                if job_id is None:
+                    break
+                if self._stopping.is_set():
+                    # 停止后才取到的任务放回队列，与其余任务一起标记为失败
+                    self._queue.put(job_id)
+                    break
+                job = self.get_job(job_id)
+                if job:
+                    self._run_job(job)
+        finally:
+            self._fail_queued_jobs()
+            if self.scanner:
+                self.scanner._cleanup_resources()
+                self.scanner = None
+
+    def _run_job(self, job):
+        """执行单个扫描任务"""
+        job.status = "running"
+        job.started_at = datetime.now()
+        setup_start = time.perf_counter()
+        try:
+            if self.scanner is None:
+                self.scanner = self.scanner_factory()
+            job.setup_seconds = time.perf_counter() - setup_start
+            execute_scan_job(self.scanner, job, self.paper_ingest, self.loop)
+        except Exception as e:
+            job.status = "failed"
+            job.message = str(e)
+            # 设备状态未知，断开连接，下一个任务重新连接
+            if self.scanner is not None:
+                try:
+                    self.scanner._cleanup_resources()
+                finally:
+                    self.scanner = None
+        finally:
+            job.finished_at = datetime.now()
+
+
+def build_splitter(job):
+    """创建任务的学生答卷分割器"""
+    if job.split_by == "qr":
+        return CoverSheetSplitter()
+    if job.split_by == "count":
+        return FixedCountSplitter(job.pages_per_student, job.student_ids or [])
+    return None
+
+
+def execute_scan_job(scanner, job, paper_ingest=None, loop=None):
+    """
+    用已连接的扫描仪执行扫描任务，并将结果写回任务
+
+    扫描结束后设备保持连接；需要登记答卷时，登记协程在 loop 中执行（为None时新建事件循环）。
+
+    :param scanner: PDFScanner
+    :param job: ScanJob
+    :param paper_ingest: 登记答卷的协程函数 (exam_id, student_papers) -> paper_ids
+    :param loop: 执行登记协程的事件循环
+    """
+    # 每个任务都重新设置，未指定时回到默认配置，不沿用上一个任务的配置
+    scanner.profile = get_profile(job.profile) if job.profile else scanner.default_profile
+    scanner.student_splitter = build_splitter(job)
+
+    success = scanner.scan(file_name=job.file_name, prompt=False, keep_open=True)
+
+    job.pages = len(scanner.stage_timings.get("transfer", []))
+    job.dropped_pages = len(scanner.dropped_pages)
+    job.pdfs = [pdf for pdf in scanner.all_pdfs if pdf]
+    job.student_papers = list(scanner.student_papers)
+    if not success:
+        job.status = "failed"
+        job.message = "扫描未生成任何PDF文件"
+        return
+
+    if job.exam_id is not None and job.student_papers and paper_ingest:
+        coro = paper_ingest(job.exam_id, job.student_papers)
+        if loop is not None:
+            job.paper_ids = asyncio.run_coroutine_threadsafe(coro, loop).result()
+        else:
+            job.paper_ids = asyncio.run(coro)
+    job.status = "succeeded"
+    job.message = f"已生成 {len(job.pdfs)} 个PDF文件"
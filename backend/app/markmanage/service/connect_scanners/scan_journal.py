@@ -0,0 +1,242 @@
+import json
+import os
+import shutil
+from datetime import datetime
+
+from backend.app.markmanage.service.connect_scanners.blank_detector import BlankPageResult
+from backend.app.markmanage.service.connect_scanners.sheet_writer import EncodedPage
+
+MANIFEST_NAME = "manifest.jsonl"
+
+# 页面数据文件扩展名
+STREAM_EXTENSIONS = {"DCTDecode": ".jpg", "CCITTFaxDecode": ".g4"}
+
+# 默认每记录多少页刷盘一次
+DEFAULT_SYNC_EVERY = 16
+
+
+class ScanJournal:
+    """
+    扫描会话日志
+
+    每页在写入PDF的同时，将压缩后的页面数据写入会话目录，再在清单文件（manifest.jsonl）末尾追加一行记录。
+    扫描超时、中断或进程崩溃后，可以按清单重建PDF，并从最后一页之后继续扫描；
+    扫描正常完成后会话目录被删除。
+
+    数据与清单每次都写入操作系统，进程崩溃不会丢失已记录的页面；刷盘（fsync）按批进行：
+    每 sync_every 页、每张纸保存时与关闭时先刷页面数据再刷清单。断电时最多丢失最近一批未刷盘的页面，
+    打开会话时数据文件缺失或不完整的记录及其后的记录被截掉，重新扫描这些页面即可。
+
+    清单第一行为会话信息，其后每行为一条页面记录，页面记录中的PDF路径同时标明纸张边界。
+    """
+
+    def __init__(self, session_dir, header, records, sync_every=DEFAULT_SYNC_EVERY):
+        """
+        :param session_dir: 会话目录
+        :param header: 会话信息
+        :param records: 已记录的页面记录
+        :param sync_every: 每记录多少页刷盘一次，1 为每页刷盘，0 为只在 sync() 与关闭时刷盘
+        """
+        self.session_dir = session_dir
+        self.header = header
+        self.records = records
+        self.sync_every = sync_every
+        self._manifest = open(os.path.join(session_dir, MANIFEST_NAME), "a", encoding="utf-8")
+        self._unsynced_files = []  # 已写入、尚未刷盘的页面数据文件
+        self._unsynced_records = 0
+
+    @property
+    def session_id(self):
+        return self.header["session_id"]
+
+    @property
+    def last_page(self):
+        """已记录的最后一页页码，没有页面时为0"""
+        return max((record["page"] for record in self.records), default=0)
+
+    @classmethod
+    def create(cls, journal_root, file_name=None, sync_every=DEFAULT_SYNC_EVERY, **settings):
+        """
+        创建新的扫描会话
+
+        :param journal_root: 会话目录的根目录
+        :param file_name: 基础PDF文件名
+        :param sync_every: 每记录多少页刷盘一次
+        :param settings: 需要在恢复时沿用的扫描设置（分辨率、输出配置等）
+        :return: ScanJournal
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_id = f"{timestamp}_{file_name}" if file_name else timestamp
+        session_id = base_id
+        counter = 1
+        os.makedirs(journal_root, exist_ok=True)
+        while True:
+            session_dir = os.path.join(journal_root, session_id)
+            try:
+                os.mkdir(session_dir)
+                break
+            except FileExistsError:
+                session_id = f"{base_id}_{counter}"
+                counter += 1
+
+        header = {
+            "type": "session",
+            "session_id": session_id,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "file_name": file_name,
+            **settings,
+        }
+        journal = cls(session_dir, header, [], sync_every)
+        journal._append(header)
+        journal.sync()
+        return journal
+
+    @classmethod
+    def open(cls, journal_root, session, sync_every=DEFAULT_SYNC_EVERY):
+        """
+        打开已有的扫描会话
+
+        清单末尾因崩溃而不完整的记录、数据文件缺失或不完整的页面及其后的记录会被截掉。
+
+        :param journal_root: 会话目录的根目录
+        :param session: 会话ID或会话目录路径
+        :param sync_every: 每记录多少页刷盘一次
+        :return: ScanJournal
+        """
+        session_dir = session if os.path.isdir(session) else os.path.join(journal_root, session)
+        manifest_path = os.path.join(session_dir, MANIFEST_NAME)
+        if not os.path.isfile(manifest_path):
+            raise FileNotFoundError(f"扫描会话不存在: {session}")
+
+        entries = []
+        valid_length = 0
+        with open(manifest_path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("不完整的记录")
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if entries and not cls._page_data_intact(session_dir, entry):
+                    break
+                entries.append(entry)
+                valid_length += len(line)
+        if not entries or entries[0].get("type") != "session":
+            raise ValueError(f"扫描会话清单无效: {manifest_path}")
+        with open(manifest_path, "r+b") as f:
+            f.truncate(valid_length)
+
+        return cls(session_dir, entries[0], entries[1:], sync_every)
+
+    @staticmethod
+    def _page_data_intact(session_dir, record):
+        """页面记录的数据文件是否完整（断电时清单可能先于数据文件落盘）"""
+        if "file" not in record:
+            return True
+        try:
+            size = os.path.getsize(os.path.join(session_dir, record["file"]))
+        except OSError:
+            return False
+        return size == record.get("size", size)
+
+    def _append(self, entry):
+        """在清单末尾追加一条记录"""
+        self._manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._manifest.flush()
+
+    def sync(self):
+        """将已记录的页面刷盘：先刷页面数据，再刷清单"""
+        for f in self._unsynced_files:
+            os.fsync(f.fileno())
+            f.close()
+        self._unsynced_files = []
+        if not self._manifest.closed:
+            os.fsync(self._manifest.fileno())
+        self._unsynced_records = 0
+
+    def record_page(self, page_number, result, student_id=None, output_path=None):
+        """
+        记录一页的处理结果
+
+        :param page_number: 页码
+        :param result: ProcessedPage
+        :param student_id: 该页所属的学生ID
+        :param output_path: 该页写入的PDF路径，空白页与封面页为None
+        """
+        record = {
+            "type": "page",
+            "page": page_number,
+            "student_id": student_id,
+            "cover_student_id": result.cover_student_id,
+            "output_path": output_path,
+        }
+        if result.blank_result is not None:
+            record["blank"] = {
+                "is_blank": result.blank_result.is_blank,
+                "ink_ratio": result.blank_result.ink_ratio,
+                "std": result.blank_result.std,
+            }
+
+        page = result.encoded
+        if page is not None:
+            file_name = f"{page_number:05d}{STREAM_EXTENSIONS.get(page.decode_filter, '.bin')}"
+            f = open(os.path.join(self.session_dir, file_name), "wb")
+            try:
+                f.write(page.stream)
+                f.flush()
+            except BaseException:
+                f.close()
+                raise
+            # 文件保持打开到下一次刷盘（Windows 只能对可写的句柄 fsync）
+            self._unsynced_files.append(f)
+            record["file"] = file_name
+            record["size"] = len(page.stream)
+            record["encoded"] = {
+                "width": page.width,
+                "height": page.height,
+                "color_space": page.color_space,
+                "decode_filter": page.decode_filter,
+                "bits_per_component": page.bits_per_component,
+                "procset": page.procset,
+                "decode_parms": page.decode_parms,
+            }
+
+        self._append(record)
+        self.records.append(record)
+        self._unsynced_records += 1
+        if self.sync_every and self._unsynced_records >= self.sync_every:
+            self.sync()
+
+    def load_page(self, record):
+        """
+        读取页面记录对应的压缩数据
+
+        :return: EncodedPage，空白页与封面页返回None
+        """
+        if "file" not in record:
+            return None
+        with open(os.path.join(self.session_dir, record["file"]), "rb") as f:
+            stream = f.read()
+        return EncodedPage(stream=stream, **record["encoded"])
+
+    @staticmethod
+    def load_blank_result(record):
+        """读取页面记录中的空白页检测结果"""
+        if "blank" not in record:
+            return None
+        return BlankPageResult(**record["blank"])
+
+    def close(self):
+        """刷盘并关闭清单文件，保留会话目录"""
+        if not self._manifest.closed:
+            self.sync()
+            self._manifest.close()
+
+    def discard(self):
+        """扫描完成后删除会话目录（不必刷盘）"""
+        for f in self._unsynced_files:
+            f.close()
+        self._unsynced_files = []
+        self._manifest.close()
+        shutil.rmtree(self.session_dir, ignore_errors=True)
@@ -0,0 +1,271 @@
+import dataclasses
+import os
+from datetime import datetime
+from io import BytesIO
+
+from PIL import Image, PdfParser
+
+from backend.app.markmanage.service.connect_scanners.profiles import DEFAULT_PROFILE, get_profile
+
+
+@dataclasses.dataclass
+class EncodedPage:
+    """已压缩、可直接嵌入PDF的单页图像数据"""
+
+    stream: bytes
+    width: int
+    height: int
+    color_space: str = "DeviceRGB"
+    decode_filter: str = "DCTDecode"
+    bits_per_component: int = 8
+    procset: str = "ImageC"
+    decode_parms: dict | None = None
+
+
+def _convert_for_profile(img, profile):
+    """将图像转换为配置要求的模式"""
+    if profile.image_mode == "1":
+        if img.mode == "1":
+            return img
+        # 固定阈值二值化，避免默认的抖动处理产生噪点
+        gray = img if img.mode == "L" else img.convert("L")
+        return gray.point(lambda value: 255 if value >= profile.threshold else 0, mode="1")
+    if img.mode != profile.image_mode:
+        return img.convert(profile.image_mode)
+    return img
+
+
+def _encode_g4(img):
+    """将二值图像编码为CCITT G4数据流"""
+    buffer = BytesIO()
+    # 单条带写入，便于直接取出压缩数据
+    img.save(buffer, "TIFF", compression="group4", strip_size=(img.width + 7) // 8 * img.height)
+    tiff_bytes = buffer.getvalue()
+    with Image.open(BytesIO(tiff_bytes)) as tiff:
+        offset = tiff.tag_v2[273][0]  # StripOffsets
+        length = tiff.tag_v2[279][0]  # StripByteCounts
+    return tiff_bytes[offset:offset + length]
+
+
+def encode_page(img, profile=DEFAULT_PROFILE):
+    """
+    按扫描输出配置将页面图像压缩为可嵌入PDF的数据流
+
+    编码只依赖传入的图像，可在工作线程中并行调用。
+
+    :param img: PIL图像
+    :param profile: 配置名称或 ScanProfile 对象
+    :return: EncodedPage
+    """
+    profile = get_profile(profile)
+    page_img = _convert_for_profile(img, profile)
+
+    if profile.compression == "g4":
+        return EncodedPage(
+            stream=_encode_g4(page_img),
+            width=page_img.width,
+            height=page_img.height,
+            color_space="DeviceGray",
+            decode_filter="CCITTFaxDecode",
+            bits_per_component=1,
+            procset="ImageB",
+            decode_parms={"K": -1, "BlackIs1": True, "Columns": page_img.width, "Rows": page_img.height},
+        )
+
+    buffer = BytesIO()
+    page_img.save(buffer, "JPEG", quality=profile.quality, subsampling=profile.subsampling)
+    is_gray = page_img.mode == "L"
+    return EncodedPage(
+        stream=buffer.getvalue(),
+        width=page_img.width,
+        height=page_img.height,
+        color_space="DeviceGray" if is_gray else "DeviceRGB",
+        procset="ImageB" if is_gray else "ImageC",
+    )
+
+
+class StreamingSheetWriter:
+    """
+    流式纸张PDF写入器
+
+    输出文件在第一页到达时以独占方式创建并只打开一次，每页已压缩的图像数据到达后直接追加写入，
+    页面树、交叉引用表（xref）与文件尾在 close 时一次写出。
+    每页只在工作线程中压缩一次，写入阶段不再解码或重新压缩图像，
+    整批扫描的内存占用只与单页大小相关，与批次页数无关。
+    未正常关闭的文件缺少交叉引用表，由扫描会话日志重建。
+    """
+
+    # 固定的对象编号：1 为文档目录，2 为页面树，页面对象从 3 开始
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, scan_dir, base_filename, sheet_number, resolution, student_id=None, output_path=None):
+        """
+        :param scan_dir: PDF保存目录
+        :param base_filename: 基础文件名（为None时使用时间戳）
+        :param sheet_number: 纸张序号
+        :param resolution: 写入PDF的分辨率 (DPI)
+        :param student_id: 按学生分割时该PDF所属的学生ID
+        :param output_path: 指定输出路径（从扫描会话重建PDF时沿用原路径，已有文件会被覆盖）
+        """
+        self.scan_dir = scan_dir
+        self.base_filename = base_filename
+        self.sheet_number = sheet_number
+        self.resolution = resolution
+        self.student_id = student_id
+        self.output_path = output_path
+        self.page_count = 0
+        self.closed = False
+
+        self._file = None
+        self._offsets = {}  # 对象编号 -> 文件偏移
+        self._page_refs = []
+        self._next_object_id = self.PAGES_ID + 1
+
+    @property
+    def has_pending_pages(self):
+        """是否有已写入但尚未收尾的页面"""
+        return self.page_count > 0 and not self.closed
+
+    def _open_output(self):
+        """
+        创建输出文件
+
+        未指定路径时按序号依次尝试以 O_EXCL 独占创建，文件名的选择与创建是同一个原子操作，
+        多个写入器（或多台扫描仪）并发命名时不会互相覆盖。
+        """
+        if self.output_path is not None:
+            return open(self.output_path, "wb")
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_name = self.base_filename or f"scan_{timestamp}"
+        if self.student_id is not None:
+            label = f"student{self.student_id}"
+        else:
+            label = f"sheet{self.sheet_number}"
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+        counter = 0
+        while True:
+            suffix = f"_{counter}" if counter else ""
+            output_path = os.path.join(self.scan_dir, f"{base_name}_{label}{suffix}.pdf")
+            try:
+                fd = os.open(output_path, flags, 0o644)
+            except FileExistsError:
+                counter += 1
+                continue
+            self.output_path = output_path
+            return os.fdopen(fd, "wb")
+
+    def _allocate_object_id(self):
+        object_id = self._next_object_id
+        self._next_object_id += 1
+        return object_id
+
+    def _write_object(self, object_id, value, stream=None):
+        """写出一个间接对象，带数据流时自动补充 Length"""
+        self._offsets[object_id] = self._file.tell()
+        if stream is not None:
+            value = PdfParser.PdfDict(value)
+            value.Length = len(stream)
+        self._file.write(b"%d 0 obj\n" % object_id)
+        self._file.write(PdfParser.pdf_repr(value))
+        if stream is not None:
+            self._file.write(b"\nstream\n")
+            self._file.write(stream)
+            self._file.write(b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def add_page(self, page):
+        """
+        将一页已压缩的图像追加写入PDF
+
+        :param page: EncodedPage
+        """
+        if self.closed:
+            raise RuntimeError("纸张PDF已关闭，无法继续写入")
+
+        if self._file is None:
+            self._file = self._open_output()
+            self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        image_ref = self._allocate_object_id()
+        contents_ref = self._allocate_object_id()
+        page_ref = self._allocate_object_id()
+
+        self._write_object(
+            image_ref,
+            {
+                "Type": PdfParser.PdfName("XObject"),
+                "Subtype": PdfParser.PdfName("Image"),
+                "Width": page.width,
+                "Height": page.height,
+                "Filter": PdfParser.PdfName(page.decode_filter),
+                "BitsPerComponent": page.bits_per_component,
+                "ColorSpace": PdfParser.PdfName(page.color_space),
+                **({"DecodeParms": PdfParser.PdfDict(page.decode_parms)} if page.decode_parms else {}),
+            },
+            stream=page.stream,
+        )
+
+        # 按分辨率换算页面尺寸（单位：pt）
+        page_width = page.width * 72.0 / self.resolution
+        page_height = page.height * 72.0 / self.resolution
+        self._write_object(
+            contents_ref, {}, stream=b"q %f 0 0 %f 0 0 cm /image Do Q" % (page_width, page_height)
+        )
+        self._write_object(
+            page_ref,
+            PdfParser.PdfDict(
+                Type=PdfParser.PdfName("Page"),
+                Parent=PdfParser.IndirectReference(self.PAGES_ID, 0),
+                Resources=PdfParser.PdfDict(
+                    ProcSet=[PdfParser.PdfName("PDF"), PdfParser.PdfName(page.procset)],
+                    XObject=PdfParser.PdfDict(image=PdfParser.IndirectReference(image_ref, 0)),
+                ),
+                MediaBox=[0, 0, page_width, page_height],
+                Contents=PdfParser.IndirectReference(contents_ref, 0),
+            ),
+        )
+        self._page_refs.append(PdfParser.IndirectReference(page_ref, 0))
+        self.page_count += 1
+
+    def _write_trailer(self):
+        """写出页面树、文档目录、交叉引用表与文件尾"""
+        self._write_object(
+            self.PAGES_ID,
+            PdfParser.PdfDict(Type=PdfParser.PdfName("Pages"), Kids=self._page_refs, Count=len(self._page_refs)),
+        )
+        self._write_object(
+            self.CATALOG_ID,
+            PdfParser.PdfDict(Type=PdfParser.PdfName("Catalog"), Pages=PdfParser.IndirectReference(self.PAGES_ID, 0)),
+        )
+
+        xref_offset = self._file.tell()
+        size = self._next_object_id
+        xref = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        xref.extend(b"%010d 00000 n \n" % self._offsets[object_id] for object_id in range(1, size))
+        self._file.write(b"".join(xref))
+        self._file.write(b"trailer\n")
+        self._file.write(PdfParser.pdf_repr(
+            PdfParser.PdfDict(Size=size, Root=PdfParser.IndirectReference(self.CATALOG_ID, 0))
+        ))
+        self._file.write(b"\nstartxref\n%d\n%%%%EOF\n" % xref_offset)
+
+    def close(self):
+        """
+        结束当前纸张的写入
+
+        :return: 生成的PDF路径，未写入任何页面时返回None
+        """
+        if self.closed:
+            return self.output_path if self.page_count else None
+        self.closed = True
+        if self._file is None:
+            return None
+        try:
+            self._write_trailer()
+        finally:
+            self._file.close()
+            self._file = None
+        return self.output_path
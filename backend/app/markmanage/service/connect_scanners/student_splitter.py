@@ -0,0 +1,98 @@
+import re
+
+
+class StudentSplitter:
+    """
+    学生答卷分割接口
+
+    整班答卷作为一个批次连续扫描，分割器按页序决定每一页属于哪位学生：
+    detect 在工作线程中对解码后的页面做分隔页识别，route 在写入阶段按页序依次调用。
+    """
+
+    def detect(self, img):
+        """
+        识别分隔页（可在工作线程中调用）
+
+        :param img: PIL图像
+        :return: 分隔页对应的学生ID，非分隔页返回None
+        """
+        return None
+
+    def route(self, cover_student_id):
+        """
+        按页序确定当前页的归属
+
+        :param cover_student_id: detect 的识别结果
+        :return: (学生ID, 是否开始新学生, 是否跳过该页)
+        """
+        raise NotImplementedError
+
+
+class CoverSheetSplitter(StudentSplitter):
+    """
+    按封面页二维码/条形码分割
+
+    每位学生的答卷前放一张带二维码或条形码的封面页，码内容为学生ID（可带 STUDENT: 前缀）。
+    封面页本身不写入答卷PDF。第一张封面页之前的页面无法归属，单独保存为未分配页面。
+    """
+
+    def __init__(self, pattern=r"^(?:STUDENT[:=])?(\d+)$", downsample=2):
+        """
+        :param pattern: 从码内容中提取学生ID的正则表达式，第一个分组为学生ID
+        :param downsample: 识别前的缩小倍数
+        """
+        try:
+            from pyzbar.pyzbar import decode as decode_barcodes
+        except ImportError as e:
+            raise RuntimeError(f"pyzbar模块不可用，无法识别封面页二维码: {str(e)}")
+        self.decode_barcodes = decode_barcodes
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.downsample = max(1, int(downsample))
+        self.current_student_id = None
+
+    def detect(self, img):
+        gray = img if img.mode == "L" else img.convert("L")
+        if self.downsample > 1:
+            gray = gray.reduce(self.downsample)
+        for barcode in self.decode_barcodes(gray):
+            payload = barcode.data.decode("utf-8", errors="ignore").strip()
+            match = self.pattern.match(payload)
+            if match:
+                return int(match.group(1))
+        return None
+
+    def route(self, cover_student_id):
+        if cover_student_id is not None:
+            self.current_student_id = cover_student_id
+            return cover_student_id, True, True
+        return self.current_student_id, False, False
+
+
+class FixedCountSplitter(StudentSplitter):
+    """
+    按固定页数分割
+
+    每位学生占固定的扫描页数（按扫描顺序计数，包含随后被丢弃的空白页），
+    依次分配给名单中的学生。
+    """
+
+    def __init__(self, pages_per_student, student_ids):
+        """
+        :param pages_per_student: 每位学生的扫描页数（双面扫描时为纸张数的两倍）
+        :param student_ids: 按答卷叠放顺序排列的学生ID列表
+        """
+        if pages_per_student < 1:
+            raise ValueError(f"无效的每人页数: {pages_per_student}. 应不小于1")
+        if not student_ids:
+            raise ValueError("学生名单不能为空")
+        self.pages_per_student = pages_per_student
+        self.student_ids = list(student_ids)
+        self.page_index = 0
+
+    def route(self, cover_student_id):
+        student_index, page_offset = divmod(self.page_index, self.pages_per_student)
+        self.page_index += 1
+        if student_index >= len(self.student_ids):
+            # 页数超出名单，剩余页面不分配给任何学生
+            return None, page_offset == 0 and student_index == len(self.student_ids), False
+        return self.student_ids[student_index], page_offset == 0, False
@@ -0,0 +1,244 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+# 直方图桶上限（秒），与 Prometheus 客户端默认桶相近，并补充扫描批次级别的长耗时桶
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+TELEMETRY_LOG_NAME = "scan_telemetry.jsonl"
+
+
+def percentile(values, pct):
+    """计算百分位数（最近秩法：排序后第 ceil(pct/100*n) 个值）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # 先乘后除，避免 95/100 之类的浮点误差使 ceil 多进一位
+    index = min(len(ordered) - 1, max(0, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[index]
+
+
+def summarize_stages(stage_timings):
+    """汇总各阶段耗时，单位毫秒"""
+    summary = {}
+    for stage, values in stage_timings.items():
+        if not values:
+            continue
+        summary[stage] = {
+            "count": len(values),
+            "mean_ms": sum(values) / len(values) * 1000,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "max_ms": max(values) * 1000,
+        }
+    return summary
+
+
+class Histogram:
+    """累计直方图"""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+
+    def to_dict(self):
+        return {
+            "buckets": {str(upper): count for upper, count in zip(self.buckets, self.counts)},
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+
+class ScanTelemetry:
+    """
+    扫描流水线分阶段耗时统计
+
+    每个阶段（transfer/decode/encode/write/save 以及错误重试等待等）的耗时按批次与按页记录，
+    同时累计到进程级直方图。批次结束时向 JSON 日志追加一行批次记录，
+    并重写 Prometheus 文本格式的指标文件（可由 node_exporter 的 textfile 采集器读取）。
+    各方法可在工作线程中调用。
+    """
+
+    def __init__(self, metrics_dir=None, device=None):
+        """
+        :param metrics_dir: 指标输出目录，为None时不写文件
+        :param device: 设备名称，作为指标标签与文件名的一部分
+        """
+        self.metrics_dir = metrics_dir
+        self.device = device or "default"
+        self._lock = threading.Lock()
+
+        # 进程级累计指标
+        self.stage_histograms = defaultdict(Histogram)
+        self.batch_histogram = Histogram()
+        self.pages_total = 0
+        self.batches_total = defaultdict(int)  # 按结果计数：success / failure
+        self.errors_total = 0
+
+        self.start_batch()
+
+    def start_batch(self, file_name=None):
+        """开始统计新批次"""
+        with self._lock:
+            self.timings = defaultdict(list)  # 阶段 -> 本批次各次耗时（秒）
+            self.page_timings = defaultdict(dict)  # 页码 -> {阶段: 耗时}
+            self.batch_errors = []
+            self.batch_file_name = file_name
+            self.batch_started_at = datetime.now()
+            self._batch_start = time.perf_counter()
+            self._batch_open = True
+
+    def observe(self, stage, seconds, page_number=None):
+        """记录一次阶段耗时"""
+        with self._lock:
+            self.timings[stage].append(seconds)
+            self.stage_histograms[stage].observe(seconds)
+            if page_number is not None:
+                page = self.page_timings[page_number]
+                page[stage] = page.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timer(self, stage, page_number=None):
+        """统计代码块耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, page_number)
+
+    def record_error(self, error):
+        """记录扫描错误"""
+        with self._lock:
+            self.errors_total += 1
+            self.batch_errors.append(str(error))
+
+    def finish_batch(self, success, pages):
+        """
+        结束当前批次，累计批次指标并写出日志与指标文件
+
+        :param success: 批次是否成功
+        :param pages: 批次扫描页数
+        :return: dict 批次记录，本批次已结束时返回None
+        """
+        with self._lock:
+            if not self._batch_open:
+                return None
+            self._batch_open = False
+            duration = time.perf_counter() - self._batch_start
+            self.batch_histogram.observe(duration)
+            self.pages_total += pages
+            self.batches_total["success" if success else "failure"] += 1
+            record = {
+                "device": self.device,
+                "file_name": self.batch_file_name,
+                "started_at": self.batch_started_at.isoformat(timespec="seconds"),
+                "duration_s": duration,
+                "pages": pages,
+                "pages_per_min": pages / duration * 60 if duration > 0 else 0.0,
+                "success": success,
+                "errors": list(self.batch_errors),
+                "stages": summarize_stages(self.timings),
+                "histograms": {
+                    stage: self._batch_histogram(values).to_dict() for stage, values in self.timings.items()
+                },
+                "pages_detail": [
+                    {"page": page_number, **stages} for page_number, stages in sorted(self.page_timings.items())
+                ],
+            }
+
+        if self.metrics_dir:
+            try:
+                self._write_files(record)
+            except OSError as e:
+                print(f"⚠️ 写入扫描指标失败: {str(e)}")
+        return record
+
+    @staticmethod
+    def _batch_histogram(values):
+        histogram = Histogram()
+        for value in values:
+            histogram.observe(value)
+        return histogram
+
+    def _metrics_file_name(self):
+        """按设备区分的指标文件名"""
+        device = re.sub(r"[^0-9A-Za-z_-]+", "_", self.device)
+        return f"scan_metrics_{device}.prom"
+
+    def _write_files(self, record):
+        """追加JSON日志，并原子替换Prometheus指标文件"""
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        with open(os.path.join(self.metrics_dir, TELEMETRY_LOG_NAME), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        metrics_path = os.path.join(self.metrics_dir, self._metrics_file_name())
+        temp_path = metrics_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(temp_path, metrics_path)
+
+    def render_prometheus(self):
+        """生成 Prometheus 文本格式的累计指标"""
+        device = self.device.replace("\\", "\\\\").replace('"', '\\"')
+        lines = []
+
+        def histogram_lines(name, histogram, labels):
+            for upper, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{name}_bucket{{{labels},le="{upper}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        with self._lock:
+            lines.append("# HELP scan_stage_seconds Duration of scan pipeline stages per page.")
+            lines.append("# TYPE scan_stage_seconds histogram")
+            for stage, histogram in sorted(self.stage_histograms.items()):
+                histogram_lines("scan_stage_seconds", histogram, f'device="{device}",stage="{stage}"')
+
+            lines.append("# HELP scan_batch_seconds Duration of scan batches.")
+            lines.append("# TYPE scan_batch_seconds histogram")
+            histogram_lines("scan_batch_seconds", self.batch_histogram, f'device="{device}"')
+
+            lines.append("# HELP scan_pages_total Pages captured.")
+            lines.append("# TYPE scan_pages_total counter")
+            lines.append(f'scan_pages_total{{device="{device}"}} {self.pages_total}')
+
+            lines.append("# HELP scan_batches_total Scan batches by result.")
+            lines.append("# TYPE scan_batches_total counter")
+            for result, count in sorted(self.batches_total.items()):
+                lines.append(f'scan_batches_total{{device="{device}",result="{result}"}} {count}')
+
+            lines.append("# HELP scan_errors_total Scan errors, including retried transfers.")
+            lines.append("# TYPE scan_errors_total counter")
+            lines.append(f'scan_errors_total{{device="{device}"}} {self.errors_total}')
+        return "\n".join(lines) + "\n"
+
+
+def format_summary(record):
+    """将批次记录格式化为可打印的耗时汇总"""
+    lines = [
+        f"扫描耗时统计: {record['pages']} 页，{record['duration_s']:.2f} 秒 ({record['pages_per_min']:.1f} 页/分钟)",
+        f"{'阶段':<14}{'次数':>6}{'平均(ms)':>12}{'P95(ms)':>12}{'最大(ms)':>12}{'合计(秒)':>10}",
+    ]
+    for stage, stats in record["stages"].items():
+        total = stats["mean_ms"] * stats["count"] / 1000
+        lines.append(f"{stage:<14}{stats['count']:>6}{stats['mean_ms']:>12.2f}{stats['p95_ms']:>12.2f}"
+                     f"{stats['max_ms']:>12.2f}{total:>10.2f}")
+    if record["errors"]:
+        lines.append(f"错误 {len(record['errors'])} 次: {record['errors'][-1]}")
+    return "\n".join(lines)
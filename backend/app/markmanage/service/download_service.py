@@ -0,0 +1,76 @@
+# backend/app/markmanage/service/download_service.py
+import asyncio
+import os
+from dataclasses import dataclass
+
+from backend.common.exception import errors
+from backend.database.engine import async_db_session
+from backend.utils.file_service import FileService
+from backend.app.markmanage.crud.crud_exam import ExamCRUD
+from backend.app.markmanage.crud.crud_paper import PaperCRUD
+from backend.app.markmanage.crud.crud_stored_file import StoredFileCRUD
+
+
+@dataclass
+class DownloadFile:
+    """待下载的文件"""
+    path: str
+    filename: str
+    sha256: str
+    stat_result: os.stat_result
+
+
+class DownloadService:
+    """文件下载业务逻辑服务层"""
+
+    def __init__(self):
+        self.exam_crud = ExamCRUD()
+        self.paper_crud = PaperCRUD()
+        self.stored_file_crud = StoredFileCRUD()
+
+    async def get_exam_questions_file(self, exam_id: int) -> DownloadFile:
+        """获取考试的题目文件"""
+        async with async_db_session() as session:
+            file_info = await self.exam_crud.get_file_path(session, exam_id)
+            if not file_info:
+                raise errors.NotFoundError(msg='考试记录不存在')
+            questions_path, questions_filename = file_info
+            if not questions_path:
+                raise errors.NotFoundError(msg='文件不存在')
+            return await self._describe(session, questions_path, questions_filename)
+
+    async def get_paper_file(self, paper_id: int) -> DownloadFile:
+        """获取学生的答卷文件"""
+        async with async_db_session() as session:
+            paper = await self.paper_crud.get_paper_by_id(session, paper_id)
+            if not paper:
+                raise errors.NotFoundError(msg='答卷记录不存在')
+            filename = f"exam{paper.exam_id}_student{paper.student_id}{os.path.splitext(paper.paper_path)[1]}"
+            return await self._describe(session, paper.paper_path, filename)
+
+    async def _describe(self, session, path: str, filename: str) -> DownloadFile:
+        """
+        读取文件状态与内容哈希
+
+        存储中的文件直接使用记录的哈希；去重存储之前保存的旧文件通过元数据缓存获取哈希，
+        文件未变化时不重新读取内容。
+        """
+        try:
+            stat_result = await asyncio.to_thread(os.stat, path)
+        except OSError:
+            raise errors.NotFoundError(msg='文件不存在')
+
+        stored = await self.stored_file_crud.get_by_path(session, path)
+        if stored is not None:
+            sha256 = stored.sha256
+        else:
+            try:
+                sha256 = (await asyncio.to_thread(FileService.get_file_metadata, path))["hash"]
+            except OSError:
+                raise errors.NotFoundError(msg='文件不存在')
+        return DownloadFile(path=path, filename=filename or os.path.basename(path), sha256=sha256,
+                            stat_result=stat_result)
+
+
+# Service 实例
+download_service = DownloadService()
@@ -247,12 +247,13 @@ from typing import Optional, Union
 from fastapi import UploadFile, Form, File
 
 from backend.common.exception import errors
-from backend.utils.file_utils import validate_file, save_upload_file
+from backend.utils.file_utils import check_pdf_page_count, validate_file
 from backend.app.markmanage.schema.exam import ExamBase
 from backend.config.fileConfig import settings
 from backend.database.engine import async_db_session
 from backend.app.markmanage.crud.crud_exam import ExamCRUD
 from backend.app.markmanage.models.exam import Exam
+from backend.app.markmanage.service.file_store_service import file_store_service
 
 
 class ExamService:
@@ -279,15 +280,7 @@ class ExamService:
         )
         if not questions_validate:
             raise errors.InvalidFileName(msg=questions_msg)
-
-        # 保存题目文件
-        questions_path, questions_filename = await save_upload_file(
-            questions_file,
-            settings.QUESTION_UPLOAD_DIR
-        )
-
-        if not questions_path or not questions_filename:
-            raise errors.ServerError(msg='保存题目文件失败')
+        await check_pdf_page_count(questions_file.file, questions_file.filename)
 
         # 构造考试数据
         exam_data = {
@@ -296,27 +289,76 @@ class ExamService:
             "description": description,
             "time": time,
             "creator_id": creator_id,
-            "questions_path": questions_path,
-            "questions_filename": questions_filename
+            "questions_filename": questions_file.filename
         }
 
-        # 使用CRUD创建考试记录
-        async with async_db_session() as session:
+        async with file_store_service.session() as session:
+            # 保存题目文件（相同内容只保存一份），引用记录与考试记录一起提交
+            try:
+                exam_data["questions_path"] = await file_store_service.store_upload(
+                    session,
+                    questions_file,
+                    settings.QUESTION_UPLOAD_DIR
+                )
+            except OSError:
+                raise errors.ServerError(msg='保存题目文件失败')
+
+            # 使用CRUD创建考试记录
             exam = await self.crud.create_exam(session,
                                                **exam_data)
             if not exam:
                 raise errors.ServerError(msg='创建考试记录失败')
             return exam.id
 
+    async def create_exam_from_file(
+            self,
+            title: str,
+            subject: str,
+            description: str,
+            time: datetime,
+            creator_id: int,
+            file_path: str,
+            filename: str,
+            sha256: str = None
+    ):
+        """
+        用服务器上已有的题目文件（如分块上传完成的文件）创建考试记录，文件类型、大小与页数由调用方校验
+
+        :param sha256: 调用方已校验的文件哈希，提供时不再重新计算
+        """
+        async with file_store_service.session() as session:
+            try:
+                questions_path = await file_store_service.store_existing_file(
+                    session,
+                    file_path,
+                    settings.QUESTION_UPLOAD_DIR,
+                    ext=os.path.splitext(filename)[1],
+                    sha256=sha256
+                )
+            except OSError:
+                raise errors.ServerError(msg='保存题目文件失败')
+
+            exam = await self.crud.create_exam(session,
+                                               title=title,
+                                               subject=subject,
+                                               description=description,
+                                               time=time,
+                                               creator_id=creator_id,
+                                               questions_path=questions_path,
+                                               questions_filename=filename)
+            if not exam:
+                raise errors.ServerError(msg='创建考试记录失败')
+            return exam.id
+
     async def update_exam_files(
             self,
             exam_id: int = Form(...),
             questions_file: UploadFile = File(...)
     ):
         """更新考试的题目文件"""
-        async with async_db_session() as session:
-            # 获取考试记录
-            exam = await self.crud.get_exam_by_id(session, exam_id)
+        async with file_store_service.session() as session:
+            # 获取考试记录并加行锁：存储迁移会锁定考试并改写 questions_path，等迁移提交后释放它写入的路径
+            exam = await self.crud.get_exam_by_id(session, exam_id, for_update=True)
 
             if not exam:
                 raise errors.NotFoundError(msg='考试记录不存在')
@@ -325,28 +367,32 @@ class ExamService:
 
             # 更新题目文件
             if questions_file:
-                await validate_file(
+                questions_validate, questions_msg = await validate_file(
                     questions_file,
                     settings.ALLOWED_EXAM_FILE_TYPES,
                     settings.MAX_EXAM_FILE_SIZE
                 )
-
-                # 删除旧文件
-                if exam.questions_path and os.path.exists(exam.questions_path):
-                    try:
-                        os.remove(exam.questions_path)
-                    except OSError:
-                        raise errors.ServerError(msg='删除旧题目文件失败')
+                if not questions_validate:
+                    raise errors.InvalidFileName(msg=questions_msg)
+                await check_pdf_page_count(questions_file.file, questions_file.filename)
 
                 # 保存新文件
-                questions_path, questions_filename = await save_upload_file(
-                    questions_file,
-                    settings.QUESTION_UPLOAD_DIR
-                )
+                try:
+                    questions_path = await file_store_service.store_upload(
+                        session,
+                        questions_file,
+                        settings.QUESTION_UPLOAD_DIR
+                    )
+                except OSError:
+                    raise errors.ServerError(msg='保存题目文件失败')
+
+                # 释放旧文件，最后一个引用释放时才删除
+                if exam.questions_path:
+                    await self._release_file(session, exam.questions_path)
 
                 update_data.update({
                     "questions_path": questions_path,
-                    "questions_filename": questions_filename
+                    "questions_filename": questions_file.filename
                 })
 
             # 使用CRUD更新考试记录
@@ -358,24 +404,27 @@ class ExamService:
             exam_id: int
     ):
         """删除考试及其相关文件"""
-        async with async_db_session() as session:
-            # 获取考试记录
-            exam = await self.crud.get_exam_by_id(session, exam_id)
+        async with file_store_service.session() as session:
+            # 获取考试记录并加行锁，与存储迁移互斥
+            exam = await self.crud.get_exam_by_id(session, exam_id, for_update=True)
 
             if not exam:
                 raise errors.NotFoundError(msg='考试记录不存在')
 
-            # 删除题目文件
-            if exam.questions_path and os.path.exists(exam.questions_path):
-                try:
-                    os.remove(exam.questions_path)
-                except OSError:
-                    raise errors.ServerError(msg='删除题目文件失败')
+            # 释放题目文件，其他考试仍引用相同内容时保留文件
+            if exam.questions_path:
+                await self._release_file(session, exam.questions_path)
 
             # 使用CRUD删除考试记录
             await self.crud.delete_exam(session, exam.id)
             return exam_id
 
+    @staticmethod
+    async def _release_file(session, path: str):
+        """释放对题目文件的引用；去重存储之前保存的旧文件没有引用记录，提交后直接删除"""
+        if await file_store_service.release(session, path) is None:
+            file_store_service.remove_after_commit(session, path)
+
     async def get_exam_by_id(
             self,
             exam_id: int
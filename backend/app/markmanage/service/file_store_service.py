@@ -0,0 +1,179 @@
+# backend/app/markmanage/service/file_store_service.py
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import UploadFile
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.database.engine import async_db_session
+from backend.app.markmanage.crud.crud_stored_file import StoredFileCRUD
+from backend.utils.file_service import FileService
+from backend.utils.file_utils import content_addressed_path, place_file, run_disk_io, write_temp_file
+
+
+def _link_temp_file(source_path: str, directory: str, file_hash: str = None) -> tuple[str, str, int]:
+    """
+    为已有文件创建存储目录下的临时硬链接并计算SHA-256（同步函数，应在线程池中调用）
+
+    不在同一文件系统或不支持硬链接时改为复制。
+
+    :param file_hash: 调用方已校验的SHA-256，提供时不再读取文件计算
+    """
+    if file_hash is None:
+        file_hash = FileService.get_file_metadata(source_path)["hash"]
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".upload-{os.urandom(8).hex()}.tmp")
+    try:
+        os.link(source_path, temp_path)
+    except OSError:
+        with open(source_path, "rb") as f:
+            return write_temp_file(f, directory)
+    return temp_path, file_hash, os.path.getsize(temp_path)
+
+
+def _remove_file(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+logger = logging.getLogger(__name__)
+
+# session.info 中的键：本事务新放置的文件、提交后应删除的文件、事务结束后待清理的文件
+_PLACED = "file_store_placed"
+_RELEASED = "file_store_released"
+_TO_REMOVE = "file_store_to_remove"
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    """提交成功：新放置的文件已被记录引用，释放的文件转为待清理"""
+    session.info.pop(_PLACED, None)
+    released = session.info.pop(_RELEASED, None)
+    if released:
+        session.info.setdefault(_TO_REMOVE, []).extend(released)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _after_transaction_end(session, transaction):
+    """最外层事务未提交就结束（回滚或关闭会话）：释放作废，新放置的文件转为待清理"""
+    if transaction.parent is not None:
+        return
+    session.info.pop(_RELEASED, None)
+    placed = session.info.pop(_PLACED, None)
+    if placed:
+        session.info.setdefault(_TO_REMOVE, []).extend(placed)
+
+
+class FileStoreService:
+    """
+    内容寻址文件存储
+
+    文件按内容的SHA-256存放在两级分片目录下，相同内容只保存一份，stored_files 表记录引用数。
+    所有方法只写入调用方的事务，由调用方（CRUD）统一提交，会话应通过 session() 获取：
+    新文件在提交前放置（提交后的记录总能找到文件），引用归零的文件在提交后才删除；
+    事务回滚时本事务新放置的文件被删除，释放的文件保留。
+    删除前在新事务中对路径加锁并确认没有记录重新引用该文件，与并发的上传不会互相删掉对方的文件。
+    存储中的文件不可修改。
+    """
+
+    def __init__(self):
+        self.crud = StoredFileCRUD()
+
+    @asynccontextmanager
+    async def session(self):
+        """数据库会话，会话关闭后按事务结果清理文件"""
+        db_session = async_db_session()
+        try:
+            async with db_session:
+                yield db_session
+        finally:
+            await self._remove_unreferenced(db_session.info.pop(_TO_REMOVE, []))
+
+    async def _remove_unreferenced(self, paths: list[str]):
+        """删除不再被任何记录引用的文件，删除失败只记录日志（事务已经结束）"""
+        for path in dict.fromkeys(paths):
+            try:
+                async with async_db_session() as session:
+                    async with session.begin():
+                        # 行锁（记录不存在时为间隙锁）阻塞并发上传插入同一路径，直到文件删除完成
+                        if await self.crud.get_by_path(session, path, for_update=True) is None:
+                            await run_disk_io(_remove_file, path)
+            except Exception as e:
+                logger.error(f"删除存储文件失败: {path}: {str(e)}")
+
+    @staticmethod
+    def remove_after_commit(session: AsyncSession, path: str):
+        """事务提交后删除文件（用于不在存储中的旧文件）"""
+        session.info.setdefault(_RELEASED, []).append(path)
+
+    async def store_upload(self, session: AsyncSession, upload_file: UploadFile, store_dir: str) -> str:
+        """
+        保存上传文件并增加一次引用，内容已存在时不重复保存
+
+        :return: 存储路径
+        """
+        await upload_file.seek(0)
+        temp_path, sha256, size = await run_disk_io(write_temp_file, upload_file.file, store_dir)
+        ext = os.path.splitext(upload_file.filename or "")[1]
+        return await self._add_reference(session, temp_path, sha256, size, store_dir, ext)
+
+    async def store_existing_file(self, session: AsyncSession, path: str, store_dir: str, ext: str = None,
+                                  sha256: str = None) -> str:
+        """
+        将服务器上已有的文件（如扫描生成的答卷PDF）加入存储并增加一次引用，原文件保留
+
+        :param ext: 存储文件的扩展名，默认沿用原文件的扩展名
+        :param sha256: 调用方已校验的文件SHA-256（如分块上传完成时计算的哈希），提供时不再重新计算
+        :return: 存储路径
+        """
+        temp_path, sha256, size = await run_disk_io(_link_temp_file, path, store_dir, sha256)
+        ext = os.path.splitext(path)[1] if ext is None else ext
+        return await self._add_reference(session, temp_path, sha256, size, store_dir, ext)
+
+    async def _add_reference(self, session, temp_path, sha256, size, store_dir, ext):
+        """在行锁下增加引用并放置文件（事务回滚后删除），临时文件总会被移走或删除"""
+        try:
+            stored = await self.crud.get_by_hash(session, sha256, for_update=True)
+            if stored is None:
+                try:
+                    # 并发上传相同的新内容时，唯一约束只让其中一个插入成功
+                    async with session.begin_nested():
+                        stored = await self.crud.create(
+                            session, sha256, content_addressed_path(store_dir, sha256, ext), size
+                        )
+                except IntegrityError:
+                    stored = await self.crud.get_by_hash(session, sha256, for_update=True)
+                    stored.ref_count += 1
+            else:
+                stored.ref_count += 1
+            if await run_disk_io(place_file, temp_path, stored.path, False):
+                session.info.setdefault(_PLACED, []).append(stored.path)
+            await session.flush()
+            return stored.path
+        finally:
+            await run_disk_io(_remove_file, temp_path)
+
+    async def release(self, session: AsyncSession, path: str) -> bool | None:
+        """
+        减少一次引用，最后一个引用释放时删除记录，文件在事务提交后删除
+
+        :return: 是否释放了最后一个引用；路径不在存储中（旧的未去重文件）时返回None，由调用方自行处理
+        """
+        stored = await self.crud.get_by_path(session, path, for_update=True)
+        if stored is None:
+            return None
+        stored.ref_count -= 1
+        if stored.ref_count > 0:
+            await session.flush()
+            return False
+        await self.crud.delete(session, stored.id)
+        self.remove_after_commit(session, path)
+        return True
+
+
+# Service 实例
+file_store_service = FileStoreService()
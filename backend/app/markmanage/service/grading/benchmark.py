@@ -0,0 +1,128 @@
+# backend/app/markmanage/service/grading/benchmark.py
+"""
+批改吞吐量离线测量
+
+用内存中的答卷存储代替数据库，对桩模型（进程内，或通过HTTP访问本地桩模型服务）
+按不同的最大并发请求数各跑一遍，输出每秒批改份数与单次模型调用延迟的分位数。
+
+用法:
+    python -m backend.app.markmanage.service.grading.benchmark --papers 500 --latency 0.2 --in-flight 1 4 16 64
+    python -m backend.app.markmanage.service.grading.benchmark --url http://127.0.0.1:8765 --in-flight 8 32
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from backend.app.markmanage.service.connect_scanners.telemetry import percentile
+from backend.app.markmanage.service.grading.engine import GradingEngine, PaperGradingStore
+from backend.app.markmanage.service.grading.model_client import (
+    GradingRequest,
+    GradingResult,
+    HTTPModelClient,
+    ModelClient,
+    StubModelClient,
+)
+
+
+class MemoryPaperStore(PaperGradingStore):
+    """内存中的答卷存储"""
+
+    def __init__(self, papers: int, content_size: int = 2000):
+        self.pending = [
+            GradingRequest(paper_id=i + 1, exam_id=1, student_id=i + 1, content=f"答卷{i + 1} " + "答" * content_size)
+            for i in range(papers)
+        ]
+        self.results = {}
+        self.released = []
+
+    async def claim(self, limit: int, exam_id: int = None) -> list[GradingRequest]:
+        batch, self.pending = self.pending[:limit], self.pending[limit:]
+        return batch
+
+    async def save_results(self, results: list[GradingResult]):
+        for result in results:
+            self.results[result.paper_id] = result
+
+    async def release(self, paper_ids: list[int], attempted: bool = True):
+        self.released.extend(paper_ids)
+
+
+class TimedModelClient(ModelClient):
+    """记录每次模型调用耗时的客户端包装"""
+
+    def __init__(self, client: ModelClient):
+        self.client = client
+        self.latencies = []
+
+    async def grade(self, request: GradingRequest) -> GradingResult:
+        start = time.perf_counter()
+        try:
+            return await self.client.grade(request)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    async def close(self):
+        await self.client.close()
+
+
+async def run_once(client: ModelClient, papers: int, batch_size: int, max_in_flight: int) -> dict:
+    """按给定并发数批改 papers 份答卷"""
+    store = MemoryPaperStore(papers)
+    timed = TimedModelClient(client)
+    engine = GradingEngine(timed, store, batch_size=batch_size, max_in_flight=max_in_flight,
+                           flush_interval=0.2, retry_delay=0.1)
+    start = time.perf_counter()
+    stats = await engine.run()
+    elapsed = time.perf_counter() - start
+    return {
+        "max_in_flight": max_in_flight,
+        "graded": stats["graded"],
+        "failed": stats["failed"],
+        "seconds": elapsed,
+        "papers_per_second": stats["graded"] / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(timed.latencies, 50),
+        "p95": percentile(timed.latencies, 95),
+        "p99": percentile(timed.latencies, 99),
+    }
+
+
+async def benchmark(args) -> list[dict]:
+    rows = []
+    for max_in_flight in args.in_flight:
+        if args.url:
+            client = HTTPModelClient(args.url, max_connections=max_in_flight)
+        else:
+            client = StubModelClient(latency=args.latency, jitter=args.jitter)
+        try:
+            rows.append(await run_once(client, args.papers, args.batch_size, max_in_flight))
+        finally:
+            await client.close()
+    return rows
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="批改吞吐量离线测量")
+    parser.add_argument("--papers", type=int, default=200, help="每轮批改的答卷数")
+    parser.add_argument("--batch-size", type=int, default=50, help="每次领取与写回的答卷数")
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 16], help="要测量的最大并发请求数")
+    parser.add_argument("--url", default=None, help="桩模型服务地址，为空时使用进程内桩模型")
+    parser.add_argument("--latency", type=float, default=0.2, help="进程内桩模型的平均延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.05, help="进程内桩模型的延迟波动（秒）")
+    return parser.parse_args()
+
+
+def main():
+    """主程序逻辑"""
+    args = parse_arguments()
+    rows = asyncio.run(benchmark(args))
+    print(f"{'并发':>6} {'完成':>6} {'失败':>6} {'耗时(s)':>9} {'份/秒':>9} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8}")
+    for row in rows:
+        print(f"{row['max_in_flight']:>6} {row['graded']:>6} {row['failed']:>6} {row['seconds']:>9.2f} "
+              f"{row['papers_per_second']:>9.1f} {row['p50']:>8.3f} {row['p95']:>8.3f} {row['p99']:>8.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# backend/app/markmanage/service/grading/cache.py
+import hashlib
+import re
+import unicodedata
+from collections import OrderedDict
+
+from backend.app.markmanage.service.grading.model_client import GradingRequest, GradingResult
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_content(content: str) -> str:
+    """
+    规范化答卷文本：Unicode NFKC（全角转半角等），每行首尾空白去掉、行内连续空白合并为一个空格，去掉空行
+
+    大小写与标点保留，它们影响评分。
+    """
+    text = unicodedata.normalize("NFKC", content)
+    lines = (_WHITESPACE.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def content_hash(content: str) -> str:
+    """规范化后文本的SHA-256"""
+    return hashlib.sha256(normalize_content(content).encode("utf-8")).hexdigest()
+
+
+def make_cache_key(content_sha256: str, questions_sha256: str, rubric_version: str) -> str:
+    """由文本哈希、题目文件哈希与评分标准版本组成缓存键"""
+    return hashlib.sha256(f"{content_sha256}\n{questions_sha256}\n{rubric_version}".encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """固定容量的最近最少使用缓存"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+
+class ResultCache:
+    """批改结果缓存接口"""
+
+    async def lookup(self, requests: list[GradingRequest]) -> dict[int, GradingResult]:
+        """
+        批量查询缓存，并为每个请求填写 cache_key
+
+        :return: 答卷ID -> 缓存的批改结果（只包含命中的答卷）
+        """
+        raise NotImplementedError
+
+    async def store(self, entries: list[tuple[str, GradingResult]]):
+        """批量写入 (缓存键, 批改结果)"""
+        raise NotImplementedError
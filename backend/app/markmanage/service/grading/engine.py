@@ -0,0 +1,327 @@
+# backend/app/markmanage/service/grading/engine.py
+import asyncio
+from dataclasses import replace
+from datetime import datetime
+
+from backend.app.markmanage.service.grading.cache import ResultCache
+from backend.app.markmanage.service.grading.model_client import (
+    GradingRequest,
+    GradingResult,
+    ModelClient,
+    ModelClientError,
+)
+
+
+class PaperGradingStore:
+    """待批改答卷的来源与批改结果的去处"""
+
+    async def claim(self, limit: int, exam_id: int = None) -> list[GradingRequest]:
+        """领取最多 limit 份待批改答卷，领取后其他批改进程不会再领取"""
+        raise NotImplementedError
+
+    async def save_results(self, results: list[GradingResult]):
+        """批量写回批改结果"""
+        raise NotImplementedError
+
+    async def release(self, paper_ids: list[int], attempted: bool = True):
+        """
+        归还未能批改的答卷，之后可以重新领取
+
+        :param attempted: 为False表示答卷领取后还没有调用过模型（运行停止时队列中剩余的答卷）
+        """
+        raise NotImplementedError
+
+    async def heartbeat(self):
+        """批改进行中定期调用，供需要续租的存储使用"""
+
+
+class GradingEngine:
+    """
+    异步批量批改引擎
+
+    领取协程按批领取待批改答卷放入队列（队列中最多两批，领取的答卷不会长时间积压），
+    max_in_flight 个批改协程从队列取答卷调用模型，进行中的模型请求数不超过 max_in_flight；
+    批改结果先缓存，满一批或每隔 flush_interval 秒批量写回。
+    模型调用失败时等待后重试，每份答卷最多尝试 max_attempts 次，仍失败的答卷归还给存储。
+    运行期间每隔 heartbeat_interval 秒调用一次存储的 heartbeat()。
+    配置了结果缓存时，每批答卷领取后先批量查询缓存，命中的答卷不调用模型；
+    同一次运行中内容相同（缓存键相同）的答卷只调用一次模型。
+    """
+
+    def __init__(
+            self,
+            client: ModelClient,
+            store: PaperGradingStore,
+            batch_size: int = 50,
+            max_in_flight: int = 8,
+            max_attempts: int = 3,
+            flush_interval: float = 1.0,
+            poll_interval: float = 5.0,
+            retry_delay: float = 1.0,
+            heartbeat_interval: float = 30.0,
+            cache: ResultCache = None
+    ):
+        """
+        :param client: 批改模型客户端
+        :param store: 答卷存储
+        :param batch_size: 每次领取与写回的答卷数
+        :param max_in_flight: 最大并发模型请求数
+        :param max_attempts: 每份答卷在一次运行中的最多尝试次数
+        :param flush_interval: 批改结果的最长缓存时间（秒）
+        :param poll_interval: 持续运行时没有待批改答卷后的轮询间隔（秒）
+        :param retry_delay: 失败重试前的等待时间（秒），按尝试次数递增
+        :param heartbeat_interval: 调用存储 heartbeat() 的间隔（秒）
+        :param cache: 批改结果缓存（可选）
+        """
+        self.client = client
+        self.store = store
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.heartbeat_interval = heartbeat_interval
+        self.cache = cache
+
+        self._queue = None
+        self._results = []
+        self._failed = []
+        self._unstarted = []
+        self._cache_entries = []
+        self._inflight = {}  # 缓存键 -> 该内容批改结果的 Future（保留到结果写入缓存）
+        self._flush_lock = asyncio.Lock()
+        self._flush_tasks = set()
+        self._stopping = False
+        self._task = None
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {
+            "running": False,
+            "exam_id": None,
+            "claimed": 0,
+            "graded": 0,
+            "failed": 0,
+            "retried": 0,
+            "cache_hits": 0,
+            "deduplicated": 0,
+            "in_flight": 0,
+            "saved_batches": 0,
+            "started_at": None,
+            "finished_at": None,
+            "last_error": None,
+        }
+
+    def status(self) -> dict:
+        """引擎状态与计数"""
+        stats = dict(self._stats)
+        if stats["started_at"] is not None:
+            end = stats["finished_at"] or datetime.now()
+            elapsed = (end - stats["started_at"]).total_seconds()
+            stats["papers_per_second"] = stats["graded"] / elapsed if elapsed > 0 else 0.0
+        return stats
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, exam_id: int = None, drain: bool = True) -> bool:
+        """
+        在后台开始批改
+
+        :param exam_id: 只批改该考试的答卷，为None时批改全部
+        :param drain: 为True时批改完当前的待批改答卷后停止，否则持续轮询新答卷
+        :return: 是否启动（已在运行时返回False）
+        """
+        if self.running:
+            return False
+        self._reset(exam_id)
+        self._task = asyncio.create_task(self._run(exam_id, drain))
+        return True
+
+    async def stop(self):
+        """停止领取新答卷，等待已领取的答卷批改完成并写回"""
+        self._stopping = True
+        if self._task is not None:
+            await self._task
+
+    async def run(self, exam_id: int = None, drain: bool = True) -> dict:
+        """
+        批改答卷直到没有待批改答卷（drain）或被停止
+
+        :return: 本次运行的统计
+        """
+        self._reset(exam_id)
+        return await self._run(exam_id, drain)
+
+    def _reset(self, exam_id):
+        self._stopping = False
+        self._stats = self._empty_stats()
+        self._stats.update(running=True, exam_id=exam_id, started_at=datetime.now())
+        self._queue = asyncio.Queue()
+
+    async def _run(self, exam_id, drain) -> dict:
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.max_in_flight)]
+        background = [
+            asyncio.create_task(self._flush_periodically()),
+            asyncio.create_task(self._heartbeat_periodically()),
+        ]
+        try:
+            await self._feed(exam_id, drain)
+            await self._queue.join()
+        finally:
+            for task in workers + background:
+                task.cancel()
+            await asyncio.gather(*workers, *background, *self._flush_tasks, return_exceptions=True)
+            # 被取消时队列中可能还有已领取但未批改的答卷，一并归还
+            while not self._queue.empty():
+                self._unstarted.append(self._queue.get_nowait().paper_id)
+            await self._flush()
+            self._stats.update(running=False, in_flight=0, finished_at=datetime.now())
+        return self.status()
+
+    async def _feed(self, exam_id, drain):
+        """按批领取答卷，队列中的答卷不超过两批"""
+        while not self._stopping:
+            if self._queue.qsize() >= self.batch_size:
+                await asyncio.sleep(0.01)
+                continue
+            requests = await self.store.claim(self.batch_size, exam_id)
+            if not requests:
+                # 已领取的答卷都在队列或批改协程中，由 queue.join() 等待完成
+                if drain:
+                    return
+                await asyncio.sleep(self.poll_interval)
+                continue
+            self._stats["claimed"] += len(requests)
+            cached = await self._lookup_cache(requests)
+            for request in requests:
+                result = cached.get(request.paper_id)
+                if result is None:
+                    self._queue.put_nowait(request)
+                else:
+                    self._stats["cache_hits"] += 1
+                    self._add_result(result)
+
+    async def _lookup_cache(self, requests: list[GradingRequest]) -> dict:
+        """查询缓存，缓存不可用时当作全部未命中"""
+        if self.cache is None:
+            return {}
+        try:
+            return await self.cache.lookup(requests)
+        except Exception as e:
+            self._stats["last_error"] = f"缓存查询失败: {str(e)}"
+            return {}
+
+    def _add_result(self, result: GradingResult):
+        """缓存批改结果，满一批时在后台写回"""
+        self._stats["graded"] += 1
+        self._results.append(result)
+        if len(self._results) >= self.batch_size:
+            task = asyncio.create_task(self._flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _worker(self):
+        while True:
+            request = await self._queue.get()
+            try:
+                result = await self._grade(request)
+            except ModelClientError:
+                self._stats["failed"] += 1
+                self._failed.append(request.paper_id)
+            except asyncio.CancelledError:
+                # 运行被取消，正在批改的答卷随后归还
+                self._unstarted.append(request.paper_id)
+                raise
+            else:
+                self._add_result(result)
+            finally:
+                self._queue.task_done()
+
+    async def _grade(self, request: GradingRequest) -> GradingResult:
+        """批改一份答卷；相同内容正在批改或已批改但尚未写入缓存时共用其结果"""
+        key = request.cache_key
+        if key is None:
+            return await self._grade_with_retry(request)
+        shared = self._inflight.get(key)
+        if shared is not None:
+            result = await asyncio.shield(shared)
+            if result is not None:
+                self._stats["deduplicated"] += 1
+                return replace(result, paper_id=request.paper_id)
+            # 先批改的答卷失败了，自己调用模型
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        result = None
+        try:
+            result = await self._grade_with_retry(request)
+            self._cache_entries.append((key, result))
+            return result
+        finally:
+            future.set_result(result)
+            # 成功的结果保留到写入缓存之后，失败的移除以便后来者重试
+            if result is None and self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _grade_with_retry(self, request: GradingRequest) -> GradingResult:
+        """调用模型批改，失败时按尝试次数递增等待后重试"""
+        attempt = 1
+        while True:
+            self._stats["in_flight"] += 1
+            try:
+                return await self.client.grade(request)
+            except ModelClientError as e:
+                self._stats["last_error"] = str(e)
+                if attempt >= self.max_attempts or self._stopping:
+                    raise
+            finally:
+                self._stats["in_flight"] -= 1
+            self._stats["retried"] += 1
+            await asyncio.sleep(self.retry_delay * attempt)
+            attempt += 1
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush()
+
+    async def _heartbeat_periodically(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.store.heartbeat()
+            except Exception as e:
+                self._stats["last_error"] = f"心跳失败: {str(e)}"
+
+    async def _flush(self):
+        """批量写回批改结果并归还失败的答卷，写回失败时保留到下次"""
+        async with self._flush_lock:
+            results, self._results = self._results, []
+            failed, self._failed = self._failed, []
+            unstarted, self._unstarted = self._unstarted, []
+            cache_entries, self._cache_entries = self._cache_entries, []
+            try:
+                if results:
+                    await self.store.save_results(results)
+                    self._stats["saved_batches"] += 1
+                    results = []
+                if failed:
+                    await self.store.release(failed)
+                    failed = []
+                if unstarted:
+                    await self.store.release(unstarted, attempted=False)
+            except Exception as e:
+                self._stats["last_error"] = f"写回失败: {str(e)}"
+                self._results[:0] = results
+                self._failed[:0] = failed
+                self._unstarted[:0] = unstarted
+            if cache_entries and self.cache is not None:
+                try:
+                    await self.cache.store(cache_entries)
+                except Exception as e:
+                    self._stats["last_error"] = f"缓存写入失败: {str(e)}"
+                for key, _ in cache_entries:
+                    self._inflight.pop(key, None)
+
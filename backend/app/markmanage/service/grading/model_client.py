@@ -0,0 +1,140 @@
+# backend/app/markmanage/service/grading/model_client.py
+import asyncio
+import hashlib
+import json
+import random
+from dataclasses import dataclass, field
+
+
+class ModelClientError(RuntimeError):
+    """批改模型调用失败"""
+
+
+@dataclass
+class GradingRequest:
+    """一份答卷的批改请求"""
+    paper_id: int
+    exam_id: int
+    student_id: int
+    content: str
+    cache_key: str = None  # 批改结果缓存的键，由缓存查询时填写
+
+
+@dataclass
+class GradingResult:
+    """一份答卷的批改结果"""
+    paper_id: int
+    scores: dict = field(default_factory=dict)  # 题号 -> 得分
+    total_score: float = 0.0
+    comments: str = ""
+
+    def to_text(self) -> str:
+        """序列化为写入 Paper.scores_comments 的JSON文本"""
+        return json.dumps(
+            {"scores": self.scores, "total_score": self.total_score, "comments": self.comments},
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_text(cls, paper_id: int, text: str) -> "GradingResult":
+        """从 to_text() 的JSON文本还原"""
+        data = json.loads(text)
+        return cls(paper_id=paper_id, scores=data["scores"], total_score=data["total_score"],
+                   comments=data.get("comments", ""))
+
+
+def stub_grade(content: str, questions: int = 5, max_score: float = 10.0) -> dict:
+    """
+    桩模型的评分规则：按内容哈希生成确定的分数，相同内容总是得到相同结果
+
+    :return: {"scores": {...}, "total_score": ..., "comments": ...}
+    """
+    digest = hashlib.sha256(content.encode("utf-8")).digest()
+    scores = {str(i + 1): round(digest[i] / 255 * max_score, 1) for i in range(questions)}
+    total = round(sum(scores.values()), 1)
+    return {"scores": scores, "total_score": total, "comments": f"桩模型评分：共 {len(content)} 字"}
+
+
+class ModelClient:
+    """批改模型客户端接口"""
+
+    async def grade(self, request: GradingRequest) -> GradingResult:
+        """批改一份答卷，失败时抛出 ModelClientError"""
+        raise NotImplementedError
+
+    async def close(self):
+        """释放连接等资源"""
+
+
+class StubModelClient(ModelClient):
+    """进程内桩模型：按配置的延迟返回确定的分数，用于离线测试"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0):
+        """
+        :param latency: 每次调用的平均延迟（秒）
+        :param jitter: 延迟的随机波动范围（秒）
+        """
+        self.latency = latency
+        self.jitter = jitter
+
+    async def grade(self, request: GradingRequest) -> GradingResult:
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return GradingResult(paper_id=request.paper_id, **stub_grade(request.content))
+
+
+class HTTPModelClient(ModelClient):
+    """
+    通过HTTP调用批改模型服务
+
+    请求 POST {base_url}/grade，请求体为 {"paper_id", "exam_id", "student_id", "content"}，
+    响应为 {"scores": {...}, "total_score": ..., "comments": ...}。
+    连接池大小与引擎的最大并发请求数一致，请求复用长连接。
+    """
+
+    def __init__(self, base_url: str, timeout: float = 60.0, api_key: str = None, max_connections: int = 8):
+        """
+        :param base_url: 模型服务地址
+        :param timeout: 单次请求超时（秒）
+        :param api_key: 鉴权令牌（可选）
+        :param max_connections: 连接池大小
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ModelClientError("HTTP模型客户端需要安装 httpx")
+
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        self._httpx = httpx
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            headers=headers,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def grade(self, request: GradingRequest) -> GradingResult:
+        try:
+            response = await self._client.post("/grade", json={
+                "paper_id": request.paper_id,
+                "exam_id": request.exam_id,
+                "student_id": request.student_id,
+                "content": request.content,
+            })
+            response.raise_for_status()
+            data = response.json()
+        except (self._httpx.HTTPError, ValueError) as e:
+            raise ModelClientError(f"批改模型调用失败: {str(e)}")
+        try:
+            return GradingResult(
+                paper_id=request.paper_id,
+                scores=data["scores"],
+                total_score=float(data["total_score"]),
+                comments=data.get("comments", ""),
+            )
+        except (KeyError, TypeError, ValueError):
+            raise ModelClientError("批改模型返回的结果格式错误")
+
+    async def close(self):
+        await self._client.aclose()
@@ -0,0 +1,86 @@
+# backend/app/markmanage/service/grading/stub_server.py
+"""
+本地桩模型服务
+
+实现与 HTTPModelClient 相同的 /grade 接口，按配置的延迟返回确定的分数，
+用于在没有真实模型服务时离线测量批改吞吐量。
+
+用法:
+    python -m backend.app.markmanage.service.grading.stub_server --port 8765 --latency 0.5 --jitter 0.1
+"""
+import argparse
+import asyncio
+import random
+import sys
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from backend.app.markmanage.service.grading.model_client import stub_grade
+
+
+class StubGradeRequest(BaseModel):
+    paper_id: int
+    exam_id: int
+    student_id: int
+    content: str
+
+
+def create_stub_app(latency: float = 0.5, jitter: float = 0.0, failure_rate: float = 0.0) -> FastAPI:
+    """
+    创建桩模型服务应用
+
+    :param latency: 每次请求的平均延迟（秒）
+    :param jitter: 延迟的随机波动范围（秒）
+    :param failure_rate: 返回 503 的请求比例（0-1），用于测试失败重试
+    """
+    app = FastAPI(title="stub grading model")
+    app.state.requests = 0
+    app.state.in_flight = 0
+    app.state.max_in_flight = 0
+
+    @app.post("/grade")
+    async def grade(obj: StubGradeRequest):
+        app.state.requests += 1
+        app.state.in_flight += 1
+        app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+        try:
+            await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            if failure_rate and random.random() < failure_rate:
+                return JSONResponse(status_code=503, content={"detail": "overloaded"})
+            return stub_grade(obj.content)
+        finally:
+            app.state.in_flight -= 1
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests, "in_flight": app.state.in_flight,
+                "max_in_flight": app.state.max_in_flight}
+
+    return app
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="本地桩模型服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--latency", type=float, default=0.5, help="每次请求的平均延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟的随机波动范围（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="返回 503 的请求比例（0-1）")
+    return parser.parse_args()
+
+
+def main():
+    """主程序逻辑"""
+    import uvicorn
+
+    args = parse_arguments()
+    app = create_stub_app(args.latency, args.jitter, args.failure_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# backend/app/markmanage/service/grading_cache_service.py
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from backend.config.fileConfig import settings
+from backend.database.engine import async_db_session
+from backend.utils.file_service import FileService
+from backend.app.markmanage.crud.crud_exam import ExamCRUD
+from backend.app.markmanage.crud.crud_grading_cache import GradingCacheCRUD
+from backend.app.markmanage.service.grading.cache import LRUCache, ResultCache, content_hash, make_cache_key
+from backend.app.markmanage.service.grading.model_client import GradingRequest, GradingResult
+
+
+class GradingCacheService(ResultCache):
+    """
+    批改结果缓存业务逻辑服务层
+
+    缓存键由规范化答卷文本的哈希、考试题目文件的哈希与评分标准版本组成，
+    答卷文本、题目或评分标准任一变化都不会命中旧结果。
+    进程内 LRU 缓存在前，grading_cache 表在后（所有批改进程共享），表中的条目按创建时间与总条数淘汰。
+    """
+
+    def __init__(self):
+        self.exam_crud = ExamCRUD()
+        self.cache_crud = GradingCacheCRUD()
+        self.memory = LRUCache(settings.GRADING_CACHE_MEMORY_ENTRIES)
+        self._last_evict = time.monotonic()
+        # 缓存键 -> (文本哈希, 题目文件哈希)，查询时记录，写入时使用
+        self._components = LRUCache(settings.GRADING_CACHE_MEMORY_ENTRIES)
+        self.counters = self._empty_counters()
+
+    @staticmethod
+    def _empty_counters() -> dict:
+        return {"memory_hits": 0, "db_hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    @property
+    def rubric_version(self) -> str:
+        # 不同的模型后端给出的结果不通用
+        return f"{settings.GRADING_MODEL_BACKEND}/{settings.GRADING_RUBRIC_VERSION}"
+
+    async def _questions_hashes(self, session, exam_ids: set[int]) -> dict[int, str]:
+        """考试ID -> 题目文件哈希（没有题目文件时为空字符串）"""
+        hashes = {}
+        for exam_id, questions_path, sha256 in await self.exam_crud.get_questions_hashes(session, list(exam_ids)):
+            if sha256 is None and questions_path:
+                # 去重存储之前的旧文件通过元数据缓存获取哈希
+                try:
+                    sha256 = (await asyncio.to_thread(FileService.get_file_metadata, questions_path))["hash"]
+                except OSError:
+                    sha256 = None
+            hashes[exam_id] = sha256 or ""
+        return hashes
+
+    async def lookup(self, requests: list[GradingRequest]) -> dict[int, GradingResult]:
+        if not requests:
+            return {}
+        found = {}
+        async with async_db_session() as session:
+            questions_hashes = await self._questions_hashes(session, {request.exam_id for request in requests})
+            version = self.rubric_version
+            for request in requests:
+                text_hash = content_hash(request.content)
+                questions_hash = questions_hashes.get(request.exam_id, "")
+                request.cache_key = make_cache_key(text_hash, questions_hash, version)
+                self._components.put(request.cache_key, (text_hash, questions_hash))
+                text = self.memory.get(request.cache_key)
+                if text is not None:
+                    found[request.cache_key] = text
+
+            missing = list({request.cache_key for request in requests} - set(found))
+            from_db = await self.cache_crud.get_many(session, missing) if missing else {}
+            for cache_key, text in from_db.items():
+                self.memory.put(cache_key, text)
+            found.update(from_db)
+            if found:
+                await self.cache_crud.touch(session, list(found))
+                await session.commit()
+
+        hits = {}
+        for request in requests:
+            text = found.get(request.cache_key)
+            if text is None:
+                self.counters["misses"] += 1
+            else:
+                self.counters["db_hits" if request.cache_key in from_db else "memory_hits"] += 1
+                hits[request.paper_id] = GradingResult.from_text(request.paper_id, text)
+        return hits
+
+    async def store(self, entries: list[tuple[str, GradingResult]]):
+        rows = {}
+        version = self.rubric_version
+        for cache_key, result in entries:
+            components = self._components.get(cache_key)
+            if components is None:
+                continue
+            text = result.to_text()
+            self.memory.put(cache_key, text)
+            rows[cache_key] = {
+                "cache_key": cache_key,
+                "content_sha256": components[0],
+                "questions_sha256": components[1],
+                "rubric_version": version,
+                "result": text,
+            }
+        if rows:
+            try:
+                async with async_db_session() as session:
+                    async with session.begin():
+                        self.counters["stored"] += await self.cache_crud.add_many(session, list(rows.values()))
+            except IntegrityError:
+                # 其他批改进程同时写入了相同的键
+                pass
+        if time.monotonic() - self._last_evict >= settings.GRADING_CACHE_EVICT_INTERVAL:
+            await self.evict()
+
+    async def evict(self) -> int:
+        """按创建时间与总条数淘汰数据库中的缓存，返回淘汰数"""
+        self._last_evict = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(days=settings.GRADING_CACHE_MAX_AGE_DAYS)
+        async with async_db_session() as session:
+            async with session.begin():
+                evicted = await self.cache_crud.delete_older_than(session, cutoff)
+                evicted += await self.cache_crud.delete_least_recently_used(session, settings.GRADING_CACHE_MAX_ENTRIES)
+        self.counters["evicted"] += evicted
+        return evicted
+
+    async def stats(self) -> dict:
+        """命中统计（本进程）与缓存条数"""
+        async with async_db_session() as session:
+            db_entries = await self.cache_crud.count(session)
+        lookups = self.counters["memory_hits"] + self.counters["db_hits"] + self.counters["misses"]
+        hits = self.counters["memory_hits"] + self.counters["db_hits"]
+        return {
+            **self.counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "db_entries": db_entries,
+            "rubric_version": self.rubric_version,
+        }
+
+
+# Service 实例
+grading_cache_service = GradingCacheService()
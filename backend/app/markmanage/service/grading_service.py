@@ -0,0 +1,272 @@
+# backend/app/markmanage/service/grading_service.py
+"""
+批改业务逻辑服务层与批改进程
+
+批改以 grading_jobs 表为任务队列：每份答卷一个任务，批改进程领取任务时取得有期限的租约并定期续租，
+写回结果时只接受仍由自己持有租约的任务，因此任意多个进程（可在不同服务器上）可以同时批改同一场考试，
+进程崩溃后其任务在租约过期时被其他进程回收，同一份答卷不会被重复写回。
+各服务器的时钟需要同步（误差远小于租约时长）。
+
+用法（独立的批改进程）:
+    python -m backend.app.markmanage.service.grading_service --exam-id 3 --enqueue
+    python -m backend.app.markmanage.service.grading_service --exam-id 3 --drain
+    python -m backend.app.markmanage.service.grading_service
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+
+from backend.common.exception import errors
+from backend.config.fileConfig import settings
+from backend.database.engine import async_db_session
+from backend.app.markmanage.crud.crud_grading_job import GradingJobCRUD
+from backend.app.markmanage.crud.crud_paper import PaperCRUD
+from backend.app.markmanage.service.grading_cache_service import grading_cache_service
+from backend.app.markmanage.service.grading.engine import GradingEngine, PaperGradingStore
+from backend.app.markmanage.service.grading.model_client import (
+    GradingRequest,
+    GradingResult,
+    HTTPModelClient,
+    ModelClientError,
+    StubModelClient,
+)
+
+
+def default_worker_id() -> str:
+    """批改进程标识：主机名、进程号与随机后缀"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobQueuePaperStore(PaperGradingStore):
+    """以 grading_jobs 表为队列的答卷存储"""
+
+    def __init__(self, worker_id: str, lease_seconds: float, max_attempts: int, retry_delay: float):
+        """
+        :param worker_id: 批改进程标识，作为租约持有者
+        :param lease_seconds: 租约时长（秒）
+        :param max_attempts: 任务最多领取次数
+        :param retry_delay: 批改失败的任务重新可见的延迟（秒）
+        """
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.job_crud = GradingJobCRUD()
+        self.paper_crud = PaperCRUD()
+        self._last_sweep = 0.0
+
+    async def claim(self, limit: int, exam_id: int = None) -> list[GradingRequest]:
+        await self._sweep_expired()
+        async with async_db_session() as session:
+            async with session.begin():
+                rows = await self.job_crud.claim_jobs(session, self.worker_id, limit, self.lease_seconds, exam_id)
+        return [
+            GradingRequest(paper_id=paper_id, exam_id=exam_id, student_id=student_id, content=content)
+            for paper_id, exam_id, student_id, content in rows
+        ]
+
+    async def save_results(self, results: list[GradingResult]):
+        async with async_db_session() as session:
+            async with session.begin():
+                # 只写回仍持有租约的任务，租约已被回收的结果丢弃（由新的持有者写回）
+                owned = set(await self.job_crud.lock_owned_jobs(
+                    session, self.worker_id, [result.paper_id for result in results]
+                ))
+                rows = [
+                    {"id": result.paper_id, "scores_comments": result.to_text()}
+                    for result in results if result.paper_id in owned
+                ]
+                if rows:
+                    await self.paper_crud.bulk_update_grading_results(session, rows)
+                    await self.job_crud.complete_jobs(session, [row["id"] for row in rows])
+        if len(rows) < len(results):
+            print(f"⚠️ {len(results) - len(rows)} 份答卷的租约已过期，批改结果未写回")
+
+    async def release(self, paper_ids: list[int], attempted: bool = True):
+        async with async_db_session() as session:
+            async with session.begin():
+                await self.job_crud.release_jobs(
+                    session, self.worker_id, paper_ids, self.max_attempts, self.retry_delay,
+                    attempted=attempted, error='批改模型调用失败' if attempted else None
+                )
+
+    async def heartbeat(self):
+        async with async_db_session() as session:
+            async with session.begin():
+                await self.job_crud.extend_leases(session, self.worker_id, self.lease_seconds)
+
+    async def _sweep_expired(self):
+        """回收租约过期的任务，每个进程每半个租约时长最多执行一次"""
+        now = time.monotonic()
+        if now - self._last_sweep < self.lease_seconds / 2:
+            return
+        self._last_sweep = now
+        async with async_db_session() as session:
+            async with session.begin():
+                swept = await self.job_crud.requeue_expired_leases(session, self.max_attempts)
+        if swept["requeued"] or swept["failed"]:
+            print(f"⚠️ 回收租约过期的批改任务：重新排队 {swept['requeued']} 个，标记失败 {swept['failed']} 个")
+
+
+class GradingService:
+    """批改业务逻辑服务层"""
+
+    def __init__(self, worker_id: str = None):
+        self.worker_id = worker_id or default_worker_id()
+        self.job_crud = GradingJobCRUD()
+        self.engine = None
+
+    def _create_client(self):
+        """按配置创建批改模型客户端"""
+        if settings.GRADING_MODEL_BACKEND == "stub":
+            return StubModelClient(latency=settings.GRADING_STUB_LATENCY)
+        if settings.GRADING_MODEL_BACKEND == "http":
+            return HTTPModelClient(
+                settings.GRADING_MODEL_URL,
+                timeout=settings.GRADING_MODEL_TIMEOUT,
+                api_key=settings.GRADING_MODEL_API_KEY,
+                max_connections=settings.GRADING_MAX_IN_FLIGHT,
+            )
+        raise ValueError(f"未知的批改模型后端: {settings.GRADING_MODEL_BACKEND}")
+
+    def _get_engine(self) -> GradingEngine:
+        """获取批改引擎，首次调用时创建"""
+        if self.engine is None:
+            try:
+                client = self._create_client()
+            except (ModelClientError, ValueError) as e:
+                raise errors.ServerError(msg=f'批改模型不可用: {str(e)}')
+            store = JobQueuePaperStore(
+                self.worker_id,
+                lease_seconds=settings.GRADING_LEASE_SECONDS,
+                max_attempts=settings.GRADING_JOB_MAX_ATTEMPTS,
+                retry_delay=settings.GRADING_JOB_RETRY_DELAY,
+            )
+            self.engine = GradingEngine(
+                client,
+                store,
+                batch_size=settings.GRADING_BATCH_SIZE,
+                max_in_flight=settings.GRADING_MAX_IN_FLIGHT,
+                max_attempts=settings.GRADING_MAX_ATTEMPTS,
+                heartbeat_interval=settings.GRADING_HEARTBEAT_INTERVAL,
+                cache=grading_cache_service if settings.GRADING_CACHE_ENABLED else None,
+            )
+        return self.engine
+
+    async def enqueue(self, exam_id: int = None, retry_failed: bool = False, regrade: bool = False) -> int:
+        """
+        为待批改答卷创建批改任务
+
+        :param exam_id: 只处理该考试的答卷，为None时处理全部
+        :param retry_failed: 是否把失败的任务重新排队
+        :param regrade: 是否把已完成的任务也重新排队（重新批改，内容未变的答卷命中结果缓存）
+        :return: 新排队的任务数
+        """
+        statuses = ('done', 'failed') if regrade else ('failed',) if retry_failed else ()
+        try:
+            async with async_db_session() as session:
+                async with session.begin():
+                    count = await self.job_crud.enqueue_pending_papers(session, exam_id)
+                    if statuses:
+                        count += await self.job_crud.requeue_finished_jobs(session, exam_id, statuses)
+        except IntegrityError:
+            # 其他进程同时为同一批答卷创建了任务
+            return 0
+        return count
+
+    async def start(self, exam_id: int = None, drain: bool = True, retry_failed: bool = False,
+                    regrade: bool = False) -> dict:
+        """
+        为待批改答卷创建任务，并在本进程后台开始批改
+
+        :param exam_id: 只批改该考试的答卷，为None时批改全部
+        :param drain: 为True时队列中没有可领取的任务后停止，否则持续领取新任务
+        :param retry_failed: 是否把失败的任务重新排队
+        :param regrade: 是否重新批改已完成的答卷
+        :return: 引擎状态
+        """
+        engine = self._get_engine()
+        if engine.running:
+            raise errors.RequestError(msg='批改正在进行中')
+        await self.enqueue(exam_id, retry_failed, regrade)
+        engine.start(exam_id, drain)
+        return engine.status()
+
+    async def stop(self) -> dict:
+        """停止批改，已领取的答卷批改完成并写回后返回"""
+        if self.engine is None or not self.engine.running:
+            raise errors.RequestError(msg='批改未在进行')
+        await self.engine.stop()
+        return self.engine.status()
+
+    def status(self) -> dict:
+        """本进程批改引擎的状态"""
+        if self.engine is None:
+            return GradingEngine._empty_stats()
+        return self.engine.status()
+
+    async def get_job_counts(self, exam_id: int = None) -> dict:
+        """按状态统计批改任务数（所有批改进程）"""
+        async with async_db_session() as session:
+            counts = await self.job_crud.count_by_status(session, exam_id)
+        return {status: counts.get(status, 0) for status in ("queued", "leased", "done", "failed")}
+
+    async def shutdown(self):
+        """应用关闭时停止批改并释放模型连接"""
+        if self.engine is not None:
+            if self.engine.running:
+                await self.engine.stop()
+            await self.engine.client.close()
+
+
+# Service 实例
+grading_service = GradingService()
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="批改进程：从批改任务队列领取答卷并批改")
+    parser.add_argument("--exam-id", type=int, default=None, help="只批改该考试的答卷")
+    parser.add_argument("--enqueue", action="store_true", help="只为待批改答卷创建任务，不批改")
+    parser.add_argument("--retry-failed", action="store_true", help="把失败的任务重新排队")
+    parser.add_argument("--regrade", action="store_true", help="把已完成的任务也重新排队")
+    parser.add_argument("--drain", action="store_true", help="队列中没有可领取的任务后退出，否则持续运行")
+    parser.add_argument("--worker-id", default=None, help="批改进程标识，默认为主机名:进程号:随机后缀")
+    return parser.parse_args()
+
+
+async def run_worker(args):
+    service = GradingService(args.worker_id)
+    if args.enqueue or args.retry_failed or args.regrade:
+        count = await service.enqueue(args.exam_id, args.retry_failed, args.regrade)
+        print(f"已排队 {count} 个批改任务")
+        if args.enqueue:
+            return
+    engine = service._get_engine()
+    print(f"批改进程 {service.worker_id} 开始领取任务")
+    try:
+        stats = await engine.run(args.exam_id, drain=args.drain)
+    finally:
+        await engine.client.close()
+    print(f"✅ 批改结束: 领取 {stats['claimed']} 份，完成 {stats['graded']} 份，失败 {stats['failed']} 份，"
+          f"{stats.get('papers_per_second', 0):.1f} 份/秒")
+
+
+def main():
+    """主程序逻辑"""
+    args = parse_arguments()
+    try:
+        asyncio.run(run_worker(args))
+    except KeyboardInterrupt:
+        print("批改进程已停止，未写回的任务将在租约过期后由其他进程重新领取")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+答卷识别吞吐量基准测试
+
+生成合成的扫描答卷PDF，用桩引擎（不需要 Tesseract）按实际流程（OCRService._recognize_paper，
+按页码范围拆分任务交给进程池）识别全部答卷，对比1个进程与N个进程的每秒页数。
+不使用页面缓存，也不读写数据库，每种进程数的测试条件相同。
+
+用法:
+    python -m backend.app.markmanage.service.ocr.benchmark --papers 20 --pages 4 --workers 1 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw
+
+from backend.app.markmanage.service.ocr.worker import init_worker
+from backend.app.markmanage.service.ocr_service import OCRService
+
+
+def create_papers(directory: str, papers: int, pages: int, size=(1240, 1754)) -> list[str]:
+    """生成合成答卷PDF（每页一张灰度图像），每页内容不同"""
+    paths = []
+    for paper in range(papers):
+        images = []
+        for page in range(pages):
+            img = Image.new("L", size, 255)
+            draw = ImageDraw.Draw(img)
+            for line in range(40):
+                y = 60 + line * 40
+                draw.text((80, y), f"paper {paper} page {page} line {line}", fill=0)
+            images.append(img)
+        path = os.path.join(directory, f"paper{paper}.pdf")
+        images[0].save(path, "PDF", resolution=150, save_all=True, append_images=images[1:])
+        paths.append(path)
+    return paths
+
+
+async def run_benchmark(paths: list[str], workers: int, pages_per_task: int) -> dict:
+    """
+    用 workers 个进程识别全部答卷
+
+    :return: dict 测试结果
+    """
+    service = OCRService()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=("stub", {}, None)) as executor:
+        # 先让所有进程完成启动，计时只包含识别
+        await asyncio.gather(*(
+            asyncio.get_running_loop().run_in_executor(executor, time.sleep, 0.05) for _ in range(workers)
+        ))
+        start = time.perf_counter()
+        rows = await asyncio.gather(*(
+            service._recognize_paper(executor, paper_id, path, pages_per_task) for paper_id, path in enumerate(paths)
+        ))
+        elapsed = time.perf_counter() - start
+
+    pages = sum(row["pages"] for row in rows)
+    return {
+        "workers": workers,
+        "papers": len(rows),
+        "pages": pages,
+        "seconds": elapsed,
+        "pages_per_second": pages / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def print_report(results: list[dict]):
+    """打印对比结果，加速比相对于第一项"""
+    baseline = results[0]["pages_per_second"] or 1.0
+    print(f"{'进程数':<8}{'答卷数':>8}{'页数':>8}{'耗时(秒)':>10}{'页/秒':>10}{'加速比':>8}")
+    for result in results:
+        print(f"{result['workers']:<8}{result['papers']:>8}{result['pages']:>8}{result['seconds']:>10.2f}"
+              f"{result['pages_per_second']:>10.1f}{result['pages_per_second'] / baseline:>8.2f}")
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="答卷识别吞吐量基准测试（桩引擎）")
+    parser.add_argument("--papers", type=int, default=20, help="答卷数")
+    parser.add_argument("--pages", type=int, default=4, help="每份答卷的页数")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="对比的进程数，默认为1与CPU核数")
+    parser.add_argument("--pages-per-task", type=int, default=2, help="每个任务处理的页数")
+    return parser.parse_args()
+
+
+def main():
+    """主程序逻辑"""
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"生成 {args.papers} 份答卷，每份 {args.pages} 页...")
+        paths = create_papers(directory, args.papers, args.pages)
+        results = [
+            asyncio.run(run_benchmark(paths, workers, args.pages_per_task))
+            for workers in dict.fromkeys(args.workers)
+        ]
+    print_report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# backend/app/markmanage/service/ocr/engines.py
+import hashlib
+import os
+import subprocess
+from io import BytesIO
+
+
+class OCRError(RuntimeError):
+    """文字识别失败"""
+
+
+class OCREngine:
+    """文字识别引擎接口，实例在批量识别的子进程中创建与使用"""
+
+    def cache_key(self) -> str:
+        """引擎及其参数的标识，参数不同的识别结果分开缓存"""
+        raise NotImplementedError
+
+    def recognize(self, img) -> str:
+        """
+        识别一张页面图像
+
+        :param img: PIL图像
+        :return: 识别出的文本
+        """
+        raise NotImplementedError
+
+
+class StubOCREngine(OCREngine):
+    """桩引擎：按图像像素生成确定的文本，用于没有安装 Tesseract 时测试流程与吞吐量"""
+
+    def cache_key(self) -> str:
+        return "stub"
+
+    def recognize(self, img) -> str:
+        digest = hashlib.sha256(img.tobytes()).hexdigest()
+        return f"[stub ocr {img.width}x{img.height} {digest[:16]}]"
+
+
+class TesseractEngine(OCREngine):
+    """
+    调用本地 tesseract 命令识别
+
+    图像以PNG经标准输入传给 tesseract，文本从标准输出读取，不写临时文件。
+    批量识别已按进程并行，tesseract 自身的 OpenMP 多线程限制为单线程，避免进程之间争抢CPU。
+    """
+
+    def __init__(self, cmd: str = "tesseract", lang: str = "eng", psm: int = 3, timeout: float = 120):
+        """
+        :param cmd: tesseract 可执行文件
+        :param lang: 识别语言（如 eng、chi_sim+eng）
+        :param psm: 页面分割模式
+        :param timeout: 单页识别超时（秒）
+        """
+        self.cmd = cmd
+        self.lang = lang
+        self.psm = psm
+        self.timeout = timeout
+        self._env = {**os.environ, "OMP_THREAD_LIMIT": "1"}
+
+    def cache_key(self) -> str:
+        return f"tesseract:{self.lang}:psm{self.psm}"
+
+    def recognize(self, img) -> str:
+        buffer = BytesIO()
+        img.save(buffer, "PNG")
+        try:
+            completed = subprocess.run(
+                [self.cmd, "stdin", "stdout", "-l", self.lang, "--psm", str(self.psm)],
+                input=buffer.getvalue(),
+                capture_output=True,
+                timeout=self.timeout,
+                env=self._env,
+            )
+        except FileNotFoundError:
+            raise OCRError(f"找不到 tesseract: {self.cmd}")
+        except subprocess.TimeoutExpired:
+            raise OCRError(f"tesseract 识别超时（{self.timeout}秒）")
+        if completed.returncode != 0:
+            raise OCRError(f"tesseract 识别失败: {completed.stderr.decode('utf-8', 'replace').strip()}")
+        return completed.stdout.decode("utf-8", "replace")
+
+
+def create_engine(name: str, **options) -> OCREngine:
+    """按名称创建识别引擎（tesseract / stub）"""
+    if name == "tesseract":
+        return TesseractEngine(**options)
+    if name == "stub":
+        return StubOCREngine()
+    raise ValueError(f"未知的识别引擎: {name}")
@@ -0,0 +1,65 @@
+# backend/app/markmanage/service/ocr/page_cache.py
+import logging
+import os
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class OCRPageCache:
+    """
+    按页面哈希缓存识别结果
+
+    持久化到 SQLite 文件（WAL 模式），多个识别进程各自打开连接、同时读写。
+    同一页扫描图像（如重复导入的答卷、重新识别）只识别一次。
+    """
+
+    def __init__(self, db_path: str):
+        """
+        :param db_path: SQLite 数据库文件路径
+        """
+        self.db_path = db_path
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_pages ("
+                "page_hash TEXT NOT NULL, engine TEXT NOT NULL, text TEXT NOT NULL, created_at REAL, "
+                "PRIMARY KEY (page_hash, engine))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, page_hash: str, engine: str):
+        """返回缓存的文本，没有时返回None"""
+        try:
+            row = self._connect().execute(
+                "SELECT text FROM ocr_pages WHERE page_hash = ? AND engine = ?", (page_hash, engine)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"读取识别缓存失败: {str(e)}")
+            return None
+        return row[0] if row else None
+
+    def put(self, page_hash: str, engine: str, text: str):
+        """记录一页的识别结果"""
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO ocr_pages (page_hash, engine, text, created_at) VALUES (?, ?, ?, ?)",
+                (page_hash, engine, text, time.time()),
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"写入识别缓存失败: {str(e)}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
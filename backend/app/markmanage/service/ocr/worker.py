@@ -0,0 +1,99 @@
+# backend/app/markmanage/service/ocr/worker.py
+"""
+识别子进程中执行的函数
+
+每个子进程在启动时创建一次识别引擎与页面缓存连接，之后按页码范围处理答卷PDF：
+扫描页中嵌入的图像（JPEG 或 CCITT G4）直接解码为页面图像，不经过PDF渲染；
+页面哈希按图像的原始（未解码）数据计算，缓存命中时不解码、不识别。
+带文本层的页面（非扫描生成的PDF）直接提取文本。
+"""
+import hashlib
+
+from backend.app.markmanage.service.ocr.engines import create_engine
+from backend.app.markmanage.service.ocr.page_cache import OCRPageCache
+
+_engine = None
+_cache = None
+
+
+def init_worker(engine_name: str, engine_options: dict, cache_path: str):
+    """进程池初始化函数"""
+    global _engine, _cache
+    _engine = create_engine(engine_name, **engine_options)
+    _cache = OCRPageCache(cache_path) if cache_path else None
+
+
+def _page_image_streams(page) -> list:
+    """页面直接引用的图像对象（按资源名排序）"""
+    resources = page.get("/Resources")
+    if resources is None:
+        return []
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return []
+    xobjects = xobjects.get_object()
+    streams = []
+    for name in sorted(xobjects):
+        obj = xobjects[name].get_object()
+        if obj.get("/Subtype") == "/Image":
+            streams.append(obj)
+    return streams
+
+
+def page_hash(streams: list) -> str:
+    """按图像的原始数据与解码参数计算页面哈希"""
+    digest = hashlib.sha256()
+    for obj in streams:
+        digest.update(repr((obj.get("/Filter"), obj.get("/DecodeParms"), obj.get("/Width"), obj.get("/Height"))).encode())
+        # 编码后的原始数据，不解码图像
+        digest.update(obj._data)
+    return digest.hexdigest()
+
+
+def _recognize_page(page) -> tuple[str, bool]:
+    """
+    识别一页
+
+    :return: (文本, 是否命中缓存)
+    """
+    text = page.extract_text() or ""
+    if text.strip():
+        return text, False
+    streams = _page_image_streams(page)
+    if not streams:
+        return "", False
+
+    key = page_hash(streams)
+    engine_key = _engine.cache_key()
+    if _cache is not None:
+        cached = _cache.get(key, engine_key)
+        if cached is not None:
+            return cached, True
+
+    parts = []
+    for image in page.images:
+        recognized = _engine.recognize(image.image).strip()
+        if recognized:
+            parts.append(recognized)
+    text = "\n".join(parts)
+    if _cache is not None:
+        _cache.put(key, engine_key, text)
+    return text, False
+
+
+def recognize_pages(pdf_path: str, start: int, stop: int) -> tuple[list[str], int]:
+    """
+    识别PDF中 [start, stop) 范围的页面（stop 超过页数时到最后一页）
+
+    :return: (每页文本, 命中缓存的页数)
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    texts = []
+    hits = 0
+    for index in range(start, min(stop, len(reader.pages))):
+        text, hit = _recognize_page(reader.pages[index])
+        texts.append(text)
+        hits += hit
+    return texts, hits
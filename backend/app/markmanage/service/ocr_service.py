@@ -0,0 +1,212 @@
+# backend/app/markmanage/service/ocr_service.py
+"""
+答卷文字识别
+
+为还没有识别文本（Paper.content 为空）的答卷识别扫描PDF：答卷按页码范围拆分为任务交给进程池，
+各进程解码页面图像并调用识别引擎（本地 Tesseract 或桩引擎），结果按页面哈希缓存；
+一份答卷的所有页面完成后按页序拼接，凑满一批后批量写回 Paper.content。
+没有识别出任何文本的答卷 content 保持为空并标记为 ocr_failed，之后不再重复识别，也不会进入批改队列。
+识别是CPU密集的，进程数默认等于CPU核数，吞吐量随核数线性增长。
+
+用法:
+    python -m backend.app.markmanage.service.ocr_service --exam-id 3
+    python -m backend.app.markmanage.service.ocr_service --workers 8 --engine stub --enqueue-grading
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.config.fileConfig import settings
+from backend.database.engine import async_db_session
+from backend.utils.pdf_xref import read_pdf_page_count
+from backend.app.markmanage.crud.crud_paper import PaperCRUD
+from backend.app.markmanage.service.ocr.worker import init_worker, recognize_pages
+
+# 页数未知时一个任务处理整份PDF
+ALL_PAGES = sys.maxsize
+
+
+class OCRService:
+    """答卷文字识别服务"""
+
+    def __init__(self):
+        self.paper_crud = PaperCRUD()
+
+    @staticmethod
+    def engine_options(engine: str) -> dict:
+        """按配置生成识别引擎参数"""
+        if engine == "tesseract":
+            return {
+                "cmd": settings.OCR_TESSERACT_CMD,
+                "lang": settings.OCR_LANG,
+                "psm": settings.OCR_PSM,
+                "timeout": settings.OCR_TIMEOUT,
+            }
+        return {}
+
+    async def _recognize_paper(self, executor, paper_id: int, paper_path: str, pages_per_task: int) -> dict:
+        """
+        识别一份答卷：按页码范围提交到进程池，全部完成后按页序拼接
+
+        :return: {"id", "content", "pages", "cache_hits"}，没有识别出文本时 content 为None
+        """
+        loop = asyncio.get_running_loop()
+        page_count = await asyncio.to_thread(read_pdf_page_count, paper_path)
+        if page_count is None:
+            ranges = [(0, ALL_PAGES)]
+        else:
+            ranges = [(start, start + pages_per_task) for start in range(0, page_count, pages_per_task)]
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(executor, recognize_pages, paper_path, start, stop) for start, stop in ranges
+        ))
+        texts = [text for chunk_texts, _ in chunks for text in chunk_texts]
+        content = "\n\n".join(text.strip() for text in texts)
+        return {
+            "id": paper_id,
+            "content": content if content.strip() else None,
+            "pages": len(texts),
+            "cache_hits": sum(hits for _, hits in chunks),
+        }
+
+    async def _save(self, rows: list[dict]):
+        recognized = [{"id": row["id"], "content": row["content"]} for row in rows if row["content"] is not None]
+        empty_ids = [row["id"] for row in rows if row["content"] is None]
+        async with async_db_session() as session:
+            async with session.begin():
+                if recognized:
+                    await self.paper_crud.bulk_update_paper_contents(session, recognized)
+                if empty_ids:
+                    await self.paper_crud.mark_papers_ocr_failed(session, empty_ids)
+
+    async def run(
+            self,
+            exam_id: int = None,
+            engine: str = None,
+            workers: int = None,
+            pages_per_task: int = None,
+            batch_size: int = None
+    ) -> dict:
+        """
+        识别全部（或某场考试）没有识别文本的答卷
+
+        :param exam_id: 只处理该考试的答卷
+        :param engine: 识别引擎（tesseract / stub），默认使用配置
+        :param workers: 识别进程数，默认使用配置（0 为CPU核数）
+        :param pages_per_task: 每个进程池任务处理的页数
+        :param batch_size: 每次批量写回的答卷数
+        :return: 识别统计
+        """
+        try:
+            import pypdf
+        except ImportError as e:
+            raise RuntimeError(f"pypdf模块不可用，无法识别扫描答卷: {str(e)}")
+
+        engine = engine or settings.OCR_ENGINE
+        workers = workers or settings.OCR_WORKERS or os.cpu_count() or 1
+        pages_per_task = pages_per_task or settings.OCR_PAGES_PER_TASK
+        batch_size = batch_size or settings.OCR_BATCH_SIZE
+        # 同时处理的答卷数：保证进程池始终有排队的任务，又不一次读入全部答卷
+        max_pending = workers * 4
+
+        stats = {"papers": 0, "pages": 0, "cache_hits": 0, "empty": 0, "failed": 0, "saved_batches": 0}
+        rows = []
+        pending = {}  # 识别任务 -> 答卷ID
+        after_id = 0
+        exhausted = False
+        start_time = time.perf_counter()
+
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=init_worker,
+                initargs=(engine, self.engine_options(engine), settings.OCR_PAGE_CACHE)
+        ) as executor:
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    async with async_db_session() as session:
+                        papers = await self.paper_crud.list_papers_without_content(
+                            session, after_id, batch_size, exam_id
+                        )
+                    if not papers:
+                        exhausted = True
+                        break
+                    after_id = papers[-1][0]
+                    for paper_id, paper_path in papers:
+                        task = asyncio.create_task(
+                            self._recognize_paper(executor, paper_id, paper_path, pages_per_task)
+                        )
+                        pending[task] = paper_id
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    paper_id = pending.pop(task)
+                    try:
+                        row = task.result()
+                    except Exception as e:
+                        stats["failed"] += 1
+                        print(f"⚠️ 答卷 {paper_id} 识别失败: {str(e)}")
+                        continue
+                    rows.append(row)
+                    if row["content"] is None:
+                        stats["empty"] += 1
+                        print(f"⚠️ 答卷 {paper_id} 没有识别出文本，已标记为识别失败")
+                    stats["papers"] += 1
+                    stats["pages"] += row["pages"]
+                    stats["cache_hits"] += row["cache_hits"]
+                if len(rows) >= batch_size:
+                    await self._save(rows)
+                    stats["saved_batches"] += 1
+                    print(f"已识别 {stats['papers']} 份答卷（{stats['pages']} 页），失败 {stats['failed']} 份")
+                    rows = []
+            if rows:
+                await self._save(rows)
+                stats["saved_batches"] += 1
+
+        elapsed = time.perf_counter() - start_time
+        stats.update(
+            workers=workers,
+            seconds=elapsed,
+            pages_per_second=stats["pages"] / elapsed if elapsed > 0 else 0.0,
+        )
+        return stats
+
+
+# Service 实例
+ocr_service = OCRService()
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="识别扫描答卷，写入答卷的识别文本")
+    parser.add_argument("--exam-id", type=int, default=None, help="只处理该考试的答卷")
+    parser.add_argument("--engine", choices=["tesseract", "stub"], default=None, help="识别引擎")
+    parser.add_argument("--workers", type=int, default=None, help="识别进程数，默认为CPU核数")
+    parser.add_argument("--pages-per-task", type=int, default=None, help="每个任务处理的页数")
+    parser.add_argument("--batch-size", type=int, default=None, help="每次批量写回的答卷数")
+    parser.add_argument("--enqueue-grading", action="store_true", help="识别完成后为答卷创建批改任务")
+    return parser.parse_args()
+
+
+async def run_ocr(args):
+    stats = await ocr_service.run(args.exam_id, args.engine, args.workers, args.pages_per_task, args.batch_size)
+    print(f"✅ 识别完成: {stats['papers']} 份答卷，{stats['pages']} 页（缓存命中 {stats['cache_hits']} 页），"
+          f"无文本 {stats['empty']} 份，失败 {stats['failed']} 份，{stats['workers']} 个进程，{stats['pages_per_second']:.1f} 页/秒")
+    if args.enqueue_grading:
+        from backend.app.markmanage.service.grading_service import grading_service
+        count = await grading_service.enqueue(args.exam_id)
+        print(f"已排队 {count} 个批改任务")
+
+
+def main():
+    """主程序逻辑"""
+    args = parse_arguments()
+    asyncio.run(run_ocr(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
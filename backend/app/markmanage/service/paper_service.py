@@ -0,0 +1,65 @@
+# backend/app/markmanage/service/paper_service.py
+
+from backend.common.exception import errors
+from backend.config.fileConfig import settings
+from backend.app.markmanage.crud.crud_exam import ExamCRUD
+from backend.app.markmanage.crud.crud_paper import PaperCRUD
+from backend.app.markmanage.service.file_store_service import file_store_service
+
+
+class PaperService:
+    """答卷业务逻辑服务层"""
+
+    def __init__(self):
+        self.crud = PaperCRUD()
+        self.exam_crud = ExamCRUD()
+
+    async def ingest_scanned_papers(
+            self,
+            exam_id: int,
+            student_papers: list[tuple[int, str]],
+            ext: str = None,
+            file_hashes: dict[str, str] = None
+    ) -> list[int]:
+        """
+        将按学生分割的扫描答卷登记为待批改答卷
+
+        所有答卷在同一个事务中写入，任意一条失败则整批回滚。
+        答卷PDF加入内容寻址存储（相同内容只保存一份），答卷记录引用存储中的路径。
+
+        :param exam_id: 考试ID
+        :param student_papers: [(学生ID, 答卷PDF路径)]
+        :param ext: 存储文件的扩展名，默认沿用答卷文件的扩展名
+        :param file_hashes: 已校验的文件哈希（答卷PDF路径 -> SHA-256），其中的文件不再重新计算哈希
+        :return: 新建答卷的ID列表
+        """
+        if not student_papers:
+            raise errors.RequestError(msg='没有可登记的答卷')
+
+        async with file_store_service.session() as session:
+            async with session.begin():
+                exam = await self.exam_crud.get_exam_by_id(session, exam_id)
+                if not exam:
+                    raise errors.NotFoundError(msg='考试记录不存在')
+
+                paper_data = []
+                for student_id, paper_path in student_papers:
+                    try:
+                        stored_path = await file_store_service.store_existing_file(
+                            session, paper_path, settings.ANSWER_UPLOAD_DIR, ext=ext,
+                            sha256=(file_hashes or {}).get(paper_path)
+                        )
+                    except OSError:
+                        raise errors.ServerError(msg=f'保存答卷文件失败: {paper_path}')
+                    paper_data.append({
+                        "exam_id": exam_id,
+                        "student_id": student_id,
+                        "paper_path": stored_path,
+                        "status": "pending",
+                    })
+                papers = await self.crud.bulk_create_papers(session, paper_data)
+            return [paper.id for paper in papers]
+
+
+# Service 实例
+paper_service = PaperService()
@@ -0,0 +1,132 @@
+# backend/app/markmanage/service/print_service.py
+import asyncio
+
+from backend.common.exception import errors
+from backend.config.fileConfig import settings
+from backend.app.markmanage.service.exam_service import exam_service
+from backend.app.markmanage.service.user_service import user_service
+from backend.app.markmanage.service.connect_printers.class_set import ClassSetBuilder
+from backend.app.markmanage.service.connect_printers.print_queue import (
+    CupsBackend,
+    FileSpoolBackend,
+    PDFtoPrinterBackend,
+    PrintQueue,
+)
+
+
+class PrintService:
+    """打印任务业务逻辑服务层"""
+
+    def __init__(self):
+        self.queue = None
+        self.class_set_builder = ClassSetBuilder(settings.PRINT_CACHE_DIR)
+
+    def _create_backend(self):
+        """按配置创建打印后端"""
+        if settings.PRINT_BACKEND == "pdftoprinter":
+            return PDFtoPrinterBackend(settings.PRINTER_EXE_PATH, timeout=settings.PRINT_TIMEOUT)
+        if settings.PRINT_BACKEND == "cups":
+            return CupsBackend(timeout=settings.PRINT_TIMEOUT)
+        if settings.PRINT_BACKEND == "spool":
+            return FileSpoolBackend(settings.PRINT_SPOOL_DIR)
+        raise ValueError(f"未知的打印后端: {settings.PRINT_BACKEND}")
+
+    def _get_queue(self):
+        """获取打印队列，首次调用时创建"""
+        if self.queue is None:
+            try:
+                backend = self._create_backend()
+            except (FileNotFoundError, ValueError) as e:
+                raise errors.ServerError(msg=f'打印后端不可用: {str(e)}')
+            self.queue = PrintQueue(backend, max_concurrent_per_printer=settings.PRINT_MAX_CONCURRENT)
+        return self.queue
+
+    async def submit_batch(self, pdf_paths: list[str], printer_name: str = None, copies: int = 1):
+        """
+        提交一批打印任务，立即返回
+
+        :param pdf_paths: PDF文件路径列表
+        :param printer_name: 打印机名称，为None时使用默认打印机
+        :param copies: 每个文件的打印份数（每份一个打印任务）
+        :return: (批次ID, [PrintJob])
+        """
+        printer_name = printer_name or settings.PRINTER_NAME
+        if not printer_name:
+            raise errors.RequestError(msg='未指定打印机')
+        if not pdf_paths:
+            raise errors.RequestError(msg='没有需要打印的文件')
+        if copies < 1:
+            raise errors.RequestError(msg='打印份数应不小于1')
+
+        try:
+            return self._get_queue().submit_batch(
+                [pdf_path for pdf_path in pdf_paths for _ in range(copies)], printer_name
+            )
+        except FileNotFoundError as e:
+            raise errors.NotFoundError(msg=str(e))
+
+    async def print_exam(self, exam_id: int, copies: int = 1, printer_name: str = None):
+        """
+        打印考试的题目文件
+
+        :return: (批次ID, [PrintJob])
+        """
+        questions_path, _ = await exam_service.get_exam_file_info(exam_id)
+        if not questions_path:
+            raise errors.NotFoundError(msg='考试没有题目文件')
+        return await self.submit_batch([questions_path], printer_name, copies)
+
+    async def print_class_set(
+            self,
+            exam_id: int,
+            class_name: str,
+            with_headers: bool = True,
+            printer_name: str = None
+    ):
+        """
+        为班级打印考试题目：每位学生一份，合并为一个PDF作为单个打印任务发送
+
+        :param with_headers: 是否在每份顶部打印学生ID与用户名
+        :return: (批次ID, [PrintJob], ClassSetResult)
+        """
+        questions_path, _ = await exam_service.get_exam_file_info(exam_id)
+        if not questions_path:
+            raise errors.NotFoundError(msg='考试没有题目文件')
+        students = await user_service.list_students_by_class(class_name)
+        if not students:
+            raise errors.NotFoundError(msg=f'班级 {class_name} 没有学生')
+
+        labels = [f"ID {student.id}  {student.username}" for student in students] if with_headers else None
+        try:
+            result = await asyncio.to_thread(
+                self.class_set_builder.build, questions_path, labels=labels, copies=len(students)
+            )
+        except FileNotFoundError as e:
+            raise errors.NotFoundError(msg=str(e))
+        except Exception as e:
+            raise errors.ServerError(msg=f'生成班级套印PDF失败: {str(e)}')
+
+        batch_id, jobs = await self.submit_batch([result.path], printer_name)
+        return batch_id, jobs, result
+
+    async def get_job(self, job_id: int):
+        """获取打印任务"""
+        job = self.queue.get_job(job_id) if self.queue else None
+        if not job:
+            raise errors.NotFoundError(msg='打印任务不存在')
+        return job
+
+    async def get_batch(self, batch_id: int):
+        """
+        获取打印批次进度
+
+        :return: (进度, [PrintJob])
+        """
+        progress = self.queue.batch_progress(batch_id) if self.queue else None
+        if progress is None:
+            raise errors.NotFoundError(msg='打印批次不存在')
+        return progress, self.queue.get_batch_jobs(batch_id)
+
+
+# Service 实例
+print_service = PrintService()
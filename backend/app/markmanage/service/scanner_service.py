@@ -0,0 +1,104 @@
+# backend/app/markmanage/service/scanner_service.py
+import asyncio
+
+from backend.common.exception import errors
+from backend.config.fileConfig import settings
+from backend.app.markmanage.service.paper_service import paper_service
+from backend.app.markmanage.service.connect_scanners.profiles import SCAN_PROFILES
+from backend.app.markmanage.service.connect_scanners.scan_daemon import ScannerDaemon
+
+
+class ScannerService:
+    """扫描任务业务逻辑服务层"""
+
+    def __init__(self):
+        self.daemon = None
+
+    def _create_scanner(self):
+        """创建并连接扫描仪（在守护进程工作线程中调用）"""
+        from backend.app.markmanage.service.PDFScanner import PDFScanner
+
+        return PDFScanner(
+            scanner_name=settings.SCANNER_NAME,
+            scan_dir=settings.SCAN_DIR,
+            resolution=settings.SCAN_RESOLUTION,
+            source=settings.SCAN_SOURCE,
+            timeout=settings.SCAN_TIMEOUT,
+            profile=settings.SCAN_PROFILE,
+        )
+
+    def _get_daemon(self):
+        """获取扫描守护进程，首次调用时创建"""
+        if self.daemon is None:
+            self.daemon = ScannerDaemon(
+                scanner_factory=self._create_scanner,
+                paper_ingest=paper_service.ingest_scanned_papers,
+                loop=asyncio.get_running_loop(),
+            )
+        return self.daemon
+
+    async def submit_job(
+            self,
+            file_name: str = None,
+            profile: str = None,
+            split_by: str = None,
+            pages_per_student: int = 2,
+            student_ids: list[int] = None,
+            exam_id: int = None
+    ):
+        """
+        提交扫描任务
+
+        :return: ScanJob
+        """
+        if profile and profile not in SCAN_PROFILES:
+            raise errors.RequestError(msg=f'未知的扫描输出配置: {profile}')
+        if split_by not in (None, "qr", "count"):
+            raise errors.RequestError(msg=f'未知的答卷分割方式: {split_by}')
+        if split_by == "count" and not student_ids:
+            raise errors.RequestError(msg='按固定页数分割时需指定学生名单')
+        if split_by == "count" and pages_per_student < 1:
+            raise errors.RequestError(msg='每位学生的扫描页数应不小于1')
+        if exam_id is not None and not split_by:
+            raise errors.RequestError(msg='登记答卷时需指定答卷分割方式')
+
+        return self._get_daemon().submit(
+            file_name=file_name,
+            profile=profile,
+            split_by=split_by,
+            pages_per_student=pages_per_student,
+            student_ids=student_ids,
+            exam_id=exam_id,
+        )
+
+    async def get_job(self, job_id: int):
+        """获取扫描任务"""
+        job = self.daemon.get_job(job_id) if self.daemon else None
+        if not job:
+            raise errors.NotFoundError(msg='扫描任务不存在')
+        return job
+
+    async def list_jobs(self):
+        """列出扫描任务"""
+        return self.daemon.list_jobs() if self.daemon else []
+
+    async def get_status(self):
+        """获取扫描守护进程状态"""
+        if self.daemon is None:
+            return {"running": False, "connected": False, "queued_jobs": 0, "current_job_id": None}
+        return self.daemon.status()
+
+    async def shutdown(self):
+        """
+        停止扫描守护进程并断开设备
+
+        在线程中等待工作线程退出：工作线程可能正通过 run_coroutine_threadsafe 等待事件循环登记答卷，
+        在事件循环中直接 join 会互相等待直到超时。
+        """
+        if self.daemon is not None:
+            daemon, self.daemon = self.daemon, None
+            await asyncio.to_thread(daemon.stop, 5)
+
+
+# Service 实例
+scanner_service = ScannerService()
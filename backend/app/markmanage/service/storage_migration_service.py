@@ -0,0 +1,178 @@
+# backend/app/markmanage/service/storage_migration_service.py
+"""
+旧文件迁移到分片存储
+
+去重存储之前保存的题目与答卷文件平铺在 QUESTION_UPLOAD_DIR / ANSWER_UPLOAD_DIR 下。
+迁移工具按ID分批处理：每批在一个事务中对记录加行锁，把文件以硬链接加入内容寻址存储（两级分片目录），
+批量更新 Exam.questions_path / Paper.paper_path 后提交；旧文件在提交并经过宽限期后才删除，
+期间仍按旧路径读取文件的请求不受影响。服务无需停机，可随时中断后重新运行。
+
+用法:
+    python -m backend.app.markmanage.service.storage_migration_service --dry-run
+    python -m backend.app.markmanage.service.storage_migration_service --batch-size 200 --pause 0.5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import deque
+
+from backend.config.fileConfig import settings
+from backend.database.engine import async_db_session
+from backend.app.markmanage.crud.crud_exam import ExamCRUD
+from backend.app.markmanage.crud.crud_paper import PaperCRUD
+from backend.app.markmanage.service.file_store_service import file_store_service
+
+# 旧文件删除失败（如正被读取）时的重试次数与间隔（秒）
+REMOVE_ATTEMPTS = 5
+REMOVE_RETRY_DELAY = 5.0
+
+
+class StorageMigrationService:
+    """旧的平铺文件迁移服务"""
+
+    def __init__(self):
+        self.exam_crud = ExamCRUD()
+        self.paper_crud = PaperCRUD()
+        self._pending_removals = deque()  # (可删除时间, 旧文件路径, 已尝试次数)
+
+    def _targets(self):
+        """迁移对象：(名称, 列出待迁移记录, 批量更新, 路径字段, 存储目录)"""
+        return [
+            ("exam", self.exam_crud.list_unstored_question_files, self.exam_crud.bulk_update_questions_paths,
+             "questions_path", settings.QUESTION_UPLOAD_DIR),
+            ("paper", self.paper_crud.list_unstored_paper_files, self.paper_crud.bulk_update_paper_paths,
+             "paper_path", settings.ANSWER_UPLOAD_DIR),
+        ]
+
+    async def migrate_batch(self, list_rows, bulk_update, path_field: str, store_dir: str,
+                            after_id: int, batch_size: int) -> dict:
+        """
+        迁移一批记录
+
+        :return: {"last_id": 本批最后一条记录的ID（没有记录时为None）, "migrated": 迁移数,
+                  "missing": 文件不存在而跳过的记录数, "old_paths": 已迁移的旧文件路径}
+        """
+        migrated_rows = []
+        old_paths = []
+        missing = 0
+        async with file_store_service.session() as session:
+            async with session.begin():
+                rows = await list_rows(session, after_id, batch_size)
+                for record_id, old_path in rows:
+                    if not await asyncio.to_thread(os.path.isfile, old_path):
+                        missing += 1
+                        continue
+                    new_path = await file_store_service.store_existing_file(session, old_path, store_dir)
+                    migrated_rows.append({"id": record_id, path_field: new_path})
+                    old_paths.append(old_path)
+                if migrated_rows:
+                    await bulk_update(session, migrated_rows)
+        return {
+            "last_id": rows[-1][0] if rows else None,
+            "migrated": len(migrated_rows),
+            "missing": missing,
+            "old_paths": old_paths,
+        }
+
+    async def _is_referenced(self, path: str) -> bool:
+        """旧路径是否仍被记录引用（同一文件被多条记录引用、其余记录尚未迁移时不能删除）"""
+        async with async_db_session() as session:
+            return (await self.exam_crud.questions_path_exists(session, path)
+                    or await self.paper_crud.paper_path_exists(session, path))
+
+    async def _remove_due_files(self, now: float) -> int:
+        """删除宽限期已过的旧文件，返回删除数"""
+        removed = 0
+        retries = []
+        while self._pending_removals and self._pending_removals[0][0] <= now:
+            _, path, attempts = self._pending_removals.popleft()
+            if await self._is_referenced(path):
+                continue
+            try:
+                await asyncio.to_thread(os.remove, path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # Windows 下文件正被读取时无法删除，稍后重试
+                if attempts + 1 < REMOVE_ATTEMPTS:
+                    retries.append((now + REMOVE_RETRY_DELAY, path, attempts + 1))
+                else:
+                    print(f"⚠️ 删除旧文件失败，请手动删除: {path}: {str(e)}")
+        self._pending_removals.extend(retries)
+        return removed
+
+    async def count_pending(self) -> dict:
+        """统计仍在平铺目录中的文件数（只读，不加锁）"""
+        counts = {}
+        async with async_db_session() as session:
+            for name, list_rows, _, _, _ in self._targets():
+                total, after_id = 0, 0
+                while rows := await list_rows(session, after_id, 1000, lock=False):
+                    total += len(rows)
+                    after_id = rows[-1][0]
+                counts[name] = total
+        return counts
+
+    async def run(self, batch_size: int = 100, pause: float = 0.5, grace: float = 30.0) -> dict:
+        """
+        分批迁移全部旧文件
+
+        :param batch_size: 每个事务迁移的记录数，越小对在线请求的锁等待越短
+        :param pause: 批次之间的间隔（秒），给在线请求让出数据库与磁盘
+        :param grace: 旧文件在路径更新后保留的时间（秒）
+        :return: 迁移统计
+        """
+        stats = {}
+        for name, list_rows, bulk_update, path_field, store_dir in self._targets():
+            migrated = missing = removed = 0
+            after_id = 0
+            while True:
+                batch = await self.migrate_batch(list_rows, bulk_update, path_field, store_dir, after_id, batch_size)
+                if batch["last_id"] is None:
+                    break
+                after_id = batch["last_id"]
+                migrated += batch["migrated"]
+                missing += batch["missing"]
+                now = time.monotonic()
+                self._pending_removals.extend((now + grace, path, 0) for path in batch["old_paths"])
+                removed += await self._remove_due_files(now)
+                print(f"[{name}] 已迁移 {migrated} 条，文件缺失 {missing} 条，已删除旧文件 {removed} 个 (ID ≤ {after_id})")
+                await asyncio.sleep(pause)
+            stats[name] = {"migrated": migrated, "missing": missing, "removed": removed}
+
+        # 等待剩余旧文件的宽限期结束后删除
+        while self._pending_removals:
+            await asyncio.sleep(max(0.0, self._pending_removals[0][0] - time.monotonic()))
+            removed = await self._remove_due_files(time.monotonic())
+            stats["removed_after_grace"] = stats.get("removed_after_grace", 0) + removed
+        return stats
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="将平铺目录中的旧文件迁移到分片存储")
+    parser.add_argument("--batch-size", type=int, default=100, help="每批迁移的记录数")
+    parser.add_argument("--pause", type=float, default=0.5, help="批次之间的间隔（秒）")
+    parser.add_argument("--grace", type=float, default=30.0, help="旧文件在路径更新后保留的时间（秒）")
+    parser.add_argument("--dry-run", action="store_true", help="只统计待迁移的记录数")
+    return parser.parse_args()
+
+
+def main():
+    """主程序逻辑"""
+    args = parse_arguments()
+    service = StorageMigrationService()
+    if args.dry_run:
+        counts = asyncio.run(service.count_pending())
+        print(f"待迁移: 考试题目 {counts['exam']} 条，学生答卷 {counts['paper']} 条")
+        return 0
+    stats = asyncio.run(service.run(args.batch_size, args.pause, args.grace))
+    print(f"✅ 迁移完成: {stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+# backend/app/markmanage/service/upload_service.py
+import asyncio
+import os
+import weakref
+from datetime import datetime
+
+from backend.common.exception import errors
+from backend.config.fileConfig import settings
+from backend.utils.chunked_upload import ChunkError, ChunkedUploadStore
+from backend.utils.file_utils import check_pdf_page_count, run_disk_io
+from backend.utils.upload_validation import UploadStreamValidator
+from backend.app.markmanage.service.exam_service import exam_service
+from backend.app.markmanage.service.paper_service import paper_service
+
+# 上传用途：exam 为考试题目文件，paper 为学生的扫描答卷
+UPLOAD_PURPOSES = ("exam", "paper")
+
+
+class UploadService:
+    """
+    可续传分块上传业务逻辑服务层
+
+    客户端先创建上传会话，再按偏移量依次上传分块，中断后查询已确认的偏移量继续上传，
+    全部上传后完成会话：校验整个文件，然后交给考试服务（创建考试）或答卷服务（登记答卷）。
+    同一会话的分块写入与完成操作串行执行。
+    """
+
+    def __init__(self):
+        self.store = ChunkedUploadStore(settings.UPLOAD_SESSION_DIR, settings.UPLOAD_SESSION_TTL)
+        # 会话ID -> 锁；没有请求持有或等待时锁被回收，放弃或过期的会话不会一直占用
+        self._locks = weakref.WeakValueDictionary()
+
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        lock = self._locks.get(upload_id)
+        if lock is None:
+            lock = self._locks[upload_id] = asyncio.Lock()
+        return lock
+
+    async def _call_store(self, func, *args, **kwargs):
+        """在线程池中调用会话存储，并转换为业务异常"""
+        try:
+            return await run_disk_io(lambda: func(*args, **kwargs))
+        except KeyError:
+            raise errors.NotFoundError(msg='上传会话不存在或已过期')
+        except ChunkError as e:
+            raise errors.RequestError(msg=str(e))
+        except OSError:
+            raise errors.ServerError(msg='写入上传数据失败')
+
+    async def initiate(
+            self,
+            purpose: str,
+            filename: str,
+            total_size: int,
+            sha256: str = None,
+            title: str = None,
+            subject: str = None,
+            description: str = None,
+            time: datetime = None,
+            creator_id: int = None,
+            exam_id: int = None,
+            student_id: int = None
+    ) -> dict:
+        """
+        创建上传会话，文件类型、大小与业务参数在上传开始前校验
+
+        :return: 会话信息
+        """
+        if purpose not in UPLOAD_PURPOSES:
+            raise errors.RequestError(msg=f'未知的上传用途: {purpose}')
+
+        max_size = settings.MAX_EXAM_FILE_SIZE if purpose == "exam" else settings.UPLOAD_MAX_SESSION_SIZE
+        # 校验文件名；声明的大小超出上限时不必开始上传
+        UploadStreamValidator(filename, settings.ALLOWED_EXAM_FILE_TYPES, max_size)
+        if total_size <= 0:
+            raise errors.RequestError(msg='文件大小无效')
+        if total_size > max_size:
+            raise errors.FileTooLarge(msg=f'文件大小不能超过 {max_size / (1024 * 1024):.2f}MB')
+
+        if purpose == "exam":
+            if not title or not subject or time is None or creator_id is None:
+                raise errors.RequestError(msg='创建考试需要提供标题、科目、时间和创建者')
+            attributes = {
+                "title": title,
+                "subject": subject,
+                "description": description or "",
+                "time": time.isoformat(),
+                "creator_id": creator_id,
+            }
+        else:
+            if exam_id is None or student_id is None:
+                raise errors.RequestError(msg='上传答卷需要提供考试ID和学生ID')
+            attributes = {"exam_id": exam_id, "student_id": student_id}
+
+        # 顺便清理过期的会话
+        await self._call_store(self.store.cleanup_expired)
+        return await self._call_store(
+            self.store.create, filename, total_size, sha256, purpose=purpose, **attributes
+        )
+
+    async def put_chunk(self, upload_id: str, offset: int, data: bytes, checksum: str) -> dict:
+        """
+        写入一个分块
+
+        :return: 更新后的会话信息
+        """
+        if not checksum:
+            raise errors.RequestError(msg='缺少分块校验和')
+        async with self._lock(upload_id):
+            if offset == 0:
+                # 第一个分块到达时校验文件头，不是PDF的上传不必继续
+                meta = await self._call_store(self.store.get, upload_id)
+                validator = UploadStreamValidator(
+                    meta["filename"], settings.ALLOWED_EXAM_FILE_TYPES, meta["total_size"]
+                )
+                validator.feed(data)
+                if len(data) == meta["total_size"]:
+                    validator.finish()
+            return await self._call_store(self.store.write_chunk, upload_id, offset, data, checksum)
+
+    async def get_session(self, upload_id: str) -> dict:
+        """查询会话信息（包括已确认的偏移量）"""
+        return await self._call_store(self.store.get, upload_id)
+
+    async def finalize(self, upload_id: str) -> dict:
+        """
+        完成上传：校验整个文件并交给业务处理，成功后删除会话
+
+        校验时计算的哈希随文件交给存储，不再重复读取整个文件。业务处理失败时保留会话，客户端可以重试完成操作。
+
+        :return: 处理结果，包含 exam_id 或 paper_ids 以及PDF页数
+        """
+        async with self._lock(upload_id):
+            meta = await self._call_store(self.store.verify, upload_id)
+            data_path = self.store.data_path(upload_id)
+            attributes = meta["attributes"]
+            ext = os.path.splitext(meta["filename"])[1]
+            page_count = await check_pdf_page_count(data_path, meta["filename"])
+
+            result = {
+                "upload_id": upload_id,
+                "sha256": meta["sha256"],
+                "page_count": page_count,
+                "exam_id": None,
+                "paper_ids": [],
+            }
+            if attributes["purpose"] == "exam":
+                result["exam_id"] = await exam_service.create_exam_from_file(
+                    title=attributes["title"],
+                    subject=attributes["subject"],
+                    description=attributes["description"],
+                    time=datetime.fromisoformat(attributes["time"]),
+                    creator_id=attributes["creator_id"],
+                    file_path=data_path,
+                    filename=meta["filename"],
+                    sha256=meta["sha256"]
+                )
+            else:
+                result["exam_id"] = attributes["exam_id"]
+                result["paper_ids"] = await paper_service.ingest_scanned_papers(
+                    attributes["exam_id"],
+                    [(attributes["student_id"], data_path)],
+                    ext=ext,
+                    file_hashes={data_path: meta["sha256"]}
+                )
+
+            # 文件已以硬链接（或副本）加入存储，可以删除会话目录
+            await run_disk_io(self.store.discard, upload_id)
+        return result
+
+    async def abort(self, upload_id: str):
+        """取消上传并删除会话"""
+        async with self._lock(upload_id):
+            await self._call_store(self.store.get, upload_id)
+            await run_disk_io(self.store.discard, upload_id)
+
+
+# Service 实例
+upload_service = UploadService()
@@ -65,5 +65,19 @@ class UserService:
             users = await UserCRUD.list_users(self.crud, db, role, limit, offset)
             return users
 
+    async def list_student_ids_by_class(self, class_name: str) -> list[int]:
+        async with async_db_session() as db:
+            student_ids = await self.crud.list_student_ids_by_class(db, class_name)
+            if not student_ids:
+                raise errors.NotFoundError(msg='班级中没有学生')
+            return student_ids
+
+    async def list_students_by_class(self, class_name: str) -> list[User]:
+        async with async_db_session() as db:
+            students = await self.crud.list_students_by_class(db, class_name)
+            if not students:
+                raise errors.NotFoundError(msg='班级中没有学生')
+            return students
+
 
 user_service = UserService()
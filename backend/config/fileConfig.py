@@ -23,6 +23,70 @@ class Settings:
     # 分块大小（默认为1MB）
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 1048576))
 
+    # 同时写磁盘的上传数（写入线程数）
+    UPLOAD_MAX_WRITERS = int(os.getenv("UPLOAD_MAX_WRITERS", 4))
+    # 上传文件落盘策略：none 不同步，file 同步文件内容，full 同时同步目录
+    UPLOAD_FSYNC = os.getenv("UPLOAD_FSYNC", "file")
+
+    # 分块上传配置
+    UPLOAD_SESSION_DIR = os.getenv("UPLOAD_SESSION_DIR", "./upload_sessions")
+    UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", 86400))  # 未完成会话的保留时间（秒）
+    UPLOAD_MAX_CHUNK_SIZE = int(os.getenv("UPLOAD_MAX_CHUNK_SIZE", 8388608))  # 单个分块最大8MB
+    UPLOAD_MAX_SESSION_SIZE = int(os.getenv("UPLOAD_MAX_SESSION_SIZE", 2147483648))  # 扫描答卷最大2GB
+
+    # 文件元数据（哈希）缓存的 SQLite 文件
+    FILE_METADATA_CACHE = os.getenv("FILE_METADATA_CACHE", "./file_metadata_cache.sqlite3")
+
+    # 扫描守护进程配置
+    SCANNER_NAME = os.getenv("SCANNER_NAME") or None
+    SCAN_DIR = os.getenv("SCAN_DIR", ANSWER_UPLOAD_DIR)
+    SCAN_RESOLUTION = int(os.getenv("SCAN_RESOLUTION", 300))
+    SCAN_SOURCE = os.getenv("SCAN_SOURCE", "ADF")
+    SCAN_TIMEOUT = int(os.getenv("SCAN_TIMEOUT", 60))
+    SCAN_PROFILE = os.getenv("SCAN_PROFILE", "archive-color")
+
+    # 打印队列配置
+    PRINT_BACKEND = os.getenv("PRINT_BACKEND", "pdftoprinter")  # pdftoprinter / cups / spool
+    PRINTER_NAME = os.getenv("PRINTER_NAME") or None
+    PRINTER_EXE_PATH = os.getenv("PRINTER_EXE_PATH", "./tools/PDFtoPrinter.exe")
+    PRINT_SPOOL_DIR = os.getenv("PRINT_SPOOL_DIR", "./print_spool")
+    PRINT_MAX_CONCURRENT = int(os.getenv("PRINT_MAX_CONCURRENT", 1))
+    PRINT_TIMEOUT = int(os.getenv("PRINT_TIMEOUT", 120))
+    PRINT_CACHE_DIR = os.getenv("PRINT_CACHE_DIR", "./print_cache")
+
+    # 批改引擎配置
+    GRADING_MODEL_BACKEND = os.getenv("GRADING_MODEL_BACKEND", "stub")  # stub / http
+    GRADING_MODEL_URL = os.getenv("GRADING_MODEL_URL", "http://127.0.0.1:8765")
+    GRADING_MODEL_API_KEY = os.getenv("GRADING_MODEL_API_KEY") or None
+    GRADING_MODEL_TIMEOUT = float(os.getenv("GRADING_MODEL_TIMEOUT", 60))
+    GRADING_STUB_LATENCY = float(os.getenv("GRADING_STUB_LATENCY", 0.5))  # 进程内桩模型的延迟（秒）
+    GRADING_BATCH_SIZE = int(os.getenv("GRADING_BATCH_SIZE", 50))
+    GRADING_MAX_IN_FLIGHT = int(os.getenv("GRADING_MAX_IN_FLIGHT", 8))
+    GRADING_MAX_ATTEMPTS = int(os.getenv("GRADING_MAX_ATTEMPTS", 3))
+    # 批改任务队列：租约时长与续租间隔（秒），任务最多领取次数，失败后重新可见的延迟（秒）
+    GRADING_LEASE_SECONDS = int(os.getenv("GRADING_LEASE_SECONDS", 120))
+    GRADING_HEARTBEAT_INTERVAL = int(os.getenv("GRADING_HEARTBEAT_INTERVAL", 30))
+    GRADING_JOB_MAX_ATTEMPTS = int(os.getenv("GRADING_JOB_MAX_ATTEMPTS", 5))
+    GRADING_JOB_RETRY_DELAY = int(os.getenv("GRADING_JOB_RETRY_DELAY", 60))
+    # 批改结果缓存：修改评分标准或提示词后需要更新版本号，旧版本的缓存不再命中
+    GRADING_CACHE_ENABLED = os.getenv("GRADING_CACHE_ENABLED", "true").lower() == "true"
+    GRADING_RUBRIC_VERSION = os.getenv("GRADING_RUBRIC_VERSION", "1")
+    GRADING_CACHE_MEMORY_ENTRIES = int(os.getenv("GRADING_CACHE_MEMORY_ENTRIES", 10000))
+    GRADING_CACHE_MAX_ENTRIES = int(os.getenv("GRADING_CACHE_MAX_ENTRIES", 200000))
+    GRADING_CACHE_MAX_AGE_DAYS = int(os.getenv("GRADING_CACHE_MAX_AGE_DAYS", 90))
+    GRADING_CACHE_EVICT_INTERVAL = int(os.getenv("GRADING_CACHE_EVICT_INTERVAL", 600))  # 淘汰检查间隔（秒）
+
+    # 答卷文字识别配置
+    OCR_ENGINE = os.getenv("OCR_ENGINE", "tesseract")  # tesseract / stub
+    OCR_TESSERACT_CMD = os.getenv("OCR_TESSERACT_CMD", "tesseract")
+    OCR_LANG = os.getenv("OCR_LANG", "eng")
+    OCR_PSM = int(os.getenv("OCR_PSM", 3))
+    OCR_TIMEOUT = int(os.getenv("OCR_TIMEOUT", 120))  # 单页识别超时（秒）
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", 0))  # 识别进程数，0 为CPU核数
+    OCR_PAGES_PER_TASK = int(os.getenv("OCR_PAGES_PER_TASK", 2))
+    OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", 50))  # 每次批量写回的答卷数
+    OCR_PAGE_CACHE = os.getenv("OCR_PAGE_CACHE", "./ocr_page_cache.sqlite3")
+
     # 其他配置
     PROJECT_NAME = "Exam Management System"
     API_V1_STR = "/api/v1"
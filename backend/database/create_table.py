@@ -6,9 +6,12 @@ from backend.database.base import Base
 from backend.app.markmanage.models.user import User
 from backend.app.markmanage.models.exam import Exam
 from backend.app.markmanage.models.paper import Paper
+from backend.app.markmanage.models.stored_file import StoredFile
+from backend.app.markmanage.models.grading_job import GradingJob
+from backend.app.markmanage.models.grading_cache import GradingCacheEntry
 
 # 导入所有模型以注册到Base.metadata
-from sqlalchemy import inspect
+from sqlalchemy import String, inspect, text
 
 # 配置日志
 logging.basicConfig(
@@ -60,6 +63,57 @@ def inspect_table_structure(connection):
 
         logger.info("\n")
 
+def find_narrow_columns(connection):
+    """
+    找出已有表中比模型定义短的字符串列
+
+    create_all 只创建缺失的表，不会修改已有的列；模型加长字符串列后（如 papers.paper_path 由100加长到255），
+    已部署的数据库需要单独执行 ALTER TABLE。
+
+    :return: [(表, 模型中的列, 数据库中的长度)]
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    narrow = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        current = {col["name"]: col["type"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if not isinstance(column.type, String) or column.type.length is None:
+                continue
+            length = getattr(current.get(column.name), "length", None)
+            if length is not None and length < column.type.length:
+                narrow.append((table, column, length))
+    return narrow
+
+
+def build_widen_statement(dialect, table, column):
+    """生成加长字符串列的 ALTER TABLE 语句，不支持修改列类型的方言返回None"""
+    preparer = dialect.identifier_preparer
+    table_name = preparer.format_table(table)
+    column_name = preparer.quote(column.name)
+    column_type = column.type.compile(dialect=dialect)
+    if dialect.name == "mysql":
+        null = "NULL" if column.nullable else "NOT NULL"
+        return f"ALTER TABLE {table_name} MODIFY COLUMN {column_name} {column_type} {null}"
+    if dialect.name == "postgresql":
+        return f"ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE {column_type}"
+    return None
+
+
+def widen_columns(connection):
+    """把已有表中变短的字符串列加长到模型定义的长度"""
+    for table, column, length in find_narrow_columns(connection):
+        statement = build_widen_statement(connection.dialect, table, column)
+        if statement is None:
+            # SQLite 不限制 VARCHAR 长度，也不支持修改列类型
+            logger.info("跳过 %s.%s 的加长（%s 不支持）", table.name, column.name, connection.dialect.name)
+            continue
+        logger.info("加长列 %s.%s: %s -> %s", table.name, column.name, length, column.type.length)
+        connection.execute(text(statement))
+
+
 async def create_tables():
     """创建所有注册的表"""
     try:
@@ -85,6 +139,9 @@ async def create_tables():
             await conn.run_sync(sync_create_all)
             logger.info('✅ 表创建完成')
 
+            # 已有的表不会被 create_all 修改，需加长的字符串列单独 ALTER
+            await conn.run_sync(widen_columns)
+
             # 4. 验证表是否存在
             def sync_get_table_names(connection):
                 return inspect(connection).get_table_names()
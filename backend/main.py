@@ -1,16 +1,41 @@
 from fastapi import FastAPI
 
 from backend.app.markmanage.api.router import v1 as parent_router
+from backend.app.markmanage.service.scanner_service import scanner_service
+from backend.app.markmanage.service.grading_service import grading_service
+from backend.config.fileConfig import settings
+from backend.middleware.upload_middleware import UploadValidationMiddleware
 import uvicorn
 from fastapi.staticfiles import StaticFiles
 
 # 创建主应用
 app = FastAPI(title="ai批改服务平台")
 
+# 考试题目上传：边接收边校验文件类型、PDF文件头与大小，不合格的上传不等接收完就拒绝
+app.add_middleware(
+    UploadValidationMiddleware,
+    path_pattern=r"/exam/(create_exam|update_exam/\d+/files)$",
+    allowed_types=settings.ALLOWED_EXAM_FILE_TYPES,
+    max_file_size=settings.MAX_EXAM_FILE_SIZE,
+)
+
 app.mount("/static", StaticFiles(directory="E:/Ai-MarkingMachine/backend/app/markmanage/static"), name="static")
 
 app.include_router(parent_router, prefix="/homework_correction")  # ✅ 正确挂载方式
 
+
+@app.on_event("shutdown")
+async def shutdown_scanner():
+    # 停止扫描守护进程并断开扫描仪
+    await scanner_service.shutdown()
+
+
+@app.on_event("shutdown")
+async def shutdown_grading():
+    # 停止批改，已领取的答卷写回后再退出
+    await grading_service.shutdown()
+
+
 # 创建一个老师后，就可以运行服务
 if __name__ == "__main__":
     uvicorn.run(app, host="localhost", port=8003)
@@ -0,0 +1,152 @@
+# backend/middleware/upload_middleware.py
+import re
+from typing import List
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.common.exception import errors
+from backend.utils.upload_validation import UploadStreamValidator
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # 旧版本的包名
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# multipart 请求中除文件外的表单字段与分隔符的预留大小
+FORM_OVERHEAD = 64 * 1024
+
+
+class _MultipartUploadGuard:
+    """边接收边解析 multipart 请求体，把每个文件字段的数据交给流式校验"""
+
+    def __init__(self, boundary: bytes, allowed_types: List[str], max_file_size: int):
+        self.allowed_types = allowed_types
+        self.max_file_size = max_file_size
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._validator = None
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def feed(self, body: bytes):
+        self._parser.write(body)
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._validator = None
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"filename" in options:
+            filename = options[b"filename"].decode("utf-8", errors="replace")
+            self._validator = UploadStreamValidator(filename, self.allowed_types, self.max_file_size)
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._validator is not None:
+            self._validator.feed(data[start:end])
+
+    def _on_part_end(self):
+        if self._validator is not None:
+            self._validator.finish()
+            self._validator = None
+
+
+class UploadValidationMiddleware:
+    """
+    上传请求的提前拒绝
+
+    对匹配路径的 multipart 上传，在请求体到达路由（Starlette 把整个文件缓存到临时文件）之前
+    边接收边校验文件名、PDF文件头与大小；Content-Length 已超出上限时不读取请求体直接拒绝。
+    校验失败时立即返回错误响应，不再接收剩余数据。
+    """
+
+    def __init__(self, app: ASGIApp, path_pattern: str, allowed_types: List[str], max_file_size: int):
+        """
+        :param path_pattern: 需要校验的请求路径（正则表达式，search 匹配）
+        :param allowed_types: 允许的扩展名
+        :param max_file_size: 单个文件的最大字节数
+        """
+        self.app = app
+        self.path_pattern = re.compile(path_pattern)
+        self.allowed_types = allowed_types
+        self.max_file_size = max_file_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (scope["type"] != "http" or scope["method"] not in ("POST", "PUT")
+                or not self.path_pattern.search(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_type, options = parse_options_header(headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in options:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_file_size + FORM_OVERHEAD:
+            max_mb = self.max_file_size / (1024 * 1024)
+            await self._reject(errors.FileTooLarge(msg=f"文件大小不能超过 {max_mb:.2f}MB"), scope, receive, send)
+            return
+
+        guard = _MultipartUploadGuard(options[b"boundary"], self.allowed_types, self.max_file_size)
+        rejection = None
+        response_started = False
+
+        async def guarded_receive():
+            nonlocal rejection
+            message = await receive()
+            if message["type"] == "http.request" and rejection is None:
+                try:
+                    guard.feed(message.get("body", b""))
+                except (errors.FileTooLarge, errors.InvalidFileName) as e:
+                    rejection = e
+                    # 中断路由对请求体的读取
+                    raise
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            # 校验失败后丢弃路由产生的响应，改为返回校验错误
+            if rejection is not None:
+                return
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, guarded_receive, guarded_send)
+        except Exception:
+            if rejection is None:
+                raise
+        if rejection is not None and not response_started:
+            await self._reject(rejection, scope, receive, send)
+
+    @staticmethod
+    async def _reject(error, scope: Scope, receive: Receive, send: Send):
+        response = JSONResponse(
+            status_code=error.code,
+            content={"code": error.code, "msg": error.msg, "data": None},
+            headers={"Connection": "close"},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,90 @@
+# backend/test/conftest.py
+"""
+测试公共夹具
+
+数据库使用临时目录中的 SQLite（aiosqlite），不需要 MySQL；SQLite 忽略 FOR UPDATE，
+行锁相关的并发行为只能在 MySQL 上验证，这里验证的是单进程内的语义。
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.app.markmanage.models import Exam, Paper, User
+from backend.config.fileConfig import settings
+from backend.database.base import Base
+from backend.utils import file_service
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """文件元数据缓存与识别页面缓存写入临时目录，不在工作目录留下文件"""
+    monkeypatch.setattr(settings, "FILE_METADATA_CACHE", str(tmp_path / "file_metadata_cache.sqlite3"))
+    monkeypatch.setattr(settings, "OCR_PAGE_CACHE", str(tmp_path / "ocr_page_cache.sqlite3"))
+    monkeypatch.setattr(file_service, "_metadata_cache", None)
+    yield
+    if file_service._metadata_cache is not None:
+        file_service._metadata_cache.close()
+
+
+@pytest.fixture
+async def db_session(tmp_path):
+    """建好全部表的会话工厂，用于替换各模块的 async_db_session"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    # 由 SQLAlchemy 显式发出 BEGIN，否则驱动在没有事务时执行 SAVEPOINT 会自动提交嵌套事务中的写入
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, _):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def add_papers(db_session):
+    """
+    添加一场考试（含一名老师与 students 名学生）及其答卷
+
+    :return: 异步函数 add(contents, exam_id=1, students=1, **paper_fields)，每个识别文本一份答卷，返回答卷ID列表
+    """
+    async def add(contents: list, exam_id: int = 1, students: int = 1, **paper_fields) -> list[int]:
+        async with db_session() as session:
+            async with session.begin():
+                if await session.get(Exam, exam_id) is None:
+                    teacher = User(username=f"teacher{exam_id}", password="x", role="teacher",
+                                   class_name=f"class{exam_id}")
+                    session.add(teacher)
+                    session.add_all(
+                        User(username=f"student{exam_id}-{i}", password="x", role="student",
+                             class_name=f"class{exam_id}")
+                        for i in range(students)
+                    )
+                    await session.flush()
+                    session.add(Exam(id=exam_id, title="作文", subject="英语", time=datetime(2026, 1, 1),
+                                     creator_id=teacher.id, questions_path="questions.pdf",
+                                     questions_filename="questions.pdf"))
+                    await session.flush()
+                exam = await session.get(Exam, exam_id)
+                fields = {"paper_path": "paper.pdf", "status": "pending", **paper_fields}
+                papers = [
+                    Paper(exam_id=exam_id, student_id=exam.creator_id + 1, content=content, **fields)
+                    for content in contents
+                ]
+                session.add_all(papers)
+                await session.flush()
+                return [paper.id for paper in papers]
+
+    return add
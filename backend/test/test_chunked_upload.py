@@ -0,0 +1,198 @@
+# backend/test/test_chunked_upload.py
+import gc
+import hashlib
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from backend.app.markmanage.models import Exam, StoredFile
+from backend.app.markmanage.service import file_store_service as file_store_module
+from backend.app.markmanage.service.upload_service import UploadService
+from backend.common.exception import errors
+from backend.config.fileConfig import settings
+from backend.utils.chunked_upload import DATA_NAME, ChunkError, ChunkedUploadStore
+from backend.utils.file_service import FileService
+
+DATA = b"%PDF-1.4\n" + bytes(range(256)) * 40 + b"\n%%EOF\n"
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunks(data: bytes, size: int):
+    return [(offset, data[offset:offset + size]) for offset in range(0, len(data), size)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ChunkedUploadStore(str(tmp_path / "sessions"), ttl_seconds=60)
+
+
+def test_chunks_are_appended_in_offset_order(store):
+    meta = store.create("a.pdf", len(DATA), sha256(DATA), purpose="exam")
+    upload_id = meta["upload_id"]
+    for offset, chunk in chunks(DATA, 1000):
+        meta = store.write_chunk(upload_id, offset, chunk, sha256(chunk))
+        assert meta["offset"] == offset + len(chunk)
+
+    verified = store.verify(upload_id)
+    assert verified["sha256"] == sha256(DATA)
+    with open(store.data_path(upload_id), "rb") as f:
+        assert f.read() == DATA
+
+
+def test_offset_gap_and_bad_checksum_are_rejected(store):
+    upload_id = store.create("a.pdf", len(DATA))["upload_id"]
+    first = DATA[:1000]
+    store.write_chunk(upload_id, 0, first, sha256(first))
+
+    with pytest.raises(ChunkError):
+        store.write_chunk(upload_id, 2000, DATA[2000:3000], sha256(DATA[2000:3000]))
+    with pytest.raises(ChunkError):
+        store.write_chunk(upload_id, 1000, DATA[1000:2000], sha256(b"other"))
+    with pytest.raises(ChunkError):
+        store.write_chunk(upload_id, 1000, DATA[1000:] + b"x", sha256(DATA[1000:] + b"x"))
+    assert store.get(upload_id)["offset"] == 1000
+
+
+def test_resend_of_acknowledged_chunk_is_ignored(store):
+    upload_id = store.create("a.pdf", len(DATA))["upload_id"]
+    first = DATA[:1000]
+    store.write_chunk(upload_id, 0, first, sha256(first))
+
+    assert store.write_chunk(upload_id, 0, first, sha256(first))["offset"] == 1000
+    assert os.path.getsize(store.data_path(upload_id)) == 1000
+
+
+def test_resume_truncates_unacknowledged_data(store):
+    upload_id = store.create("a.pdf", len(DATA), sha256(DATA))["upload_id"]
+    first = DATA[:1000]
+    store.write_chunk(upload_id, 0, first, sha256(first))
+    # 进程在写入数据之后、更新 meta.json 之前中断
+    with open(store.data_path(upload_id), "ab") as f:
+        f.write(b"garbage from an interrupted chunk")
+
+    resumed = ChunkedUploadStore(store.root)
+    offset = resumed.get(upload_id)["offset"]
+    assert offset == 1000
+    for chunk_offset, chunk in chunks(DATA, 1000)[1:]:
+        resumed.write_chunk(upload_id, chunk_offset, chunk, sha256(chunk))
+    assert resumed.verify(upload_id)["sha256"] == sha256(DATA)
+
+
+def test_verify_rejects_incomplete_or_corrupted_upload(store):
+    upload_id = store.create("a.pdf", len(DATA), sha256(DATA))["upload_id"]
+    half = DATA[:len(DATA) // 2]
+    store.write_chunk(upload_id, 0, half, sha256(half))
+    with pytest.raises(ChunkError):
+        store.verify(upload_id)
+
+    rest = DATA[len(half):]
+    store.write_chunk(upload_id, len(half), rest, sha256(rest))
+    with open(os.path.join(store.root, upload_id, DATA_NAME), "r+b") as f:
+        f.write(b"X")
+    with pytest.raises(ChunkError):
+        store.verify(upload_id)
+
+
+def test_unknown_or_malicious_upload_id(store):
+    with pytest.raises(KeyError):
+        store.get("0" * 32)
+    with pytest.raises(KeyError):
+        store.get("../etc")
+
+
+def test_cleanup_expired(store, monkeypatch):
+    old = store.create("a.pdf", len(DATA))["upload_id"]
+    monkeypatch.setattr("time.time", lambda: 10 ** 10)
+    fresh = store.create("b.pdf", len(DATA))["upload_id"]
+
+    assert store.cleanup_expired() == 1
+    with pytest.raises(KeyError):
+        store.get(old)
+    assert store.get(fresh)["filename"] == "b.pdf"
+
+
+@pytest.fixture
+def service(tmp_path, db_session, monkeypatch):
+    monkeypatch.setattr(file_store_module, "async_db_session", db_session)
+    monkeypatch.setattr(settings, "QUESTION_UPLOAD_DIR", str(tmp_path / "questions"))
+    upload_service = UploadService()
+    upload_service.store = ChunkedUploadStore(str(tmp_path / "sessions"), ttl_seconds=60)
+    return upload_service
+
+
+async def upload(service, data: bytes = DATA, chunk_size: int = 1000) -> str:
+    meta = await service.initiate(
+        "exam", "questions.pdf", len(data), sha256(data),
+        title="作文", subject="英语", time=datetime(2026, 1, 1), creator_id=1
+    )
+    for offset, chunk in chunks(data, chunk_size):
+        await service.put_chunk(meta["upload_id"], offset, chunk, sha256(chunk))
+    return meta["upload_id"]
+
+
+@pytest.mark.anyio
+async def test_finalize_creates_exam_without_rehashing(service, db_session, monkeypatch):
+    upload_id = await upload(service)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("完成上传时不应重新计算文件哈希")
+
+    monkeypatch.setattr(FileService, "get_file_metadata", staticmethod(fail))
+    result = await service.finalize(upload_id)
+
+    assert result["sha256"] == sha256(DATA)
+    async with db_session() as session:
+        exam = await session.get(Exam, result["exam_id"])
+        stored = (await session.execute(select(StoredFile))).scalars().one()
+    assert exam.questions_path == stored.path and stored.sha256 == sha256(DATA)
+    with open(stored.path, "rb") as f:
+        assert f.read() == DATA
+    # 会话在完成后删除
+    with pytest.raises(errors.NotFoundError):
+        await service.get_session(upload_id)
+
+
+@pytest.mark.anyio
+async def test_finalize_incomplete_upload_keeps_session(service):
+    meta = await service.initiate(
+        "exam", "questions.pdf", len(DATA),
+        title="作文", subject="英语", time=datetime(2026, 1, 1), creator_id=1
+    )
+    first = DATA[:1000]
+    await service.put_chunk(meta["upload_id"], 0, first, sha256(first))
+
+    with pytest.raises(errors.RequestError):
+        await service.finalize(meta["upload_id"])
+    assert (await service.get_session(meta["upload_id"]))["offset"] == 1000
+
+
+@pytest.mark.anyio
+async def test_first_chunk_must_look_like_pdf(service):
+    data = b"not a pdf" * 200
+    meta = await service.initiate(
+        "exam", "questions.pdf", len(data),
+        title="作文", subject="英语", time=datetime(2026, 1, 1), creator_id=1
+    )
+    with pytest.raises(errors.InvalidFileName):
+        await service.put_chunk(meta["upload_id"], 0, data[:1000], sha256(data[:1000]))
+
+
+@pytest.mark.anyio
+async def test_session_locks_are_not_kept(service):
+    upload_id = await upload(service, chunk_size=len(DATA) // 2)
+    await service.abort(upload_id)
+    # 放弃的会话（从未完成或取消）
+    abandoned = await service.initiate(
+        "exam", "questions.pdf", len(DATA),
+        title="作文", subject="英语", time=datetime(2026, 1, 1), creator_id=1
+    )
+    first = DATA[:1000]
+    await service.put_chunk(abandoned["upload_id"], 0, first, sha256(first))
+
+    gc.collect()
+    assert len(service._locks) == 0
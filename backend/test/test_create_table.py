@@ -0,0 +1,31 @@
+# backend/test/test_create_table.py
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import mysql, postgresql
+
+from backend.app.markmanage.models import Paper
+from backend.database.create_table import build_widen_statement, find_narrow_columns, widen_columns
+
+
+def test_existing_short_column_is_detected(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # 旧版本建好的表
+        conn.execute(text("CREATE TABLE papers (id INTEGER PRIMARY KEY, paper_path VARCHAR(100) NOT NULL)"))
+
+        narrow = find_narrow_columns(conn)
+        assert [(table.name, column.name, length) for table, column, length in narrow] == [
+            ("papers", "paper_path", 100)
+        ]
+        # SQLite 上跳过，不报错
+        widen_columns(conn)
+    engine.dispose()
+
+
+def test_widen_statements():
+    column = Paper.__table__.c.paper_path
+    assert build_widen_statement(mysql.dialect(), Paper.__table__, column) == (
+        "ALTER TABLE papers MODIFY COLUMN paper_path VARCHAR(255) NOT NULL"
+    )
+    assert build_widen_statement(postgresql.dialect(), Paper.__table__, column) == (
+        "ALTER TABLE papers ALTER COLUMN paper_path TYPE VARCHAR(255)"
+    )
@@ -0,0 +1,189 @@
+# backend/test/test_file_store_service.py
+import io
+import os
+from datetime import datetime
+
+import pytest
+from fastapi import UploadFile
+from pypdf import PdfWriter
+from sqlalchemy import select
+
+from backend.app.markmanage.crud.crud_exam import ExamCRUD
+from backend.app.markmanage.models import Exam, StoredFile
+from backend.app.markmanage.service import file_store_service as file_store_module
+from backend.app.markmanage.service.exam_service import exam_service
+from backend.app.markmanage.service.file_store_service import file_store_service
+from backend.config.fileConfig import settings
+
+pytestmark = pytest.mark.anyio
+
+CONTENT = b"%PDF-1.4\nquestions\n%%EOF\n"
+
+
+@pytest.fixture
+def store_dir(tmp_path, db_session, monkeypatch):
+    monkeypatch.setattr(file_store_module, "async_db_session", db_session)
+    return str(tmp_path / "store")
+
+
+def make_upload(content: bytes = CONTENT, filename: str = "questions.pdf") -> UploadFile:
+    return UploadFile(io.BytesIO(content), filename=filename)
+
+
+def stored_files(store_dir: str) -> list[str]:
+    return [os.path.join(root, name) for root, _, names in os.walk(store_dir) for name in names]
+
+
+async def store(store_dir: str, content: bytes = CONTENT) -> str:
+    async with file_store_service.session() as session:
+        path = await file_store_service.store_upload(session, make_upload(content), store_dir)
+        await session.commit()
+    return path
+
+
+async def get_row(db_session, path: str):
+    async with db_session() as session:
+        return (await session.execute(select(StoredFile).where(StoredFile.path == path))).scalars().first()
+
+
+async def test_same_content_is_stored_once(store_dir, db_session):
+    first = await store(store_dir)
+    second = await store(store_dir)
+
+    assert first == second
+    assert stored_files(store_dir) == [first]
+    with open(first, "rb") as f:
+        assert f.read() == CONTENT
+    assert (await get_row(db_session, first)).ref_count == 2
+
+
+async def test_different_content_is_stored_separately(store_dir):
+    first = await store(store_dir)
+    second = await store(store_dir, CONTENT + b"changed")
+
+    assert first != second
+    assert sorted(stored_files(store_dir)) == sorted([first, second])
+
+
+async def test_release_keeps_file_until_last_reference(store_dir, db_session):
+    path = await store(store_dir)
+    await store(store_dir)
+
+    async with file_store_service.session() as session:
+        assert await file_store_service.release(session, path) is False
+        await session.commit()
+    assert os.path.exists(path)
+    assert (await get_row(db_session, path)).ref_count == 1
+
+    async with file_store_service.session() as session:
+        assert await file_store_service.release(session, path) is True
+        # 提交前文件仍在，事务失败时记录仍能找到文件
+        assert os.path.exists(path)
+        await session.commit()
+    assert not os.path.exists(path)
+    assert await get_row(db_session, path) is None
+
+
+async def test_release_unknown_path_returns_none(store_dir, tmp_path):
+    legacy = tmp_path / "legacy.pdf"
+    legacy.write_bytes(CONTENT)
+
+    async with file_store_service.session() as session:
+        assert await file_store_service.release(session, str(legacy)) is None
+        file_store_service.remove_after_commit(session, str(legacy))
+        assert legacy.exists()
+        await session.commit()
+    assert not legacy.exists()
+
+
+async def test_rollback_keeps_released_file(store_dir, db_session):
+    path = await store(store_dir)
+
+    with pytest.raises(RuntimeError):
+        async with file_store_service.session() as session:
+            await file_store_service.release(session, path)
+            raise RuntimeError("更新考试记录失败")
+
+    assert os.path.exists(path)
+    assert (await get_row(db_session, path)).ref_count == 1
+
+
+async def test_rollback_removes_newly_placed_file(store_dir, db_session):
+    with pytest.raises(RuntimeError):
+        async with file_store_service.session() as session:
+            path = await file_store_service.store_upload(session, make_upload(), store_dir)
+            assert os.path.exists(path)
+            raise RuntimeError("创建考试记录失败")
+
+    assert stored_files(store_dir) == []
+    assert await get_row(db_session, path) is None
+
+
+async def test_rollback_keeps_file_of_committed_reference(store_dir, db_session):
+    path = await store(store_dir)
+
+    async with file_store_service.session() as session:
+        assert await file_store_service.store_upload(session, make_upload(), store_dir) == path
+        await session.rollback()
+
+    assert stored_files(store_dir) == [path]
+    assert (await get_row(db_session, path)).ref_count == 1
+
+
+async def test_store_existing_file_keeps_source(store_dir, tmp_path, db_session):
+    source = tmp_path / "scan.pdf"
+    source.write_bytes(CONTENT)
+
+    async with file_store_service.session() as session:
+        path = await file_store_service.store_existing_file(session, str(source), store_dir)
+        await session.commit()
+
+    assert source.exists()
+    assert path == await store(store_dir)
+    assert (await get_row(db_session, path)).ref_count == 2
+
+
+@pytest.fixture
+def locked_reads(monkeypatch):
+    """记录读取考试时是否加行锁"""
+    calls = []
+    get_exam_by_id = ExamCRUD.get_exam_by_id
+
+    async def recording_get_exam_by_id(self, session, exam_id, for_update=False):
+        calls.append(for_update)
+        return await get_exam_by_id(self, session, exam_id, for_update)
+
+    monkeypatch.setattr(ExamCRUD, "get_exam_by_id", recording_get_exam_by_id)
+    return calls
+
+
+async def add_exam(db_session, questions_path: str) -> int:
+    async with db_session() as session:
+        async with session.begin():
+            exam = Exam(title="作文", subject="英语", time=datetime(2026, 1, 1), creator_id=1,
+                        questions_path=questions_path, questions_filename="questions.pdf")
+            session.add(exam)
+            await session.flush()
+            return exam.id
+
+
+async def test_exam_file_changes_lock_exam_and_release_migrated_file(store_dir, db_session, locked_reads,
+                                                                       monkeypatch):
+    monkeypatch.setattr(settings, "QUESTION_UPLOAD_DIR", store_dir)
+    # 迁移后的考试：题目文件已在存储中，引用计数为1
+    migrated = await store(store_dir)
+    exam_id = await add_exam(db_session, migrated)
+
+    buffer = io.BytesIO()
+    writer = PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    writer.write(buffer)
+    await exam_service.update_exam_files(exam_id, make_upload(buffer.getvalue()))
+
+    assert await get_row(db_session, migrated) is None
+    assert not os.path.exists(migrated)
+    assert len(stored_files(store_dir)) == 1
+
+    await exam_service.delete_exam_files(exam_id)
+    assert stored_files(store_dir) == []
+    assert locked_reads.count(True) == 2
@@ -0,0 +1,179 @@
+# backend/test/test_grading_jobs.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from backend.app.markmanage.crud.crud_grading_job import GradingJobCRUD
+from backend.app.markmanage.models import GradingJob, Paper
+from backend.app.markmanage.service import grading_service as grading_service_module
+from backend.app.markmanage.service.grading.model_client import GradingResult
+from backend.app.markmanage.service.grading_service import JobQueuePaperStore
+
+pytestmark = pytest.mark.anyio
+
+crud = GradingJobCRUD()
+
+
+async def enqueue(db_session, exam_id: int = None) -> int:
+    async with db_session() as session:
+        async with session.begin():
+            return await crud.enqueue_pending_papers(session, exam_id)
+
+
+async def claim(db_session, owner: str, limit: int = 10, lease_seconds: float = 60) -> list[int]:
+    async with db_session() as session:
+        async with session.begin():
+            rows = await crud.claim_jobs(session, owner, limit, lease_seconds)
+    return [paper_id for paper_id, _, _, _ in rows]
+
+
+async def sweep(db_session, max_attempts: int = 3) -> dict:
+    async with db_session() as session:
+        async with session.begin():
+            return await crud.requeue_expired_leases(session, max_attempts)
+
+
+async def jobs(db_session) -> dict[int, GradingJob]:
+    async with db_session() as session:
+        result = await session.execute(select(GradingJob))
+        return {job.paper_id: job for job in result.scalars().all()}
+
+
+async def expire_leases(db_session):
+    async with db_session() as session:
+        async with session.begin():
+            await session.execute(
+                update(GradingJob).where(GradingJob.status == 'leased')
+                .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+            )
+
+
+async def test_enqueue_only_recognized_pending_papers_once(db_session, add_papers):
+    ready = await add_papers(["a", "b"])
+    await add_papers([None])
+    await add_papers(["graded"], status="graded")
+    await add_papers(["other exam"], exam_id=2)
+
+    assert await enqueue(db_session, exam_id=1) == 2
+    assert await enqueue(db_session, exam_id=1) == 0
+    assert sorted(await jobs(db_session)) == ready
+
+
+async def test_claims_do_not_overlap(db_session, add_papers):
+    paper_ids = await add_papers([f"answer {i}" for i in range(10)])
+    await enqueue(db_session)
+
+    first = await claim(db_session, "worker-a", limit=4)
+    second = await claim(db_session, "worker-b", limit=4)
+    third = await claim(db_session, "worker-c", limit=4)
+
+    assert len(first) == 4 and len(second) == 4 and len(third) == 2
+    assert sorted(first + second + third) == paper_ids
+    assert await claim(db_session, "worker-d") == []
+    leased = await jobs(db_session)
+    assert {leased[paper_id].lease_owner for paper_id in first} == {"worker-a"}
+    assert all(job.status == 'leased' and job.attempts == 1 for job in leased.values())
+
+
+async def test_claim_returns_paper_content(db_session, add_papers):
+    paper_id, = await add_papers(["my essay"])
+    await enqueue(db_session)
+
+    async with db_session() as session:
+        async with session.begin():
+            rows = await crud.claim_jobs(session, "worker-a", 10, 60)
+
+    assert len(rows) == 1
+    assert rows[0][0] == paper_id and rows[0][1] == 1 and rows[0][3] == "my essay"
+
+
+async def test_expired_lease_is_reclaimed_and_late_write_is_fenced(db_session, add_papers):
+    paper_id, = await add_papers(["answer"])
+    await enqueue(db_session)
+    assert await claim(db_session, "worker-a") == [paper_id]
+
+    # 未过期的租约不会被回收
+    assert await sweep(db_session) == {"requeued": 0, "failed": 0}
+    await expire_leases(db_session)
+    assert await sweep(db_session) == {"requeued": 1, "failed": 0}
+    assert await claim(db_session, "worker-b") == [paper_id]
+
+    async with db_session() as session:
+        assert await crud.lock_owned_jobs(session, "worker-a", [paper_id]) == []
+        assert await crud.lock_owned_jobs(session, "worker-b", [paper_id]) == [paper_id]
+    job = (await jobs(db_session))[paper_id]
+    assert job.attempts == 2 and job.lease_owner == "worker-b"
+
+
+async def test_expired_lease_fails_after_max_attempts(db_session, add_papers):
+    paper_id, = await add_papers(["answer"])
+    await enqueue(db_session)
+    for owner in ("worker-a", "worker-b"):
+        assert await claim(db_session, owner) == [paper_id]
+        await expire_leases(db_session)
+        swept = await sweep(db_session, max_attempts=2)
+
+    assert swept == {"requeued": 0, "failed": 1}
+    job = (await jobs(db_session))[paper_id]
+    assert job.status == 'failed' and job.finished_at is not None
+
+
+async def test_heartbeat_keeps_lease(db_session, add_papers):
+    paper_id, = await add_papers(["answer"])
+    await enqueue(db_session)
+    await claim(db_session, "worker-a")
+    await expire_leases(db_session)
+
+    async with db_session() as session:
+        async with session.begin():
+            assert await crud.extend_leases(session, "worker-a", 60) == 1
+    assert await sweep(db_session) == {"requeued": 0, "failed": 0}
+    assert (await jobs(db_session))[paper_id].lease_owner == "worker-a"
+
+
+async def test_release_jobs(db_session, add_papers):
+    attempted, unstarted = await add_papers(["a", "b"])
+    await enqueue(db_session)
+    await claim(db_session, "worker-a")
+
+    async with db_session() as session:
+        async with session.begin():
+            await crud.release_jobs(session, "worker-a", [attempted], 3, 60, error="timeout")
+            await crud.release_jobs(session, "worker-a", [unstarted], 3, 60, attempted=False)
+
+    released = await jobs(db_session)
+    assert released[attempted].status == 'queued' and released[attempted].attempts == 1
+    assert released[attempted].visible_at > datetime.utcnow()
+    assert released[unstarted].status == 'queued' and released[unstarted].attempts == 0
+    # 延迟期间不可领取
+    assert await claim(db_session, "worker-b") == [unstarted]
+
+
+async def test_job_queue_store_discards_results_of_lost_leases(db_session, add_papers, monkeypatch):
+    monkeypatch.setattr(grading_service_module, "async_db_session", db_session)
+    kept, lost = await add_papers(["a", "b"])
+    await enqueue(db_session)
+    store_a = JobQueuePaperStore("worker-a", lease_seconds=60, max_attempts=3, retry_delay=0)
+    store_b = JobQueuePaperStore("worker-b", lease_seconds=60, max_attempts=3, retry_delay=0)
+
+    assert [request.paper_id for request in await store_a.claim(10)] == [kept, lost]
+    async with db_session() as session:
+        async with session.begin():
+            await session.execute(
+                update(GradingJob).where(GradingJob.paper_id == lost)
+                .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+            )
+    assert [request.paper_id for request in await store_b.claim(10)] == [lost]
+
+    await store_a.save_results([
+        GradingResult(paper_id=paper_id, total_score=80, comments="ok") for paper_id in (kept, lost)
+    ])
+
+    finished = await jobs(db_session)
+    assert finished[kept].status == 'done'
+    assert finished[lost].status == 'leased' and finished[lost].lease_owner == "worker-b"
+    async with db_session() as session:
+        papers = {paper.id: paper for paper in (await session.execute(select(Paper))).scalars().all()}
+    assert papers[kept].status == 'graded' and papers[kept].scores_comments
+    assert papers[lost].scores_comments is None
@@ -0,0 +1,51 @@
+# backend/test/test_ocr_service.py
+import pytest
+from PIL import Image, ImageDraw
+from pypdf import PdfWriter
+from sqlalchemy import select
+
+from backend.app.markmanage.crud.crud_grading_job import GradingJobCRUD
+from backend.app.markmanage.models import GradingJob, Paper
+from backend.app.markmanage.service import ocr_service as ocr_service_module
+from backend.app.markmanage.service.ocr_service import OCRService
+
+pytestmark = pytest.mark.anyio
+
+
+def scanned_pdf(path) -> str:
+    img = Image.new("RGB", (200, 120), "white")
+    ImageDraw.Draw(img).text((20, 50), "answer", fill="black")
+    img.save(path, "PDF", resolution=75)
+    return str(path)
+
+
+def blank_pdf(path) -> str:
+    writer = PdfWriter()
+    writer.add_blank_page(width=200, height=120)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+
+async def test_paper_without_text_is_marked_failed_and_not_graded(tmp_path, db_session, add_papers, monkeypatch):
+    monkeypatch.setattr(ocr_service_module, "async_db_session", db_session)
+    scanned, = await add_papers([None], paper_path=scanned_pdf(tmp_path / "scanned.pdf"))
+    blank, = await add_papers([None], paper_path=blank_pdf(tmp_path / "blank.pdf"))
+    service = OCRService()
+
+    stats = await service.run(engine="stub", workers=1)
+    assert stats["papers"] == 2 and stats["empty"] == 1 and stats["failed"] == 0
+
+    async with db_session() as session:
+        papers = {paper.id: paper for paper in (await session.execute(select(Paper))).scalars().all()}
+    assert papers[scanned].content.startswith("[stub ocr")
+    assert papers[blank].content is None and papers[blank].status == 'ocr_failed'
+
+    # 已标记的答卷不再重复识别
+    assert (await service.run(engine="stub", workers=1))["papers"] == 0
+
+    async with db_session() as session:
+        async with session.begin():
+            assert await GradingJobCRUD().enqueue_pending_papers(session) == 1
+        job, = (await session.execute(select(GradingJob))).scalars().all()
+    assert job.paper_id == scanned
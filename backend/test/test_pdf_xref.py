@@ -0,0 +1,152 @@
+# backend/test/test_pdf_xref.py
+import io
+import zlib
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+from backend.utils.pdf_xref import read_pdf_page_count
+
+PAGE = b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 100 100] >>"
+
+
+def blank_pdf(pages: int) -> bytes:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=100, height=100)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def png_up(rows: list[bytes]) -> bytes:
+    """按 PNG Up 预测编码（每行前加预测类型2）"""
+    encoded = b""
+    previous = bytes(len(rows[0]))
+    for row in rows:
+        encoded += b"\x02" + bytes((a - b) & 0xFF for a, b in zip(row, previous))
+        previous = row
+    return encoded
+
+
+def xref_stream(number: int, entries: dict, extra: bytes = b"") -> bytes:
+    """
+    交叉引用流对象，条目宽度 [1 4 2]，PNG Up 预测 + Flate 压缩
+
+    :param entries: {对象号: (类型, 字段2, 字段3)}
+    """
+    numbers = sorted(entries)
+    index = b" ".join(b"%d 1" % n for n in numbers)
+    rows = [bytes([entries[n][0]]) + entries[n][1].to_bytes(4, "big") + entries[n][2].to_bytes(2, "big")
+            for n in numbers]
+    data = zlib.compress(png_up(rows))
+    return (b"%d 0 obj\n<< /Type /XRef /Size %d /Index [%s] /W [1 4 2] /Filter /FlateDecode "
+            b"/DecodeParms << /Predictor 12 /Columns 7 >> %s/Length %d >>\nstream\n"
+            % (number, max(numbers) + 1, index, extra, len(data)) + data + b"\nendstream\nendobj\n")
+
+
+def object_stream(number: int, objects: dict) -> bytes:
+    """对象流对象，{对象号: 对象内容}"""
+    body = b""
+    header = []
+    for object_number, content in objects.items():
+        header.append(b"%d %d" % (object_number, len(body)))
+        body += content + b"\n"
+    header = b" ".join(header) + b"\n"
+    data = zlib.compress(header + body)
+    return (b"%d 0 obj\n<< /Type /ObjStm /N %d /First %d /Filter /FlateDecode /Length %d >>\nstream\n"
+            % (number, len(objects), len(header), len(data)) + data + b"\nendstream\nendobj\n")
+
+
+def object_stream_pdf() -> bytes:
+    """目录、页面树与页面都在对象流中，只有交叉引用流"""
+    pdf = b"%PDF-1.5\n"
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [3 0 R 4 0 R 5 0 R] /Count 3 >>",
+        3: PAGE, 4: PAGE, 5: PAGE,
+    }
+    stream_offset = len(pdf)
+    pdf += object_stream(6, objects)
+    xref_offset = len(pdf)
+    entries = {0: (0, 0, 65535), 6: (1, stream_offset, 0), 7: (1, xref_offset, 0)}
+    entries.update({number: (2, 6, index) for index, number in enumerate(objects)})
+    pdf += xref_stream(7, entries, b"/Root 1 0 R ")
+    return pdf + b"startxref\n%d\n%%%%EOF\n" % xref_offset
+
+
+def hybrid_pdf() -> bytes:
+    """
+    混合引用文件：旧式交叉引用表把对象流中的目录与页面树标记为空闲，
+    实际位置由 trailer 的 /XRefStm 指向的交叉引用流给出
+    """
+    pdf = b"%PDF-1.5\n"
+    offsets = {}
+    offsets[3] = len(pdf)
+    pdf += object_stream(3, {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [4 0 R 5 0 R] /Count 2 >>",
+    })
+    for number in (4, 5):
+        offsets[number] = len(pdf)
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, PAGE)
+    offsets[6] = len(pdf)
+    pdf += xref_stream(6, {1: (2, 3, 0), 2: (2, 3, 1)})
+
+    table_offset = len(pdf)
+    pdf += b"xref\n0 7\n0000000000 65535 f \n0000000000 00000 f \n0000000000 00000 f \n"
+    for number in (3, 4, 5, 6):
+        pdf += b"%010d 00000 n \n" % offsets[number]
+    pdf += b"trailer\n<< /Size 7 /Root 1 0 R /XRefStm %d >>\n" % offsets[6]
+    return pdf + b"startxref\n%d\n%%%%EOF\n" % table_offset
+
+
+def incremental_pdf() -> bytes:
+    """pypdf 增量更新：原文件3页（旧式表），追加1页（交叉引用流，/Prev 指向旧表）"""
+    writer = PdfWriter(io.BytesIO(blank_pdf(3)), incremental=True)
+    writer.add_blank_page(width=100, height=100)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("build, pages", [
+    (lambda: blank_pdf(5), 5),
+    (object_stream_pdf, 3),
+    (hybrid_pdf, 2),
+    (incremental_pdf, 4),
+])
+def test_page_count(build, pages):
+    data = build()
+    # 构造的文件先用 pypdf 校验
+    assert len(PdfReader(io.BytesIO(data), strict=True).pages) == pages
+    assert read_pdf_page_count(io.BytesIO(data)) == pages
+
+
+def test_incremental_update_uses_xref_stream_with_prev():
+    data = incremental_pdf()
+    assert b"/Type /XRef" in data and b"/Prev" in data
+
+
+@pytest.mark.parametrize("data", [
+    blank_pdf(2)[:300],
+    object_stream_pdf()[:-60],
+    # 中间被截断，startxref 仍在但偏移量失效
+    object_stream_pdf()[:80] + object_stream_pdf()[-40:],
+    hybrid_pdf()[:150] + hybrid_pdf()[-120:],
+    b"%PDF-1.4\nnot really a pdf\n",
+    b"",
+])
+def test_malformed_file_returns_none(data):
+    assert read_pdf_page_count(io.BytesIO(data)) is None
+
+
+def test_file_position_is_restored(tmp_path):
+    source = io.BytesIO(blank_pdf(2))
+    source.seek(7)
+    assert read_pdf_page_count(source) == 2
+    assert source.tell() == 7
+
+    path = tmp_path / "a.pdf"
+    path.write_bytes(blank_pdf(1))
+    assert read_pdf_page_count(str(path)) == 1
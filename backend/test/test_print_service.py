@@ -0,0 +1,27 @@
+# backend/test/test_print_service.py
+import pytest
+
+from backend.app.markmanage.service import print_service as print_service_module
+from backend.app.markmanage.service.print_service import PrintService
+from backend.common.exception import errors
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_class_without_students_is_not_found(monkeypatch):
+    async def get_exam_file_info(exam_id):
+        return "questions.pdf", "questions.pdf"
+
+    async def list_students_by_class(class_name):
+        return []
+
+    def build(*args, **kwargs):
+        raise AssertionError("没有学生时不应生成套印PDF")
+
+    monkeypatch.setattr(print_service_module.exam_service, "get_exam_file_info", get_exam_file_info)
+    monkeypatch.setattr(print_service_module.user_service, "list_students_by_class", list_students_by_class)
+    service = PrintService()
+    monkeypatch.setattr(service.class_set_builder, "build", build)
+
+    with pytest.raises(errors.NotFoundError):
+        await service.print_class_set(1, "三年二班")
@@ -0,0 +1,33 @@
+# backend/test/test_scan_coordinator.py
+from pypdf import PdfReader
+
+from backend.app.markmanage.service.PDFScanner import PDFScanner
+from backend.app.markmanage.service.connect_scanners.coordinator import ScannerCoordinator
+from backend.app.markmanage.service.connect_scanners.image_sources import SyntheticImageSource
+
+FILTERS = {"bilevel-g4": "/CCITTFaxDecode", None: "/DCTDecode"}
+
+
+def image_filter(pdf_path):
+    xobjects = PdfReader(pdf_path).pages[0]["/Resources"]["/XObject"]
+    return xobjects[next(iter(xobjects))].get_object()["/Filter"]
+
+
+def test_batches_without_profile_use_device_default(tmp_path):
+    def scanner_factory(device_name, executor):
+        return PDFScanner(
+            scanner_name="synthetic", scan_dir=str(tmp_path / device_name), resolution=75,
+            image_source=SyntheticImageSource(page_count=1), profile="gray-jpeg-85",
+            executor=executor, use_journal=False, export_metrics=False
+        )
+
+    coordinator = ScannerCoordinator(["scanner-a", "scanner-b"], scanner_factory, workers=2)
+    profiles = ["bilevel-g4", None, "bilevel-g4", None, None, "bilevel-g4", None]
+    jobs = [coordinator.submit(file_name=f"batch{index}", profile=profile) for index, profile in enumerate(profiles)]
+    try:
+        coordinator.wait(poll_interval=0.01)
+    finally:
+        coordinator.stop()
+
+    assert all(job.status == "succeeded" for job in jobs), [job.message for job in jobs]
+    assert [image_filter(job.pdfs[0]) for job in jobs] == [FILTERS[profile] for profile in profiles]
@@ -0,0 +1,81 @@
+# backend/test/test_scan_daemon.py
+import threading
+import time
+
+from pypdf import PdfReader
+
+from backend.app.markmanage.service.PDFScanner import PDFScanner
+from backend.app.markmanage.service.connect_scanners.image_sources import SyntheticImageSource
+from backend.app.markmanage.service.connect_scanners.scan_daemon import ScannerDaemon
+
+
+def wait_finished(*jobs, timeout=60):
+    deadline = time.monotonic() + timeout
+    while any(job.finished_at is None for job in jobs):
+        assert time.monotonic() < deadline, [job.status for job in jobs]
+        time.sleep(0.01)
+
+
+def create_scanner(tmp_path, profile):
+    return PDFScanner(
+        scan_dir=str(tmp_path), resolution=75, image_source=SyntheticImageSource(page_count=1),
+        profile=profile, workers=1, use_journal=False, export_metrics=False
+    )
+
+
+def image_filter(pdf_path):
+    xobjects = PdfReader(pdf_path).pages[0]["/Resources"]["/XObject"]
+    return xobjects[next(iter(xobjects))].get_object()["/Filter"]
+
+
+def test_job_without_profile_uses_daemon_default(tmp_path):
+    daemon = ScannerDaemon(scanner_factory=lambda: create_scanner(tmp_path, "gray-jpeg-85"))
+    try:
+        first = daemon.submit(file_name="first", profile="bilevel-g4")
+        second = daemon.submit(file_name="second")
+        wait_finished(first, second)
+    finally:
+        daemon.stop(timeout=30)
+
+    assert first.status == "succeeded" and second.status == "succeeded"
+    assert image_filter(first.pdfs[0]) == "/CCITTFaxDecode"
+    assert image_filter(second.pdfs[0]) == "/DCTDecode"
+
+
+class BlockingScanner:
+    """扫描时等待 release 被设置"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.profile = self.default_profile = None
+        self.stage_timings = {}
+        self.dropped_pages = []
+        self.all_pdfs = ["batch.pdf"]
+        self.student_papers = []
+
+    def scan(self, **kwargs):
+        self.started.set()
+        self.release.wait(30)
+        return True
+
+    def _cleanup_resources(self):
+        pass
+
+
+def test_stop_fails_jobs_still_in_queue():
+    scanner = BlockingScanner()
+    daemon = ScannerDaemon(scanner_factory=lambda: scanner)
+    running = daemon.submit()
+    queued = [daemon.submit(), daemon.submit()]
+    assert scanner.started.wait(10)
+
+    # 当前任务未完成，stop 超时返回
+    daemon.stop(timeout=0.1)
+    scanner.release.set()
+    wait_finished(running, *queued)
+    daemon.stop(timeout=10)
+
+    assert running.status == "succeeded"
+    assert all(job.status == "failed" and "已停止" in job.message for job in queued)
+    assert not daemon.running
@@ -0,0 +1,160 @@
+# backend/test/test_scan_journal.py
+import os
+
+import pytest
+from PIL import Image, ImageDraw
+from pypdf import PdfReader
+
+from backend.app.markmanage.service.PDFScanner import PDFScanner, ProcessedPage
+from backend.app.markmanage.service.connect_scanners import scan_journal
+from backend.app.markmanage.service.connect_scanners.image_sources import SyntheticImageSource
+from backend.app.markmanage.service.connect_scanners.scan_journal import MANIFEST_NAME, ScanJournal
+from backend.app.markmanage.service.connect_scanners.sheet_writer import encode_page
+
+
+def make_page(number: int, profile: str = "archive-color") -> ProcessedPage:
+    img = Image.new("RGB", (200, 280), "white")
+    ImageDraw.Draw(img).text((20, 20), f"page {number}", fill="black")
+    return ProcessedPage(encoded=encode_page(img, profile))
+
+
+def record_pages(journal: ScanJournal, count: int, start: int = 1):
+    for number in range(start, start + count):
+        journal.record_page(number, make_page(number), student_id=7, output_path="sheet.pdf")
+
+
+@pytest.fixture
+def fsync_calls(monkeypatch):
+    calls = []
+    real_fsync = os.fsync
+
+    def counting_fsync(fd):
+        calls.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(scan_journal.os, "fsync", counting_fsync)
+    return calls
+
+
+def test_pages_survive_reopen(tmp_path):
+    journal = ScanJournal.create(str(tmp_path), file_name="batch", resolution=300, profile="archive-color")
+    record_pages(journal, 3)
+    journal.record_page(4, ProcessedPage(cover_student_id=8), student_id=8)
+    journal.close()
+
+    reopened = ScanJournal.open(str(tmp_path), journal.session_id)
+    assert reopened.header["file_name"] == "batch" and reopened.header["resolution"] == 300
+    assert reopened.last_page == 4
+    assert [record["page"] for record in reopened.records] == [1, 2, 3, 4]
+    page = reopened.load_page(reopened.records[0])
+    assert page.stream == make_page(1).encoded.stream
+    assert reopened.load_page(reopened.records[3]) is None
+    assert reopened.records[3]["cover_student_id"] == 8
+    reopened.close()
+
+
+def test_fsync_is_batched(tmp_path, fsync_calls):
+    journal = ScanJournal.create(str(tmp_path), sync_every=4)
+    fsync_calls.clear()
+
+    record_pages(journal, 3)
+    assert fsync_calls == []
+    record_pages(journal, 1, start=4)
+    # 4 个页面数据文件 + 清单
+    assert len(fsync_calls) == 5
+
+    record_pages(journal, 2, start=5)
+    journal.close()
+    assert len(fsync_calls) == 8
+
+
+def test_sync_every_page(tmp_path, fsync_calls):
+    journal = ScanJournal.create(str(tmp_path), sync_every=1)
+    fsync_calls.clear()
+
+    record_pages(journal, 3)
+    assert len(fsync_calls) == 6
+    journal.close()
+
+
+def test_open_drops_incomplete_last_line(tmp_path):
+    journal = ScanJournal.create(str(tmp_path))
+    record_pages(journal, 2)
+    journal.close()
+    manifest = os.path.join(journal.session_dir, MANIFEST_NAME)
+    with open(manifest, "ab") as f:
+        f.write(b'{"type": "page", "page": 3')
+
+    reopened = ScanJournal.open(str(tmp_path), journal.session_dir)
+    assert reopened.last_page == 2
+    reopened.close()
+    with open(manifest, "rb") as f:
+        assert f.read().endswith(b"}\n")
+
+
+def test_open_drops_pages_whose_data_was_not_synced(tmp_path):
+    journal = ScanJournal.create(str(tmp_path), sync_every=0)
+    record_pages(journal, 4)
+    journal.close()
+    # 断电时清单先于第3页的数据落盘
+    with open(os.path.join(journal.session_dir, journal.records[2]["file"]), "r+b") as f:
+        f.truncate(10)
+
+    reopened = ScanJournal.open(str(tmp_path), journal.session_id)
+    assert reopened.last_page == 2
+    record_pages(reopened, 2, start=3)
+    reopened.close()
+    assert ScanJournal.open(str(tmp_path), journal.session_id).last_page == 4
+
+
+def test_open_missing_session(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ScanJournal.open(str(tmp_path), "no-such-session")
+
+
+def test_discard_removes_session(tmp_path):
+    journal = ScanJournal.create(str(tmp_path))
+    record_pages(journal, 2)
+    journal.discard()
+    assert not os.path.exists(journal.session_dir)
+
+
+class JammingImageSource(SyntheticImageSource):
+    """传输 jam_after 页后卡纸"""
+
+    def __init__(self, page_count, jam_after):
+        super().__init__(page_count=page_count)
+        self.jam_after = jam_after
+
+    def transfer(self):
+        if self._next_page >= self.jam_after:
+            raise RuntimeError("扫描仪卡纸")
+        return super().transfer()
+
+
+def create_scanner(tmp_path, image_source, **kwargs):
+    return PDFScanner(
+        scan_dir=str(tmp_path / "scans"), resolution=75, image_source=image_source,
+        profile="bilevel-g4", export_metrics=False, workers=2, **kwargs
+    )
+
+
+def test_interrupted_scan_resumes_from_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    scanner = create_scanner(tmp_path, JammingImageSource(page_count=5, jam_after=3))
+    scanner.scan(file_name="batch", prompt=False)
+
+    sessions = os.listdir(scanner.journal_dir)
+    assert len(sessions) == 1
+    interrupted = ScanJournal.open(scanner.journal_dir, sessions[0])
+    assert interrupted.last_page == 3
+    interrupted.close()
+
+    # 放入剩余的两页继续扫描
+    resumed = create_scanner(tmp_path, SyntheticImageSource(page_count=2))
+    assert resumed.scan(resume_session=sessions[0], prompt=False)
+
+    assert len(resumed.all_pdfs) == 1
+    assert len(PdfReader(resumed.all_pdfs[0]).pages) == 5
+    # 扫描完成后会话目录被删除
+    assert os.listdir(scanner.journal_dir) == []
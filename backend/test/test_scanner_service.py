@@ -0,0 +1,59 @@
+# backend/test/test_scanner_service.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.app.markmanage.service import scanner_service as scanner_service_module
+from backend.app.markmanage.service.scanner_service import ScannerService
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeScanner:
+    """扫描时直接产生一份学生答卷"""
+
+    def __init__(self):
+        self.stage_timings = {"transfer": [0.0]}
+        self.dropped_pages = []
+        self.all_pdfs = ["batch.pdf"]
+        self.student_papers = [(7, "batch.pdf")]
+        self.closed = False
+        self.profile = self.default_profile = None
+
+    def scan(self, **kwargs):
+        return True
+
+    def _cleanup_resources(self):
+        self.closed = True
+
+
+async def test_shutdown_waits_for_ingest_without_blocking_loop(monkeypatch):
+    scanner = FakeScanner()
+    ingest_started = threading.Event()
+
+    async def ingest(exam_id, student_papers):
+        ingest_started.set()
+        # 登记需要事件循环继续运行
+        await asyncio.sleep(0.05)
+        return [1]
+
+    monkeypatch.setattr(scanner_service_module.paper_service, "ingest_scanned_papers", ingest)
+    service = ScannerService()
+    monkeypatch.setattr(service, "_create_scanner", lambda: scanner)
+
+    job = await service.submit_job(split_by="count", student_ids=[7], exam_id=1)
+    for _ in range(500):
+        if ingest_started.is_set():
+            break
+        await asyncio.sleep(0.01)
+    assert ingest_started.is_set(), job.message
+
+    start = time.perf_counter()
+    await service.shutdown()
+
+    assert time.perf_counter() - start < 5
+    assert job.status == "succeeded" and job.paper_ids == [1]
+    assert scanner.closed
+    assert service.daemon is None
@@ -0,0 +1,107 @@
+# backend/test/test_sheet_writer.py
+import pytest
+from PIL import Image, ImageChops, ImageDraw
+from pypdf import PdfReader
+
+from backend.app.markmanage.service.PDFScanner import PDFScanner
+from backend.app.markmanage.service.connect_scanners.image_sources import SyntheticImageSource
+from backend.app.markmanage.service.connect_scanners.profiles import get_profile
+from backend.app.markmanage.service.connect_scanners.sheet_writer import (
+    StreamingSheetWriter,
+    _convert_for_profile,
+    encode_page,
+)
+from backend.utils.pdf_xref import read_pdf_page_count
+
+
+def make_image(number: int, size=(203, 150)) -> Image.Image:
+    """宽度不是8的倍数，覆盖G4行尾的填充位"""
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    draw.line((0, 0, size[0], size[1] - number * 10), fill="black", width=3)
+    draw.text((10, size[1] - 40), f"page {number}", fill="black")
+    return img
+
+
+def same_pixels(a: Image.Image, b: Image.Image) -> bool:
+    return a.size == b.size and ImageChops.difference(a.convert("L"), b.convert("L")).getbbox() is None
+
+
+def test_g4_encoding_is_lossless(tmp_path):
+    img = make_image(1)
+    page = encode_page(img, "bilevel-g4")
+    assert page.decode_filter == "CCITTFaxDecode" and page.bits_per_component == 1
+    assert page.decode_parms["Columns"] == img.width and page.decode_parms["Rows"] == img.height
+
+    writer = StreamingSheetWriter(str(tmp_path), "g4", 1, 75)
+    writer.add_page(page)
+    path = writer.close()
+
+    decoded = PdfReader(path, strict=True).pages[0].images[0].image
+    assert same_pixels(decoded, _convert_for_profile(img, get_profile("bilevel-g4")))
+
+
+def test_pages_are_written_in_order_with_valid_xref(tmp_path):
+    writer = StreamingSheetWriter(str(tmp_path), "batch", 1, 150)
+    profiles = ["bilevel-g4", "archive-color", "gray-jpeg-85", "bilevel-g4"]
+    for number, profile in enumerate(profiles):
+        writer.add_page(encode_page(make_image(number), profile))
+    assert writer.has_pending_pages
+    path = writer.close()
+    assert not writer.has_pending_pages
+
+    assert read_pdf_page_count(path) == len(profiles)
+    reader = PdfReader(path, strict=True)
+    assert len(reader.pages) == len(profiles)
+    # 页面尺寸按分辨率换算
+    assert float(reader.pages[0].mediabox.width) == pytest.approx(203 * 72 / 150)
+    for number, pdf_page in enumerate(reader.pages):
+        image = pdf_page.images[0].image
+        expected = make_image(number)
+        if profiles[number] == "bilevel-g4":
+            assert same_pixels(image, _convert_for_profile(expected, get_profile("bilevel-g4")))
+        else:
+            assert image.size == expected.size
+
+
+def test_concurrent_writers_get_distinct_files(tmp_path):
+    writers = [StreamingSheetWriter(str(tmp_path), "batch", 1, 75) for _ in range(3)]
+    for writer in writers:
+        writer.add_page(encode_page(make_image(0), "bilevel-g4"))
+    paths = [writer.close() for writer in writers]
+
+    assert len(set(paths)) == 3
+    assert all(read_pdf_page_count(path) == 1 for path in paths)
+
+
+def test_empty_writer_creates_no_file(tmp_path):
+    writer = StreamingSheetWriter(str(tmp_path), "empty", 1, 75)
+    assert writer.close() is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_closed_writer_rejects_pages(tmp_path):
+    writer = StreamingSheetWriter(str(tmp_path), "batch", 1, 75)
+    writer.add_page(encode_page(make_image(0), "bilevel-g4"))
+    path = writer.close()
+    assert writer.close() == path
+    with pytest.raises(RuntimeError):
+        writer.add_page(encode_page(make_image(1), "bilevel-g4"))
+
+
+def test_worker_pool_keeps_scan_order(tmp_path):
+    source = SyntheticImageSource(page_count=7)
+    scanner = PDFScanner(
+        scan_dir=str(tmp_path), resolution=75, image_source=source, profile="bilevel-g4",
+        workers=3, use_journal=False, export_metrics=False
+    )
+    assert scanner.scan(file_name="batch", prompt=False)
+
+    assert len(scanner.all_pdfs) == 1
+    pages = PdfReader(scanner.all_pdfs[0]).pages
+    assert len(pages) == 7
+    reference = SyntheticImageSource(page_count=7)
+    reference.configure(75, True)
+    for number, pdf_page in enumerate(pages):
+        expected = _convert_for_profile(reference.decode(number), get_profile("bilevel-g4"))
+        assert same_pixels(pdf_page.images[0].image, expected)
@@ -0,0 +1,23 @@
+# backend/test/test_telemetry.py
+import pytest
+
+from backend.app.markmanage.service.connect_scanners.telemetry import percentile
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    (range(1, 11), 50, 5),
+    (range(1, 11), 90, 9),
+    (range(1, 21), 95, 19),
+    (range(1, 21), 99, 20),
+    (range(1, 6), 50, 3),
+    (range(1, 6), 100, 5),
+    (range(1, 6), 0, 1),
+    ([7], 95, 7),
+    ([3, 1, 2], 50, 2),
+])
+def test_percentile_nearest_rank(values, pct, expected):
+    assert percentile(list(values), pct) == expected
+
+
+def test_percentile_of_empty_values():
+    assert percentile([], 95) == 0.0
@@ -0,0 +1,137 @@
+# backend/test/test_upload_middleware.py
+import httpx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+
+from backend.common.exception import errors
+from backend.middleware.upload_middleware import UploadValidationMiddleware
+from backend.utils.upload_validation import UploadStreamValidator
+
+pytestmark = pytest.mark.anyio
+
+MAX_FILE_SIZE = 64 * 1024
+BOUNDARY = "test-boundary"
+PDF = b"%PDF-1.4\n" + b"0" * 1000 + b"\n%%EOF\n"
+
+
+def create_app():
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/exam/create_exam")
+    async def create_exam(questions_file: UploadFile = File(...)):
+        app.state.calls += 1
+        return {"size": len(await questions_file.read())}
+
+    @app.post("/other")
+    async def other(questions_file: UploadFile = File(...)):
+        return {"size": len(await questions_file.read())}
+
+    app.add_middleware(
+        UploadValidationMiddleware,
+        path_pattern=r"/exam/create_exam$",
+        allowed_types=["pdf"],
+        max_file_size=MAX_FILE_SIZE,
+    )
+    return app
+
+
+def multipart_parts(filename: str, data: bytes, chunk_size: int = 8192) -> list[bytes]:
+    head = (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="questions_file"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+    return [head] + [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)] + [tail]
+
+
+class StreamedBody:
+    """按分块发送的请求体，记录服务端读取了多少个分块"""
+
+    def __init__(self, parts: list[bytes]):
+        self.parts = parts
+        self.sent = 0
+
+    async def __aiter__(self):
+        for part in self.parts:
+            self.sent += 1
+            yield part
+
+
+async def post(app, path: str, filename: str, data: bytes, **kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **kwargs.pop("headers", {})}
+        content = kwargs.pop("content", None) or b"".join(multipart_parts(filename, data))
+        return await client.post(path, content=content, headers=headers)
+
+
+async def test_valid_pdf_reaches_route():
+    app = create_app()
+    response = await post(app, "/exam/create_exam", "questions.pdf", PDF)
+
+    assert response.status_code == 200
+    assert response.json() == {"size": len(PDF)}
+    assert app.state.calls == 1
+
+
+async def test_wrong_extension_is_rejected_with_400():
+    app = create_app()
+    response = await post(app, "/exam/create_exam", "questions.exe", PDF)
+
+    assert response.status_code == 400
+    assert "扩展名" in response.json()["msg"]
+    assert app.state.calls == 0
+
+
+async def test_non_pdf_content_is_rejected_with_400():
+    app = create_app()
+    response = await post(app, "/exam/create_exam", "questions.pdf", b"MZ\x90\x00" + b"0" * 1000)
+
+    assert response.status_code == 400
+    assert "不是有效的PDF文件" in response.json()["msg"]
+    assert app.state.calls == 0
+
+
+async def test_declared_oversized_body_is_rejected_with_413_without_reading():
+    app = create_app()
+    body = StreamedBody(multipart_parts("questions.pdf", PDF))
+    too_large = str(MAX_FILE_SIZE * 4)
+    response = await post(app, "/exam/create_exam", "questions.pdf", PDF,
+                          content=body, headers={"Content-Length": too_large})
+
+    assert response.status_code == 413
+    assert response.headers["connection"] == "close"
+    assert body.sent == 0
+    assert app.state.calls == 0
+
+
+async def test_oversized_stream_is_rejected_with_413_before_the_end():
+    app = create_app()
+    data = b"%PDF-1.4\n" + b"0" * (MAX_FILE_SIZE * 3)
+    body = StreamedBody(multipart_parts("questions.pdf", data))
+    response = await post(app, "/exam/create_exam", "questions.pdf", data, content=body)
+
+    assert response.status_code == 413
+    assert body.sent < len(body.parts)
+    assert app.state.calls == 0
+
+
+async def test_unmatched_path_is_not_checked():
+    app = create_app()
+    response = await post(app, "/other", "notes.txt", b"plain text")
+
+    assert response.status_code == 200
+
+
+def test_stream_validator_checks_header_across_chunks():
+    validator = UploadStreamValidator("a.pdf", ["pdf"], 100)
+    validator.feed(b"%P")
+    validator.feed(b"DF-1.7")
+    validator.finish()
+
+    short = UploadStreamValidator("a.pdf", ["pdf"], 100)
+    short.feed(b"%PD")
+    with pytest.raises(errors.InvalidFileName):
+        short.finish()
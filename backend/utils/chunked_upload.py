@@ -0,0 +1,158 @@
+# backend/utils/chunked_upload.py
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+DATA_NAME = "data.part"
+META_NAME = "meta.json"
+
+
+class ChunkError(Exception):
+    """分块上传请求无效（偏移量不连续、校验和不匹配、超出声明大小等）"""
+
+
+class ChunkedUploadStore:
+    """
+    可续传的分块上传存储（同步方法，应在线程池中调用）
+
+    每个上传会话是根目录下的一个子目录：data.part 为按偏移量顺序拼接的文件数据，
+    meta.json 记录会话信息与已确认的偏移量。分块先写入 data.part 并落盘，再原子地更新 meta.json，
+    进程中断后以 meta.json 中的偏移量为准，之后的残缺数据在下一次写入时被截断。
+    分块直接追加到磁盘文件，整个文件不会载入内存。
+    """
+
+    def __init__(self, root: str, ttl_seconds: int = 24 * 3600):
+        """
+        :param root: 会话目录的根目录
+        :param ttl_seconds: 会话过期时间（秒），过期且未完成的会话在清理时删除
+        """
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+
+    def _session_dir(self, upload_id: str) -> str:
+        # 会话ID只允许十六进制字符，防止路径穿越
+        if not upload_id or any(ch not in "0123456789abcdef" for ch in upload_id):
+            raise KeyError(upload_id)
+        return os.path.join(self.root, upload_id)
+
+    def _write_meta(self, session_dir: str, meta: dict):
+        temp_path = os.path.join(session_dir, META_NAME + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, os.path.join(session_dir, META_NAME))
+
+    def create(self, filename: str, total_size: int, sha256: str = None, **attributes) -> dict:
+        """
+        创建上传会话
+
+        :param filename: 原始文件名
+        :param total_size: 文件总大小（字节）
+        :param sha256: 整个文件的SHA-256（可选，完成时校验）
+        :param attributes: 完成上传后交给业务处理的附加信息
+        :return: 会话信息
+        """
+        upload_id = uuid.uuid4().hex
+        session_dir = self._session_dir(upload_id)
+        os.makedirs(session_dir)
+        open(os.path.join(session_dir, DATA_NAME), "wb").close()
+        meta = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "total_size": total_size,
+            "sha256": sha256.lower() if sha256 else None,
+            "offset": 0,
+            "created_at": time.time(),
+            "attributes": attributes,
+        }
+        self._write_meta(session_dir, meta)
+        return meta
+
+    def get(self, upload_id: str) -> dict:
+        """读取会话信息，会话不存在时抛出 KeyError"""
+        try:
+            with open(os.path.join(self._session_dir(upload_id), META_NAME), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(upload_id)
+
+    def data_path(self, upload_id: str) -> str:
+        """已拼接数据的文件路径"""
+        return os.path.join(self._session_dir(upload_id), DATA_NAME)
+
+    def write_chunk(self, upload_id: str, offset: int, data: bytes, checksum: str) -> dict:
+        """
+        在指定偏移量写入一个分块
+
+        偏移量必须等于已确认的偏移量；重发已确认范围内的分块（例如响应丢失后重试）直接返回当前状态。
+
+        :param offset: 分块在文件中的起始偏移量
+        :param data: 分块数据
+        :param checksum: 分块数据的SHA-256（十六进制）
+        :return: 更新后的会话信息
+        """
+        meta = self.get(upload_id)
+        if hashlib.sha256(data).hexdigest() != (checksum or "").lower():
+            raise ChunkError("分块校验和不匹配")
+        if offset + len(data) <= meta["offset"]:
+            return meta
+        if offset != meta["offset"]:
+            raise ChunkError(f"分块偏移量应为 {meta['offset']}，收到 {offset}")
+        if offset + len(data) > meta["total_size"]:
+            raise ChunkError("分块超出文件声明的大小")
+
+        session_dir = self._session_dir(upload_id)
+        with open(os.path.join(session_dir, DATA_NAME), "r+b") as f:
+            f.seek(offset)
+            f.write(data)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        meta["offset"] = offset + len(data)
+        self._write_meta(session_dir, meta)
+        return meta
+
+    def verify(self, upload_id: str, chunk_size: int = 1024 * 1024) -> dict:
+        """
+        校验上传是否完整（大小与整个文件的SHA-256）
+
+        :return: 会话信息，附加 sha256 为实际的文件哈希
+        """
+        meta = self.get(upload_id)
+        if meta["offset"] != meta["total_size"]:
+            raise ChunkError(f"上传未完成：已接收 {meta['offset']} / {meta['total_size']} 字节")
+        digest = hashlib.sha256()
+        with open(self.data_path(upload_id), "rb") as f:
+            remaining = meta["total_size"]
+            while remaining > 0 and (chunk := f.read(min(chunk_size, remaining))):
+                digest.update(chunk)
+                remaining -= len(chunk)
+        file_hash = digest.hexdigest()
+        if meta["sha256"] and file_hash != meta["sha256"]:
+            raise ChunkError("文件校验和不匹配，请重新上传")
+        meta["sha256"] = file_hash
+        return meta
+
+    def discard(self, upload_id: str):
+        """删除会话目录"""
+        shutil.rmtree(self._session_dir(upload_id), ignore_errors=True)
+
+    def cleanup_expired(self) -> int:
+        """删除过期的会话，返回删除的会话数"""
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        deadline = time.time() - self.ttl_seconds
+        for upload_id in os.listdir(self.root):
+            try:
+                meta = self.get(upload_id)
+            except (KeyError, ValueError, OSError):
+                continue
+            if meta["created_at"] < deadline:
+                self.discard(upload_id)
+                removed += 1
+        return removed
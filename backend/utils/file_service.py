@@ -1,9 +1,14 @@
 # utils/file_service.py
 import os
 import hashlib
+import sqlite3
+import threading
+import time
 from pathlib import Path
 import logging
 
+from backend.config.fileConfig import settings
+
 # 配置日志记录器
 logger = logging.getLogger(__name__)  # 创建日志记录器实例
 logger.setLevel(logging.INFO)         # 设置日志级别
@@ -13,6 +18,94 @@ console_handler = logging.StreamHandler()
 formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 console_handler.setFormatter(formatter)
 
+# 流式计算哈希时的分块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class FileMetadataCache:
+    """
+    文件元数据缓存
+
+    以 (路径, inode, 大小, mtime_ns) 判断文件是否变化，未变化时直接返回缓存的哈希，不读取文件。
+    进程内用字典缓存，同时持久化到 SQLite 文件，服务重启后仍然有效。
+    """
+
+    def __init__(self, db_path: str):
+        """
+        :param db_path: SQLite 数据库文件路径
+        """
+        self.db_path = db_path
+        self._entries = {}  # 路径 -> (inode, 大小, mtime_ns, 哈希)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS file_metadata ("
+                "path TEXT PRIMARY KEY, inode INTEGER, size INTEGER, mtime_ns INTEGER, "
+                "sha256 TEXT NOT NULL, updated_at REAL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, path: str, stat: os.stat_result):
+        """返回与文件当前状态一致的缓存哈希，没有或已过期时返回None"""
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                try:
+                    row = self._connect().execute(
+                        "SELECT inode, size, mtime_ns, sha256 FROM file_metadata WHERE path = ?", (path,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"读取文件元数据缓存失败: {str(e)}")
+                    row = None
+                if row is None:
+                    return None
+                entry = self._entries[path] = tuple(row)
+        return entry[3] if entry[:3] == key else None
+
+    def put(self, path: str, stat: os.stat_result, sha256: str):
+        """记录文件的哈希"""
+        entry = (stat.st_ino, stat.st_size, stat.st_mtime_ns, sha256)
+        with self._lock:
+            self._entries[path] = entry
+            try:
+                self._connect().execute(
+                    "INSERT OR REPLACE INTO file_metadata (path, inode, size, mtime_ns, sha256, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, *entry, time.time()),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"写入文件元数据缓存失败: {str(e)}")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_metadata_cache = None
+_metadata_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> FileMetadataCache:
+    """获取进程内共用的文件元数据缓存"""
+    global _metadata_cache
+    with _metadata_cache_lock:
+        if _metadata_cache is None:
+            _metadata_cache = FileMetadataCache(settings.FILE_METADATA_CACHE)
+        return _metadata_cache
+
+
 class FileService:
     @staticmethod
     def save_file(data: bytes, file_path: Path) -> dict:
@@ -27,6 +120,9 @@ class FileService:
         # 提取纯净的文件名
         filename = file_path.name
 
+        # 内容已知，直接写入元数据缓存
+        get_metadata_cache().put(os.path.realpath(file_path), os.stat(file_path), file_hash)
+
         logger.info(f"文件保存成功: {filename} ({file_size / 1024:.2f}KB) [哈希: {file_hash}]")
 
         return {
@@ -56,16 +152,37 @@ class FileService:
         """计算文件哈希"""
         return hashlib.sha256(data).hexdigest()
 
+    @staticmethod
+    def calculate_file_hash(file_path: Path) -> str:
+        """分块计算文件哈希，内存占用与文件大小无关"""
+        digest = hashlib.sha256()
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(file_path, 'rb', buffering=0) as f:
+            while size := f.readinto(buffer):
+                digest.update(view[:size])
+        return digest.hexdigest()
+
     @staticmethod
     def get_file_metadata(file_path: Path) -> dict:
-        """获取文件元数据"""
-        file_size = os.path.getsize(file_path)
-        with open(file_path, 'rb') as f:
-            file_data = f.read()
-            file_hash = hashlib.sha256(file_data).hexdigest()
+        """
+        获取文件元数据
+
+        文件的 inode、大小与修改时间未变化时直接使用缓存的哈希，不读取文件内容。
+        """
+        stat = os.stat(file_path)
+        real_path = os.path.realpath(file_path)
+        cache = get_metadata_cache()
+        file_hash = cache.get(real_path, stat)
+        if file_hash is None:
+            file_hash = FileService.calculate_file_hash(file_path)
+            # 计算期间文件被修改时不写入缓存
+            after = os.stat(file_path)
+            if (after.st_ino, after.st_size, after.st_mtime_ns) == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                cache.put(real_path, stat, file_hash)
 
         return {
             "path": str(file_path),
-            "size": file_size,
+            "size": stat.st_size,
             "hash": file_hash
-        }
\ No newline at end of file
+        }
@@ -1,12 +1,20 @@
 # backend/utils/file_utils.py
+import asyncio
+import hashlib
+import logging
 import os
 import mimetypes
-import uuid
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from fastapi import UploadFile, File, Form
 
 from backend.common.exception import errors
 from backend.config.fileConfig import settings
+from backend.utils.file_service import FileService
+from backend.utils.pdf_xref import read_pdf_page_count
+
+logger = logging.getLogger(__name__)
 
 
 async def validate_file(
@@ -36,41 +44,118 @@ async def validate_file(
         allowed_exts = ", ".join(allowed_types)
         return False, f"文件扩展名 {ext} 无效，只允许 {allowed_exts} 类型"
 
+    # 验证文件内容（PDF文件头）
+    if ext == 'pdf':
+        head = file.file.read(8)
+        file.file.seek(0)
+        if not FileService.validate_pdf(head):
+            return False, f"文件 {filename} 不是有效的PDF文件"
 
     return True, ""
-    # 根据文件内容进一步验证
-    # TODO: 添加更深入的文件内容验证
 
 
-async def save_upload_file(upload_file: UploadFile = File(...), upload_dir: str = Form(...)) -> tuple[str, str]:
-    """保存上传的文件"""
-    # 确保上传目录存在
-    os.makedirs(upload_dir, exist_ok=True)
+# 上传文件的磁盘写入在专用线程池中进行，不阻塞事件循环；线程数即同时写磁盘的上传数上限
+_disk_write_executor = ThreadPoolExecutor(max_workers=settings.UPLOAD_MAX_WRITERS, thread_name_prefix="upload-write")
+
+
+async def run_disk_io(func, *args):
+    """在上传写入线程池中执行阻塞的磁盘操作"""
+    return await asyncio.get_running_loop().run_in_executor(_disk_write_executor, func, *args)
 
-    # 生成唯一的文件名
-    # 获取文件扩展名
-    file_ext = os.path.splitext(upload_file.filename)[1]
-    # 生成唯一的文件名
-    unique_filename = f"{uuid.uuid4().hex}{file_ext}"
-    # 拼接完整的文件保存路径（目录路径 + 唯一文件名）
-    file_path = os.path.join(upload_dir, unique_filename)
 
-    # 保存文件
+def _fsync_directory(directory: str):
+    """同步目录项，确保重命名在断电后仍然有效（Windows 不支持打开目录，直接跳过）"""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
     try:
-        # 使用异步读取文件
-        with open(file_path, "wb") as buffer:
-            # 分块读取文件
-            while chunk := await upload_file.read(settings.CHUNK_SIZE):
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_temp_file(source, directory: str, chunk_size: int = None, fsync: str = None) -> tuple[str, str, int]:
+    """
+    将文件对象的内容流式写入目录下的临时文件，同时计算SHA-256（同步函数，应在线程池中调用）
+
+    :param source: 可读的二进制文件对象
+    :param directory: 临时文件所在目录（应与目标文件在同一文件系统，便于原子重命名）
+    :param chunk_size: 分块大小，默认为 CHUNK_SIZE
+    :param fsync: 落盘策略：none 不同步，file/full 同步文件内容，默认为 UPLOAD_FSYNC
+    :return: (临时文件路径, SHA-256, 字节数)
+    """
+    chunk_size = chunk_size or settings.CHUNK_SIZE
+    fsync = fsync or settings.UPLOAD_FSYNC
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".tmp")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := source.read(chunk_size):
                 buffer.write(chunk)
-    except Exception as e:
-        # 如果保存失败，删除可能已创建的文件
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except:
-                pass
-        #     保存失败，返回空值
-        return "", ""
-
-
-    return file_path, upload_file.filename
+                digest.update(chunk)
+                size += len(chunk)
+            if fsync != "none":
+                buffer.flush()
+                os.fsync(buffer.fileno())
+        os.chmod(temp_path, 0o644)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return temp_path, digest.hexdigest(), size
+
+
+def place_file(temp_path: str, file_path: str, overwrite: bool = True, fsync: str = None) -> bool:
+    """
+    将临时文件原子地重命名为目标文件（同步函数，应在线程池中调用）
+
+    :param overwrite: 目标已存在时是否覆盖；为False时保留已有文件并删除临时文件
+    :param fsync: 落盘策略，full 时同步目录项，默认为 UPLOAD_FSYNC
+    :return: 是否写入了目标文件
+    """
+    fsync = fsync or settings.UPLOAD_FSYNC
+    if not overwrite and os.path.exists(file_path):
+        os.remove(temp_path)
+        return False
+    directory = os.path.dirname(file_path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if fsync == "full":
+        _fsync_directory(directory)
+    return True
+
+
+async def check_pdf_page_count(source, filename: str) -> int | None:
+    """
+    从 trailer 与交叉引用表读取PDF页数（不解析页面内容），没有页面的PDF视为无效文件
+
+    :param source: 文件路径或可随机读取的二进制文件对象
+    :return: 页数；不是PDF文件或无法从交叉引用表读取时返回None
+    """
+    if not filename.lower().endswith('.pdf'):
+        return None
+    page_count = await run_disk_io(read_pdf_page_count, source)
+    if page_count == 0:
+        raise errors.InvalidFileName(msg=f"文件 {filename} 没有任何页面")
+    return page_count
+
+
+def sharded_path(base_dir: str, filename: str) -> str:
+    """
+    按文件名的前四个字符计算两级分片路径：<base_dir>/ab/cd/abcd....
+
+    文件名应是哈希或UUID等分布均匀的字符串，每级目录最多256个子目录，单个目录中的文件数保持较少。
+    """
+    return os.path.join(base_dir, filename[:2], filename[2:4], filename)
+
+
+def content_addressed_path(store_dir: str, sha256: str, ext: str = "") -> str:
+    """按内容哈希计算两级分片的存储路径：<store_dir>/ab/cd/abcd....<ext>"""
+    return sharded_path(store_dir, f"{sha256}{ext.lower()}")
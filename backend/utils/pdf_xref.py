@@ -0,0 +1,410 @@
+# backend/utils/pdf_xref.py
+"""
+通过 trailer 与交叉引用表读取PDF页数
+
+只读取文件末尾的 startxref、交叉引用表（或交叉引用流）以及目录与页面树根两个对象，
+不解析页面内容，耗时与文件大小基本无关。支持增量更新（/Prev 链）、混合引用文件（/XRefStm）
+与对象流中的压缩对象。
+"""
+import logging
+import os
+import re
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# startxref 应位于文件最后 1024 字节内，多读一些以兼容末尾带有垃圾数据的文件
+TAIL_SIZE = 4096
+# 读取对象时的初始窗口大小，对象超出窗口时加倍重读
+OBJECT_WINDOW = 64 * 1024
+MAX_OBJECT_WINDOW = 16 * 1024 * 1024
+
+WHITESPACE = b"\x00\t\n\x0c\r "
+DELIMITERS = b"()<>[]{}/%"
+
+_OBJ_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj")
+_XREF_SUBSECTION = re.compile(rb"(\d+)\s+(\d+)\s*[\r\n]")
+_XREF_ENTRY = re.compile(rb"(\d{10}) (\d{5}) ([nf])")
+# 整数后跟 "代号 R" 时是间接引用
+_REF_SUFFIX = re.compile(rb"\s+(\d+)\s+R(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])")
+
+
+class PDFStructureError(ValueError):
+    """PDF结构无法按交叉引用表解析"""
+
+
+class Ref(tuple):
+    """间接引用 (对象号, 代号)"""
+
+
+class _Parser:
+    """PDF对象语法的最小解析器，只解析读取页数所需的值（数字、名称、字符串、数组、字典、引用）"""
+
+    def __init__(self, data: bytes, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def skip_whitespace(self):
+        data = self.data
+        while True:
+            while self.pos < len(data) and data[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(data) and data[self.pos] == ord("%"):
+                while self.pos < len(data) and data[self.pos] not in b"\r\n":
+                    self.pos += 1
+                continue
+            return
+
+    def _token_end(self, start: int) -> int:
+        end = start
+        while end < len(self.data) and self.data[end] not in WHITESPACE + DELIMITERS:
+            end += 1
+        return end
+
+    def parse_value(self):
+        self.skip_whitespace()
+        data = self.data
+        if self.pos >= len(data):
+            raise IndexError("对象超出读取窗口")
+        ch = data[self.pos]
+        if data.startswith(b"<<", self.pos):
+            return self._parse_dict()
+        if ch == ord("["):
+            self.pos += 1
+            items = []
+            while True:
+                self.skip_whitespace()
+                if self.pos >= len(data):
+                    raise IndexError("数组超出读取窗口")
+                if data[self.pos] == ord("]"):
+                    self.pos += 1
+                    return items
+                items.append(self.parse_value())
+        if ch == ord("/"):
+            end = self._token_end(self.pos + 1)
+            name = data[self.pos:end].decode("latin-1")
+            self.pos = end
+            return name
+        if ch == ord("("):
+            return self._parse_literal_string()
+        if ch == ord("<"):
+            end = data.index(b">", self.pos)
+            value = data[self.pos + 1:end]
+            self.pos = end + 1
+            return value
+        end = self._token_end(self.pos)
+        token = data[self.pos:end]
+        if not token:
+            raise PDFStructureError(f"无法解析的字符: {data[self.pos:self.pos + 1]!r}")
+        self.pos = end
+        if re.fullmatch(rb"[+-]?\d+", token):
+            match = _REF_SUFFIX.match(data, self.pos)
+            if match:
+                self.pos = match.end()
+                return Ref((int(token), int(match.group(1))))
+            return int(token)
+        if re.fullmatch(rb"[+-]?(\d+\.?\d*|\.\d+)", token):
+            return float(token)
+        return token.decode("latin-1")  # true / false / null 等关键字
+
+    def _parse_dict(self) -> dict:
+        self.pos += 2
+        result = {}
+        while True:
+            self.skip_whitespace()
+            if self.pos >= len(self.data):
+                raise IndexError("字典超出读取窗口")
+            if self.data.startswith(b">>", self.pos):
+                self.pos += 2
+                return result
+            key = self.parse_value()
+            if not isinstance(key, str) or not key.startswith("/"):
+                raise PDFStructureError("字典的键不是名称")
+            result[key] = self.parse_value()
+
+    def _parse_literal_string(self) -> bytes:
+        data = self.data
+        depth = 0
+        start = self.pos
+        while True:
+            if self.pos >= len(data):
+                raise IndexError("字符串超出读取窗口")
+            ch = data[self.pos]
+            if ch == ord("\\"):
+                self.pos += 2
+                continue
+            if ch == ord("("):
+                depth += 1
+            elif ch == ord(")"):
+                depth -= 1
+                if depth == 0:
+                    self.pos += 1
+                    return data[start + 1:self.pos - 1]
+            self.pos += 1
+
+
+def _apply_png_predictor(data: bytes, columns: int) -> bytes:
+    """还原 PNG 预测器（交叉引用流常用 Up 预测）"""
+    row_size = columns + 1
+    if len(data) % row_size:
+        raise PDFStructureError("预测器数据长度不正确")
+    output = bytearray()
+    previous = bytearray(columns)
+    for row_start in range(0, len(data), row_size):
+        filter_type = data[row_start]
+        row = bytearray(data[row_start + 1:row_start + row_size])
+        if filter_type == 1:
+            for i in range(1, columns):
+                row[i] = (row[i] + row[i - 1]) & 0xFF
+        elif filter_type == 2:
+            for i in range(columns):
+                row[i] = (row[i] + previous[i]) & 0xFF
+        elif filter_type != 0:
+            raise PDFStructureError(f"不支持的PNG预测类型: {filter_type}")
+        output += row
+        previous = row
+    return bytes(output)
+
+
+class PDFXrefReader:
+    """按交叉引用表随机读取PDF对象"""
+
+    def __init__(self, f):
+        """
+        :param f: 可随机读取的二进制文件对象
+        """
+        self.f = f
+        self.f.seek(0, os.SEEK_END)
+        self.size = self.f.tell()
+        self.entries = {}  # 对象号 -> ("n", 偏移量) 或 ("c", 对象流号, 序号)
+        self.trailer = {}
+        self._object_streams = {}
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        self.f.seek(offset)
+        return self.f.read(size)
+
+    def _parse_at(self, offset: int, parse):
+        """在偏移量处读取窗口并解析，窗口不够时加倍重读"""
+        window = OBJECT_WINDOW
+        while True:
+            data = self._read_at(offset, window)
+            try:
+                return parse(data)
+            except IndexError:
+                if window >= MAX_OBJECT_WINDOW or offset + len(data) >= self.size:
+                    raise PDFStructureError("对象不完整")
+                window *= 2
+
+    def load(self):
+        """读取 startxref 并沿 /Prev 链加载全部交叉引用，较新的条目优先"""
+        tail = self._read_at(max(0, self.size - TAIL_SIZE), TAIL_SIZE)
+        index = tail.rfind(b"startxref")
+        if index < 0:
+            raise PDFStructureError("找不到 startxref")
+        match = re.match(rb"startxref\s+(\d+)", tail[index:])
+        if not match:
+            raise PDFStructureError("startxref 偏移量无效")
+
+        pending = [int(match.group(1))]
+        visited = set()
+        first = True
+        while pending:
+            offset = pending.pop(0)
+            if offset in visited or offset >= self.size:
+                continue
+            visited.add(offset)
+            trailer = self._load_section(offset)
+            if first:
+                self.trailer = trailer
+                first = False
+            if isinstance(trailer.get("/Prev"), int):
+                pending.append(trailer["/Prev"])
+        return self
+
+    def _load_section(self, offset: int) -> dict:
+        head = self._read_at(offset, 32).lstrip(WHITESPACE)
+        if head.startswith(b"xref"):
+            return self._load_xref_table(offset)
+        return self._load_xref_stream(offset)
+
+    def _load_xref_table(self, offset: int) -> dict:
+        window = OBJECT_WINDOW
+        while True:
+            data = self._read_at(offset, window)
+            trailer_index = data.find(b"trailer")
+            if trailer_index >= 0:
+                try:
+                    trailer = _Parser(data, trailer_index + len(b"trailer")).parse_value()
+                    break
+                except IndexError:
+                    pass
+            if offset + len(data) >= self.size:
+                raise PDFStructureError("交叉引用表不完整")
+            window *= 2
+
+        # 混合引用文件：压缩对象在旧式表中标记为空闲，须先加载 /XRefStm 指向的交叉引用流
+        if isinstance(trailer.get("/XRefStm"), int):
+            self._load_xref_stream(trailer["/XRefStm"])
+
+        pos = data.index(b"xref") + len(b"xref")
+        while pos < trailer_index:
+            match = _XREF_SUBSECTION.match(data, pos)
+            if not match:
+                while pos < trailer_index and data[pos] in WHITESPACE:
+                    pos += 1
+                match = _XREF_SUBSECTION.match(data, pos)
+                if not match:
+                    break
+            start, count = int(match.group(1)), int(match.group(2))
+            pos = match.end()
+            for number in range(start, start + count):
+                while data[pos] in WHITESPACE:
+                    pos += 1
+                entry = _XREF_ENTRY.match(data, pos)
+                if not entry:
+                    raise PDFStructureError("交叉引用条目格式错误")
+                pos = entry.end()
+                if entry.group(3) == b"n":
+                    self.entries.setdefault(number, ("n", int(entry.group(1))))
+                else:
+                    self.entries.setdefault(number, ("f",))
+        return trailer
+
+    def _read_stream(self, offset: int):
+        """读取偏移量处的流对象，返回 (字典, 解码后的数据)"""
+        def parse(data):
+            match = _OBJ_HEADER.match(data)
+            if not match:
+                raise PDFStructureError("对象头格式错误")
+            parser = _Parser(data, match.end())
+            stream_dict = parser.parse_value()
+            parser.skip_whitespace()
+            if not data.startswith(b"stream", parser.pos):
+                raise PDFStructureError("对象不是流")
+            start = parser.pos + len(b"stream")
+            if data.startswith(b"\r\n", start):
+                start += 2
+            elif data.startswith(b"\n", start) or data.startswith(b"\r", start):
+                start += 1
+            return stream_dict, start
+
+        stream_dict, start = self._parse_at(offset, parse)
+        length = stream_dict.get("/Length")
+        if isinstance(length, Ref):
+            length = self.resolve(length)
+        if not isinstance(length, int):
+            raise PDFStructureError("流长度无效")
+        raw = self._read_at(offset + start, length)
+
+        filters = stream_dict.get("/Filter")
+        filters = filters if isinstance(filters, list) else [filters] if filters else []
+        params = stream_dict.get("/DecodeParms")
+        params = params[0] if isinstance(params, list) and params else params
+        for name in filters:
+            if name not in ("/FlateDecode", "/Fl"):
+                raise PDFStructureError(f"不支持的流过滤器: {name}")
+            raw = zlib.decompress(raw)
+        if isinstance(params, dict) and params.get("/Predictor", 1) >= 10:
+            raw = _apply_png_predictor(raw, params.get("/Columns", 1))
+        return stream_dict, raw
+
+    def _load_xref_stream(self, offset: int) -> dict:
+        stream_dict, data = self._read_stream(offset)
+        if stream_dict.get("/Type") != "/XRef":
+            raise PDFStructureError("startxref 指向的不是交叉引用")
+        widths = stream_dict["/W"]
+        index = stream_dict.get("/Index", [0, stream_dict["/Size"]])
+        entry_size = sum(widths)
+        pos = 0
+        for start, count in zip(index[::2], index[1::2]):
+            for number in range(start, start + count):
+                if pos + entry_size > len(data):
+                    raise PDFStructureError("交叉引用流数据不完整")
+                fields = []
+                for width in widths:
+                    fields.append(int.from_bytes(data[pos:pos + width], "big") if width else None)
+                    pos += width
+                entry_type = 1 if fields[0] is None else fields[0]
+                if entry_type == 1:
+                    self.entries.setdefault(number, ("n", fields[1]))
+                elif entry_type == 2:
+                    self.entries.setdefault(number, ("c", fields[1], fields[2] or 0))
+                else:
+                    self.entries.setdefault(number, ("f",))
+        return stream_dict
+
+    def _object_stream(self, number: int):
+        """读取并缓存对象流，返回 (解码数据, {对象号: 偏移量})"""
+        if number not in self._object_streams:
+            entry = self.entries.get(number)
+            if not entry or entry[0] != "n":
+                raise PDFStructureError(f"对象流 {number} 不存在")
+            stream_dict, data = self._read_stream(entry[1])
+            first = stream_dict["/First"]
+            header = _Parser(data[:first])
+            offsets = {}
+            for _ in range(stream_dict["/N"]):
+                object_number = header.parse_value()
+                offsets[object_number] = first + header.parse_value()
+            self._object_streams[number] = (data, offsets)
+        return self._object_streams[number]
+
+    def resolve(self, value, depth: int = 0):
+        """解析间接引用，返回对象的值"""
+        while isinstance(value, Ref):
+            if depth > 32:
+                raise PDFStructureError("间接引用层数过多")
+            depth += 1
+            entry = self.entries.get(value[0])
+            if entry is None or entry[0] == "f":
+                return None
+            if entry[0] == "c":
+                data, offsets = self._object_stream(entry[1])
+                if value[0] not in offsets:
+                    raise PDFStructureError(f"对象流中找不到对象 {value[0]}")
+                value = _Parser(data, offsets[value[0]]).parse_value()
+                continue
+
+            def parse(data):
+                match = _OBJ_HEADER.match(data)
+                if not match:
+                    raise PDFStructureError(f"对象 {value[0]} 的偏移量无效")
+                return _Parser(data, match.end()).parse_value()
+
+            value = self._parse_at(entry[1], parse)
+        return value
+
+    def page_count(self) -> int:
+        """读取页面树根节点的 /Count"""
+        catalog = self.resolve(self.trailer.get("/Root"))
+        if not isinstance(catalog, dict):
+            raise PDFStructureError("找不到文档目录")
+        pages = self.resolve(catalog.get("/Pages"))
+        if not isinstance(pages, dict):
+            raise PDFStructureError("找不到页面树")
+        count = self.resolve(pages.get("/Count"))
+        if not isinstance(count, int) or count < 0:
+            raise PDFStructureError("页数无效")
+        return count
+
+
+def read_pdf_page_count(source) -> int | None:
+    """
+    通过 trailer 与交叉引用表读取PDF页数
+
+    :param source: 文件路径，或可随机读取的二进制文件对象（读取后恢复到原位置）
+    :return: 页数；结构损坏、加密或使用了不支持的编码而无法读取时返回None
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return read_pdf_page_count(f)
+
+    position = source.tell()
+    try:
+        return PDFXrefReader(source).load().page_count()
+    except (PDFStructureError, IndexError, KeyError, TypeError, ValueError, zlib.error) as e:
+        logger.warning(f"无法从交叉引用表读取PDF页数: {str(e)}")
+        return None
+    finally:
+        source.seek(position)
@@ -0,0 +1,154 @@
+"""
+上传写盘负载测试
+
+在进程内启动一个包含上传接口与 /ping 接口的应用，并发上传大文件的同时持续请求 /ping，
+报告 /ping 的延迟分布（P50/P95/P99/最大值）。对比旧的在事件循环中同步写盘的实现（blocking）
+与实际上传接口使用的 file_store_service.store_upload（threaded，线程池写盘、计算哈希并登记引用），
+衡量上传对其他接口的影响。threaded 方式的引用记录写入临时目录中的 SQLite 数据库。
+
+用法:
+    python -m backend.utils.upload_benchmark --uploads 8 --size-mb 20
+    python -m backend.utils.upload_benchmark --mode threaded --fsync full
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from fastapi import FastAPI, File, UploadFile
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.app.markmanage.models.stored_file import StoredFile
+from backend.app.markmanage.service.connect_scanners.telemetry import percentile
+from backend.app.markmanage.service.file_store_service import file_store_service
+from backend.config.fileConfig import settings
+
+
+async def _save_upload_file_blocking(upload_file, upload_dir):
+    """旧实现：在事件循环线程中同步写盘（仅用于对比）"""
+    os.makedirs(upload_dir, exist_ok=True)
+    file_path = os.path.join(upload_dir, f"{uuid.uuid4().hex}{os.path.splitext(upload_file.filename)[1]}")
+    with open(file_path, "wb") as buffer:
+        while chunk := await upload_file.read(settings.CHUNK_SIZE):
+            buffer.write(chunk)
+    return file_path, upload_file.filename
+
+
+def _store_upload(db_session):
+    """实际上传接口的写盘方式：在一个事务中保存文件并登记引用"""
+
+    async def save(upload_file, upload_dir):
+        async with db_session() as session:
+            async with session.begin():
+                return await file_store_service.store_upload(session, upload_file, upload_dir)
+
+    return save
+
+
+def create_app(mode, upload_dir, db_session=None):
+    """创建测试应用"""
+    app = FastAPI()
+    save = _store_upload(db_session) if mode == "threaded" else _save_upload_file_blocking
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        result = await save(file, upload_dir)
+        return {"path": result if mode == "threaded" else result[0]}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run_load(mode, uploads, size_mb, ping_interval):
+    """
+    并发上传的同时持续请求 /ping
+
+    :return: dict 延迟统计
+    """
+    import httpx
+
+    payload = os.urandom(size_mb * 1024 * 1024)
+    with tempfile.TemporaryDirectory() as upload_dir:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(upload_dir, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(StoredFile.__table__.create)
+        app = create_app(mode, upload_dir, async_sessionmaker(bind=engine, expire_on_commit=False))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            latencies = []
+            uploading = True
+
+            async def pinger():
+                while uploading:
+                    start = time.perf_counter()
+                    response = await client.get("/ping")
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                    await asyncio.sleep(ping_interval)
+
+            async def upload(index):
+                # 每个上传内容不同，避免按内容去重后跳过写盘
+                content = index.to_bytes(4, "big") + payload
+                response = await client.post("/upload", files={"file": (f"bench{index}.pdf", content)})
+                response.raise_for_status()
+
+            ping_task = asyncio.create_task(pinger())
+            start = time.perf_counter()
+            await asyncio.gather(*(upload(index) for index in range(uploads)))
+            elapsed = time.perf_counter() - start
+            uploading = False
+            await ping_task
+        await engine.dispose()
+
+    return {
+        "mode": mode,
+        "elapsed_s": elapsed,
+        "mb_per_s": uploads * size_mb / elapsed if elapsed > 0 else 0.0,
+        "pings": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+    }
+
+
+def print_report(results):
+    """打印对比结果"""
+    print(f"{'写盘方式':<12}{'耗时(秒)':>10}{'MB/秒':>10}{'ping次数':>10}"
+          f"{'P50(ms)':>10}{'P95(ms)':>10}{'P99(ms)':>10}{'最大(ms)':>10}")
+    for result in results:
+        print(f"{result['mode']:<12}{result['elapsed_s']:>10.2f}{result['mb_per_s']:>10.1f}{result['pings']:>10}"
+              f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['max_ms']:>10.2f}")
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="上传写盘负载测试")
+    parser.add_argument("--mode", choices=["both", "blocking", "threaded"], default="both", help="写盘方式")
+    parser.add_argument("--uploads", type=int, default=8, help="并发上传数")
+    parser.add_argument("--size-mb", type=int, default=20, help="每个上传文件的大小（MB）")
+    parser.add_argument("--ping-interval", type=float, default=0.005, help="/ping 请求间隔（秒）")
+    parser.add_argument("--fsync", choices=["none", "file", "full"], default=None,
+                        help="threaded 方式的落盘策略，默认为 UPLOAD_FSYNC")
+    return parser.parse_args()
+
+
+def main():
+    """主程序逻辑"""
+    args = parse_arguments()
+    if args.fsync:
+        settings.UPLOAD_FSYNC = args.fsync
+    modes = ["blocking", "threaded"] if args.mode == "both" else [args.mode]
+    results = [asyncio.run(run_load(mode, args.uploads, args.size_mb, args.ping_interval)) for mode in modes]
+    print_report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
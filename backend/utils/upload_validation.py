@@ -0,0 +1,56 @@
+# backend/utils/upload_validation.py
+from typing import List
+
+from backend.common.exception import errors
+from backend.utils.file_service import FileService
+
+# 判断PDF文件头所需的字节数（%PDF-）
+PDF_HEADER_SIZE = 5
+
+
+class UploadStreamValidator:
+    """
+    上传文件的流式校验
+
+    数据边接收边校验：文件名（扩展名）在收到数据之前校验，PDF文件头在收到开头几个字节时校验，
+    大小在累计超过上限的那一个分块就拒绝，不必等待整个文件接收完毕。
+    校验失败时抛出 errors.InvalidFileName 或 errors.FileTooLarge。
+    """
+
+    def __init__(self, filename: str, allowed_types: List[str], max_size: int):
+        """
+        :param filename: 上传的文件名
+        :param allowed_types: 允许的扩展名（小写，不含点）
+        :param max_size: 最大文件大小（字节）
+        """
+        if not filename or '.' not in filename:
+            raise errors.InvalidFileName(msg=f"文件名 {filename} 无效")
+        self.ext = filename.rsplit('.', 1)[1].lower()
+        if self.ext not in allowed_types:
+            allowed_exts = ", ".join(allowed_types)
+            raise errors.InvalidFileName(msg=f"文件扩展名 {self.ext} 无效，只允许 {allowed_exts} 类型")
+        self.filename = filename
+        self.max_size = max_size
+        self.size = 0
+        self._head = b""
+        self._header_checked = self.ext != "pdf"
+
+    def feed(self, chunk: bytes):
+        """校验新收到的一段数据"""
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise errors.FileTooLarge(msg=f"文件大小不能超过 {self.max_size / (1024 * 1024):.2f}MB")
+        if not self._header_checked:
+            self._head += chunk[:PDF_HEADER_SIZE + 1 - len(self._head)]
+            if len(self._head) > PDF_HEADER_SIZE:
+                self._check_header()
+
+    def finish(self):
+        """数据接收完毕时调用，校验不足文件头长度的文件"""
+        if not self._header_checked:
+            self._check_header()
+
+    def _check_header(self):
+        self._header_checked = True
+        if not FileService.validate_pdf(self._head):
+            raise errors.InvalidFileName(msg=f"文件 {self.filename} 不是有效的PDF文件")